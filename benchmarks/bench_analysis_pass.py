@@ -0,0 +1,88 @@
+"""Analysis time and DB reads: one pass per analysis vs the fused pass.
+
+Fills a file database with synthetic comments in several languages and
+runs the four analyses (language, sentiment, gender, keywords) twice from
+a clean slate: once as separate passes, each streaming the comments
+itself as Analysis.execute used to, and once as the single fused pass.
+Gender lookups stay local (no Namsor key).
+
+Usage:
+    python -m benchmarks.bench_analysis_pass [comments]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from src.analysis import Analysis
+from src.db_manager import DBManager, close_all_pools
+from src.gender_analyzer import GenderAnalyzer
+
+PHRASES = [
+    "this video is really great, thanks", "the audio is terrible and the editing is boring",
+    "o vídeo é muito bom, obrigado", "não gostei do áudio", "me encanta este canal, gracias",
+    "c'est vraiment génial, merci", "das ist wirklich toll, danke", "lol", "first!",
+]
+NAMES = ["John", "Maria", "Ana Clara", "Pedro", "xXGamerXx", "Sophie", "Lukas", "Zzyzx", ""]
+
+
+def fill(db, count, seed=9):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        text = " ".join(rng.sample(PHRASES, rng.randint(1, 3)))
+        rows.append((f"c{i}", rng.choice(NAMES), text, text, rng.randint(0, 500)))
+    db._execute_many(
+        "INSERT INTO comment (youtube_id, video_id, author_clean_name, text, clean_text, published, "
+        "author_display_name, likes) VALUES (?, 'bench', ?, ?, ?, '2024-01-01', '', ?)",
+        rows,
+    )
+
+
+def reset(db):
+    db._execute_query(
+        "UPDATE comment SET language = NULL, sentiment = NULL, author_gender = NULL", commit=True
+    )
+    db._execute_query("DELETE FROM comment_keywords", commit=True)
+
+
+def main(count: int = 20000) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DBManager(db_name=os.path.join(tmpdir, "bench.db"))
+        fill(db, count)
+        with patch("src.analysis.DBManager", return_value=db), patch(
+            "src.analysis.GenderAnalyzer", lambda db: GenderAnalyzer(db, api_key=None)
+        ):
+            analysis = Analysis()
+            analysis.sentiment_backend = "lexicon"
+
+            reset(db)
+            start = time.perf_counter()
+            rows = chars = 0
+            for name in analysis.TASKS:
+                analysis._run_task("bench", name)
+                rows += analysis.report["rows_read"]
+                chars += analysis.report["chars_read"]
+            separate = time.perf_counter() - start
+            print(f"comments: {count}")
+            print(f"separate passes  {separate:7.2f} s  rows read {rows:7d}  characters read {chars:9d}")
+
+            reset(db)
+            start = time.perf_counter()
+            analysis.execute("bench")
+            fused = time.perf_counter() - start
+            report = analysis.report
+            print(
+                f"fused pass       {fused:7.2f} s  rows read {report['rows_read']:7d}  "
+                f"characters read {report['chars_read']:9d}  ({separate / fused:.2f}x)"
+            )
+            print("  " + ", ".join(f"{name} {s:.2f}s" for name, s in report["task_seconds"].items()))
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,81 @@
+"""Many videos: one process launch per video vs the batch runner.
+
+Measures what each launch of ``python -m src.main`` pays before any work
+(interpreter start and imports) and the langdetect profile load, then runs
+synthetic videos through the pipeline one at a time and through
+BatchRunner. The stages sleep for the network ones (YouTube, OpenAI) and
+spin the CPU for the others, with costs in proportion to a real run, so
+the numbers show the overlap and not API speed.
+
+Usage:
+    python -m benchmarks.bench_batch [videos]
+"""
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from src.batch import BatchRunner
+from src.db_manager import DBManager
+from src.language_detector import load_langdetect
+from src.pipeline import Pipeline, Stage
+
+# Seconds per stage for one video
+COSTS = {"gathering": 0.20, "mining": 0.02, "analysis": 0.05, "llm_analysis": 0.40, "generating": 0.01}
+
+
+def wait_network(seconds):
+    return lambda video_id: time.sleep(seconds)
+
+
+def use_cpu(seconds):
+    def run(video_id):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    return run
+
+
+def stages():
+    return [
+        Stage("gathering", wait_network(COSTS["gathering"]), resource="network"),
+        Stage("mining", use_cpu(COSTS["mining"]), ("gathering",), "cpu"),
+        Stage("analysis", use_cpu(COSTS["analysis"]), ("mining",), "cpu"),
+        Stage("llm_analysis", wait_network(COSTS["llm_analysis"]), ("mining",), "network"),
+        Stage("generating", use_cpu(COSTS["generating"]), ("analysis", "llm_analysis"), "cpu"),
+    ]
+
+
+def main(videos: int = 40) -> None:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import src.main"], check=True, env=dict(os.environ, TESTING="true"))
+    launch = time.perf_counter() - start
+    start = time.perf_counter()
+    load_langdetect(0)
+    profiles = time.perf_counter() - start
+    print(f"videos: {videos}")
+    print(f"per launch: {launch:.2f} s to start and import, {profiles:.2f} s to load langdetect profiles")
+
+    video_ids = [f"video{i}" for i in range(videos)]
+    pipeline = Pipeline(stages(), DBManager(db_name=":memory:"))
+    start = time.perf_counter()
+    for video_id in video_ids:
+        pipeline.run(video_id)
+    serial = time.perf_counter() - start
+    print(
+        f"one at a time    {serial:7.2f} s  (+{videos * (launch + profiles):.2f} s as separate launches)"
+    )
+
+    runner = BatchRunner(stages(), workers=8, network_workers=8, cpu_workers=2, db=DBManager(db_name=":memory:"))
+    summary = runner.run(video_ids)
+    print(
+        f"batch            {summary['seconds']:7.2f} s  ({serial / summary['seconds']:.1f}x; "
+        f"{runner.workers} videos, limits {runner.limits})"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,63 @@
+"""Gathering a whole channel: one Gathering per video vs channel expansion.
+
+A stubbed channel of many small videos, every call sleeping for a
+simulated network round trip. The per-video run builds a Gathering (and
+its client) for each video and looks up each title with videos.list, as
+running main once per video did; the channel run lists the uploads
+playlist once and fans the videos out over shared workers. Prints time,
+comment throughput and YouTube quota units.
+
+Usage:
+    python -m benchmarks.bench_channel_gathering [videos] [latency_ms]
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from src.db_manager import DBManager, close_all_pools
+from src.gathering import Gathering
+from tests.fakes import FakeYouTube
+
+CHANNEL = "UC" + "b" * 22
+COMMENTS_PER_VIDEO = 150
+
+
+def main(videos: int = 200, latency_ms: float = 20.0) -> None:
+    video_ids = [f"video{i:04d}" for i in range(videos)]
+    total = videos * COMMENTS_PER_VIDEO
+    print(f"videos: {videos}  comments: {total}  latency: {latency_ms} ms/call")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label in ("one Gathering per video", "channel, 8 workers"):
+            youtube = FakeYouTube(
+                {video_id: COMMENTS_PER_VIDEO for video_id in video_ids},
+                latency=latency_ms / 1000,
+                channels={CHANNEL: video_ids},
+            )
+            db = DBManager(db_name=os.path.join(tmpdir, f"{len(label)}.db"))
+            spent = 0
+            start = time.perf_counter()
+            with patch("src.gathering.DBManager", return_value=db):
+                if label.startswith("one"):
+                    for video_id in video_ids:
+                        gathering = Gathering(client_factory=lambda: youtube, requests_per_second=1000)
+                        gathering.execute(video_id)
+                        spent += gathering.quota.spent
+                else:
+                    gathering = Gathering(client_factory=lambda: youtube, requests_per_second=1000, max_workers=8)
+                    gathering.execute(CHANNEL)
+                    spent = gathering.quota.spent
+            elapsed = time.perf_counter() - start
+            print(f"{label:26s} {elapsed:7.2f} s  {total / elapsed:8.0f} comments/s  {spent:5d} quota units")
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+    )
@@ -0,0 +1,60 @@
+"""Offline gathering throughput against a stubbed YouTube client.
+
+Compares strictly serial paging with the prefetching CommentFetcher, for one
+video and for several videos gathered concurrently. Every stub call sleeps
+for a simulated network round trip.
+
+Usage:
+    python -m benchmarks.bench_comment_fetcher [latency_ms]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from src.comment_fetcher import CommentFetcher, RateLimiter
+from src.db_manager import DBManager, close_all_pools
+from tests.fakes import FakeYouTube
+
+VIDEOS = {f"video_{i}": 2000 for i in range(8)}
+
+
+def serial(youtube, db, video_ids):
+    """The pre-fetcher behaviour: one page at a time, write, then request the next."""
+    fetcher = CommentFetcher(lambda: youtube, db=db)
+    for video_id in video_ids:
+        token = None
+        while True:
+            params = dict(part="snippet", maxResults=100, videoId=video_id)
+            if token:
+                params["pageToken"] = token
+            response = youtube.commentThreads().list(**params).execute()
+            db.save_comments_bulk(fetcher._page_comments(response, video_id))
+            token = response.get("nextPageToken")
+            if not token:
+                break
+
+
+def main(latency_ms: float = 20.0) -> None:
+    youtube = FakeYouTube(VIDEOS, latency=latency_ms / 1000)
+    total = sum(VIDEOS.values())
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runs = {
+            "serial": lambda db: serial(youtube, db, list(VIDEOS)),
+            "prefetch, 1 worker": lambda db: CommentFetcher(lambda: youtube, db=db).fetch_many(VIDEOS, max_workers=1),
+            "prefetch, 8 workers": lambda db: CommentFetcher(
+                lambda: youtube, db=db, rate_limiter=RateLimiter(200, burst=8)
+            ).fetch_many(VIDEOS, max_workers=8),
+        }
+        print(f"videos: {len(VIDEOS)}  comments: {total}  latency: {latency_ms} ms/call")
+        for label, run in runs.items():
+            db = DBManager(db_name=os.path.join(tmpdir, f"{label.replace(' ', '_')}.db"))
+            start = time.perf_counter()
+            run(db)
+            elapsed = time.perf_counter() - start
+            print(f"{label:22s} {elapsed:7.2f} s  {total / elapsed:9.0f} comments/s")
+        close_all_pools()
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
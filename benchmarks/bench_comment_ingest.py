@@ -0,0 +1,55 @@
+"""Comment ingestion throughput against an on-disk database.
+
+Compares one ``save_comment`` call (and commit) per comment with
+``save_comments_bulk`` over the same data.
+
+Usage:
+    python -m benchmarks.bench_comment_ingest [comments]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.comment import Comment
+from src.db_manager import DBManager, close_all_pools
+
+
+def make_comments(count: int, video_id: str):
+    return [
+        Comment(
+            video_id=video_id,
+            published=datetime(2024, 1, 1),
+            author_display_name=f"Author {i}",
+            likes=i % 50,
+            text=f"This is benchmark comment number {i} with some filler text.",
+        )
+        for i in range(count)
+    ]
+
+
+def main(count: int = 5000) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DBManager(db_name=os.path.join(tmpdir, "bench.db"))
+
+        comments = make_comments(count, "single")
+        start = time.perf_counter()
+        for comment in comments:
+            db.save_comment(comment)
+        single = time.perf_counter() - start
+
+        comments = make_comments(count, "bulk")
+        start = time.perf_counter()
+        db.save_comments_bulk(comments)
+        bulk = time.perf_counter() - start
+        close_all_pools()
+
+    print(f"comments:          {count}")
+    print(f"save_comment:      {count / single:12.0f} comments/s")
+    print(f"save_comments_bulk:{count / bulk:12.0f} comments/s")
+    print(f"speedup:           {single / bulk:12.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
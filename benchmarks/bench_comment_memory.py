@@ -0,0 +1,77 @@
+"""Peak RSS of reading a large video with get_comments vs iter_comments.
+
+Each mode runs in a fresh interpreter so ru_maxrss is not shared.
+
+Usage:
+    python -m benchmarks.bench_comment_memory [comments]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.comment import Comment
+from src.db_manager import DBManager, close_all_pools
+
+VIDEO_ID = "bench_memory"
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def populate(db_path: str, count: int) -> None:
+    db = DBManager(db_name=db_path)
+    filler = "lorem ipsum dolor sit amet " * 8
+    db.save_comments_bulk(
+        Comment(
+            video_id=VIDEO_ID,
+            published=datetime(2024, 1, 1),
+            author_display_name=f"Author {i}",
+            likes=i % 1000,
+            text=f"Comment {i} {filler}",
+        )
+        for i in range(count)
+    )
+    db._execute_query("UPDATE comment SET clean_text = text", commit=True)
+    close_all_pools()
+
+
+def consume(db_path: str, mode: str) -> None:
+    db = DBManager(db_name=db_path)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    total = 0
+    if mode == "materialized":
+        for comment in db.get_comments(VIDEO_ID):
+            total += len(comment["clean_text"])
+    else:
+        for chunk in db.iter_comments(VIDEO_ID, chunk_size=1000):
+            for comment in chunk:
+                total += len(comment["clean_text"])
+    elapsed = time.perf_counter() - start
+    print(f"{mode:12s}  {elapsed:6.2f} s  peak RSS +{peak_rss_mb() - baseline:7.1f} MB")
+
+
+def main(count: int = 200000) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "bench.db")
+        populate(db_path, count)
+        print(f"comments: {count}")
+        for mode in ("materialized", "streamed"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_comment_memory", "--consume", db_path, mode],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--consume":
+        consume(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,85 @@
+"""Prefiltering a video's comments before the LLM.
+
+Builds a comment section the way popular videos look: a share of emoji-only
+and one-word replies, jokes copied dozens of times with small edits, and
+distinct remarks, with heavy-tailed likes. Runs the prefilter the way
+LLMAnalysis.execute does outside map-reduce and reports the time it takes,
+what it dropped, and how the prompt tokens (here, words) compare with the
+top ``max_comments`` comments by likes that used to go out unfiltered,
+including how many of those tokens were noise or repeats.
+
+Usage:
+    python -m benchmarks.bench_comment_prefilter [comments]
+"""
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+os.environ.setdefault("TESTING", "true")
+
+from src.llm_analysis import LLMAnalysis  # noqa: E402
+
+WORDS = (
+    "audio video camera light edit intro music song part tutorial recipe price "
+    "voice mic slow fast long short explain step guitar chord bread dough oven "
+    "cat dog end start minute subtitle translate code bug error fix install"
+).split()
+NOISE = ["😂😂😂", "first!", "lol", "kkkkkkk", "🔥", "nice", "❤️❤️", "wow", "10/10", "!!!"]
+
+
+def make_comments(count, seed=5):
+    rng = random.Random(seed)
+    jokes = [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(40)]
+    comments = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.25:
+            text = rng.choice(NOISE)
+        elif roll < 0.55:
+            text = rng.choice(jokes) + rng.choice(["", "!", " lmao", "!!", " 😂"])
+            if rng.random() < 0.5:
+                text = text.upper()
+        else:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 40)))
+        likes = int(rng.paretovariate(1.2)) - 1
+        comments.append(
+            {"id": i, "text": text, "clean_text": text, "author_clean_name": f"User{i}", "likes": likes}
+        )
+    comments.sort(key=lambda c: -c["likes"])  # As get_comments returns them
+    return comments
+
+
+def main(count: int = 4000) -> None:
+    with patch("src.llm_analysis.DBManager"), patch(
+        "src.llm_analysis.tiktoken.encoding_for_model"
+    ) as encoding_for_model:
+        encoding_for_model.return_value.encode_ordinary.side_effect = str.split
+        analyzer = LLMAnalysis()
+
+    comments = make_comments(count)
+    analyzer._prefilter("bench", comments[: analyzer.max_comments], "English", sample=False)
+    top = analyzer.prefilter_report
+    start = time.perf_counter()
+    analyzer._prefilter("bench", comments, "English", sample=True)
+    elapsed = time.perf_counter() - start
+
+    report = analyzer.prefilter_report
+    print(f"candidates: {report['comments']}  ({report['tokens']} tokens)  {elapsed * 1000:.0f} ms")
+    print(
+        f"low-information: {report['low_information']} ({report['low_information_tokens']} tokens)  "
+        f"near-duplicates: {report['duplicates']} ({report['duplicate_tokens']} tokens)"
+    )
+    print(
+        f"top {analyzer.max_comments} by likes: {top['tokens']} tokens, "
+        f"{top['tokens_saved']} of them low-information or duplicates"
+    )
+    print(
+        f"prefiltered sample: {report['kept']} comments, {report['kept_tokens']} tokens, "
+        f"all informative and distinct"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
@@ -0,0 +1,53 @@
+"""Write-back throughput for per-row vs bulk comment updates.
+
+Usage:
+    python -m benchmarks.bench_comment_updates [comments]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.comment import Comment
+from src.db_manager import DBManager, close_all_pools
+
+
+def main(count: int = 20000) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = DBManager(db_name=os.path.join(tmpdir, "bench.db"))
+        db.save_comments_bulk(
+            Comment(
+                video_id="bench",
+                published=datetime(2024, 1, 1),
+                author_display_name=f"Author {i}",
+                likes=i,
+                text=f"Benchmark comment {i}",
+            )
+            for i in range(count)
+        )
+        ids = [row[0] for row in db._execute_query("SELECT id FROM comment", fetch_all=True)]
+        now = datetime.now()
+
+        start = time.perf_counter()
+        for comment_id in ids:
+            db.update_comment_sentiment(comment_id, 0.5, now)
+        per_row = time.perf_counter() - start
+
+        rows = [(comment_id, 0.25, now) for comment_id in ids]
+        results = {}
+        for label, threshold in (("executemany", len(ids) + 1), ("temp table", 0)):
+            db.TEMP_TABLE_THRESHOLD = threshold
+            start = time.perf_counter()
+            db.update_comments_sentiment_bulk(rows)
+            results[label] = time.perf_counter() - start
+        close_all_pools()
+
+    print(f"comments:               {count}")
+    print(f"per-row updates:        {per_row:9.3f} s")
+    for label, elapsed in results.items():
+        print(f"bulk ({label:11s}):    {elapsed:9.3f} s  ({per_row / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
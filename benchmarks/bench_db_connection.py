@@ -0,0 +1,43 @@
+"""Per-query overhead of DBManager on a file-backed database.
+
+Compares the legacy connect-per-query mode (``pooled=False``) against the
+pooled per-thread connections.
+
+Usage:
+    python -m benchmarks.bench_db_connection [queries]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from src.db_manager import DBManager, close_all_pools
+
+
+def run(db: DBManager, queries: int) -> float:
+    """Return the mean seconds per query for ``queries`` point lookups."""
+    start = time.perf_counter()
+    for i in range(queries):
+        db.video_exists(f"video_{i % 100}")
+    return (time.perf_counter() - start) / queries
+
+
+def main(queries: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "bench.db")
+        seed = DBManager(db_name=db_path, pooled=False)
+        for i in range(100):
+            seed.save_video_title(f"video_{i}", f"Title {i}")
+
+        unpooled = run(DBManager(db_name=db_path, pooled=False), queries)
+        pooled = run(DBManager(db_name=db_path), queries)
+        close_all_pools()
+
+    print(f"queries:            {queries}")
+    print(f"connect-per-query:  {unpooled * 1e6:9.1f} us/query")
+    print(f"pooled connection:  {pooled * 1e6:9.1f} us/query")
+    print(f"speedup:            {unpooled / pooled:9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,66 @@
+"""Near-duplicate clustering of persona items.
+
+Builds a list of extracted items the way merge_results sees them after many
+batches: 120 underlying issues, each reported many times with different
+casing, punctuation, articles and tense. Reports the time to cluster, how
+many entries survive exact dedup (the old dict.fromkeys) versus clustering,
+how many issues were wrongly merged into another, and how many duplicate
+entries remain.
+
+Usage:
+    python -m benchmarks.bench_item_clustering [items]
+"""
+import random
+import sys
+import time
+
+from src.item_clustering import ItemClusterer
+
+SUBJECTS = "video audio lighting camera editing intro music thumbnail pacing tutorial price app".split()
+COMPLAINTS = [
+    "is too long", "is too short", "quality is bad", "is confusing", "is too loud",
+    "is too dark", "needs subtitles", "has too many ads", "is hard to follow", "is outdated",
+]
+
+
+def variants(rng, base):
+    text = base
+    if rng.random() < 0.5:
+        text = "The " + text
+    if rng.random() < 0.3:
+        text = text.replace(" is ", " was ")
+    if rng.random() < 0.5:
+        text = text.lower()
+    return text + rng.choice(["", ".", "!", "..."])
+
+
+def make_items(count, seed=11):
+    rng = random.Random(seed)
+    bases = [f"{s.capitalize()} {c}" for s in SUBJECTS for c in COMPLAINTS]
+    return [variants(rng, rng.choice(bases)) for _ in range(count)]
+
+
+def issue_of(clusterer, item):
+    """Undo the variations applied by ``variants``."""
+    text = clusterer.normalize(item).replace(" was ", " is ")
+    return text[4:] if text.startswith("the ") else text
+
+
+def main(count: int = 5000) -> None:
+    items = make_items(count)
+    clusterer = ItemClusterer()
+    start = time.perf_counter()
+    clusters = clusterer.cluster(items)
+    elapsed = time.perf_counter() - start
+    print(f"items: {count}  underlying issues: {len(SUBJECTS) * len(COMPLAINTS)}")
+    print(f"dict.fromkeys      {len(dict.fromkeys(items)):6d} entries")
+    print(f"ItemClusterer      {len(clusters):6d} entries  {elapsed * 1000:7.1f} ms")
+    represented = {issue_of(clusterer, rep) for rep, _ in clusters}
+    print(
+        f"issues merged into another: {len(SUBJECTS) * len(COMPLAINTS) - len(represented)}  "
+        f"duplicate entries left: {len(clusters) - len(represented)}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
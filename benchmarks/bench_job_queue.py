@@ -0,0 +1,85 @@
+"""Serving persona requests: generating in the handler vs the job queue.
+
+Simulates concurrent users asking for personas from a few videos, each
+generation a sleep standing in for the pipeline. The synchronous run
+calls generate_persona in the request handler, one at a time as Gradio
+runs an event by default, as the web interface did; the queued run
+submits jobs from the handlers and waits for them. Prints how long the
+slowest request waited for its handler to return, the time until every
+persona was ready and how many pipeline runs were made.
+
+Usage:
+    python -m benchmarks.bench_job_queue [requests] [videos] [seconds_per_run]
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from src.db_manager import DBManager
+from src.jobs import JobQueue
+from tests.test_jobs import persona
+
+
+class SleepingGenerator:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def generate_persona(self, video_id, language="English", refresh=False):
+        with self._lock:
+            self.runs += 1
+        time.sleep(self.seconds)
+        return persona(video_id)
+
+
+def main(requests: int = 40, videos: int = 4, seconds_per_run: float = 0.2) -> None:
+    logging.getLogger("src.jobs").setLevel(logging.WARNING)
+    video_ids = [f"video{i % videos}" for i in range(requests)]
+    print(f"requests: {requests}  videos: {videos}  pipeline run: {seconds_per_run} s")
+
+    generator = SleepingGenerator(seconds_per_run)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as executor:  # Gradio's default concurrency_limit
+        handler_times = [
+            seconds for _, seconds in executor.map(lambda v: _timed(start, generator.generate_persona, v), video_ids)
+        ]
+    _report("generate in handler", handler_times, time.perf_counter() - start, generator.runs)
+
+    generator = SleepingGenerator(seconds_per_run)
+    db = DBManager(db_name=":memory:")
+    jobs = JobQueue(generator, db, workers=videos, poll_interval=0.01)
+    jobs.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests) as executor:
+        submitted = list(executor.map(lambda v: _timed(start, jobs.submit, v), video_ids))
+    handler_times = [seconds for _, seconds in submitted]
+    for job_id in {job_id for job_id, _ in submitted}:
+        jobs.wait(job_id)
+    _report("job queue", handler_times, time.perf_counter() - start, generator.runs)
+    jobs.stop()
+    db.close()
+
+
+def _timed(start: float, func, *args):
+    """func's result and the seconds from ``start``, when every request arrived, until it returned."""
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _report(label: str, handler_times, elapsed: float, runs: int) -> None:
+    worst = max(handler_times) * 1000
+    print(f"{label:20s} slowest request {worst:8.1f} ms  total {elapsed:6.2f} s  {runs:3d} pipeline runs")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.2,
+    )
@@ -0,0 +1,51 @@
+"""Keyword extraction over many videos: extractor per call vs model registry.
+
+Extracts YAKE keywords from synthetic per-video comment corpora, once
+building the extractor for every video (the old behaviour) and once
+through the model registry, which builds it once per process. Prints the
+time per video and the registry's load-time stats.
+
+Usage:
+    python -m benchmarks.bench_keywords [videos]
+"""
+import random
+import sys
+import time
+
+from src.keyword_extractor import KeywordExtractor, load_yake
+from src.model_registry import models
+
+WORDS = (
+    "camera battery screen audio video lesson editing music sound quality price light lens "
+    "great terrible amazing useful boring clear long short loud cheap expensive fast slow"
+).split()
+
+
+def make_corpus(rng, comments=20):
+    return "\n".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))) for _ in range(comments))
+
+
+def main(videos: int = 200) -> None:
+    rng = random.Random(11)
+    corpora = [make_corpus(rng) for _ in range(videos)]
+    print(f"videos: {videos}")
+
+    start = time.perf_counter()
+    for corpus in corpora:
+        load_yake("en", 40).extract_keywords(corpus)
+    per_call = time.perf_counter() - start
+    print(f"extractor per call   {per_call / videos * 1000:7.2f} ms/video")
+
+    models.clear()
+    extractor = KeywordExtractor()
+    start = time.perf_counter()
+    for corpus in corpora:
+        extractor.get_yake_keywords(corpus)
+    shared = time.perf_counter() - start
+    print(f"model registry       {shared / videos * 1000:7.2f} ms/video  ({per_call / shared:.1f}x)")
+    for name, stats in models.stats().items():
+        print(f"  {name}: loaded in {stats['load_seconds'] * 1000:.1f} ms, reused {stats['hits']} times")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
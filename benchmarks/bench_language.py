@@ -0,0 +1,89 @@
+"""Language detection throughput: langdetect per comment vs LanguageDetector.
+
+Generates labelled synthetic comments in the UI's languages (plus short
+ones no detector can place) and detects them with plain, seeded langdetect
+calls and with LanguageDetector, whose function-word prefilter settles most
+comments without langdetect. Reports comments/s, how many comments each
+path took, and accuracy on the comments long enough to carry a label.
+
+Usage:
+    python -m benchmarks.bench_language [comments]
+"""
+import random
+import sys
+import time
+
+from langdetect import DetectorFactory, LangDetectException, detect
+
+from src.language_detector import UNDETERMINED, LanguageDetector
+
+PHRASES = {
+    "en": ["this video is really helpful", "thanks for the great explanation", "I learned so much from you",
+           "the audio was a bit low but the content is amazing", "can you make a video about this topic"],
+    "pt": ["esse vídeo é muito bom", "obrigado pela explicação", "aprendi muito com você",
+           "o áudio está baixo mas o conteúdo é ótimo", "faz um vídeo sobre esse assunto por favor"],
+    "es": ["este video es muy bueno", "gracias por la explicación", "aprendí mucho contigo",
+           "el audio está bajo pero el contenido es excelente", "puedes hacer un video sobre este tema"],
+    "fr": ["cette vidéo est vraiment super", "merci pour l'explication", "j'ai beaucoup appris avec toi",
+           "le son est un peu bas mais le contenu est génial", "tu peux faire une vidéo sur ce sujet"],
+    "de": ["das Video ist wirklich gut", "danke für die Erklärung", "ich habe so viel gelernt",
+           "der Ton ist leise aber der Inhalt ist toll", "kannst du ein Video über das Thema machen"],
+}
+SHORT = ["first!", "lol", "❤️❤️", "nice", "wow", "10/10", "👍"]
+
+
+def make_comments(count, seed=5):
+    """``(text, language)`` pairs; short comments are labelled UNDETERMINED."""
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            comments.append((rng.choice(SHORT), UNDETERMINED))
+            continue
+        language = rng.choice(list(PHRASES))
+        phrases = rng.sample(PHRASES[language], rng.randint(1, 3))
+        ending = rng.choice(["", "!", " :)", "...", f" {rng.randint(1, 99)}/10"])
+        comments.append((", ".join(phrases) + ending, language))
+    return comments
+
+
+def plain_langdetect(text):
+    try:
+        return detect(text)
+    except LangDetectException:
+        return UNDETERMINED
+
+
+def report(name, results, labels, elapsed):
+    labelled = [(result, label) for result, label in zip(results, labels) if label != UNDETERMINED]
+    accuracy = sum(result == label for result, label in labelled) / len(labelled)
+    print(f"{name:18s} {len(results) / elapsed:9.0f} comments/s  accuracy {accuracy:7.2%}")
+
+
+def main(count: int = 5000) -> None:
+    comments = make_comments(count)
+    texts = [text for text, _ in comments]
+    labels = [label for _, label in comments]
+    print(f"comments: {count}  distinct: {len(set(texts))}")
+
+    DetectorFactory.seed = 0
+    plain_langdetect("warm up")  # Load the profiles outside the timing
+    start = time.perf_counter()
+    results = [plain_langdetect(text) for text in texts]
+    report("langdetect", results, labels, time.perf_counter() - start)
+
+    for name, cache_size in (("no cache", 0), ("cached", 100_000)):
+        detector = LanguageDetector(cache_size=cache_size)
+        detector._langdetect("warm up the profiles")
+        detector.langdetect_calls = 0
+        start = time.perf_counter()
+        results = detector.detect_many(texts)
+        report(f"detector {name}", results, labels, time.perf_counter() - start)
+        print(
+            f"  prefilter: {detector.prefiltered}  langdetect: {detector.langdetect_calls}  "
+            f"cached or too short: {count - detector.prefiltered - detector.langdetect_calls}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
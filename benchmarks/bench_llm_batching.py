@@ -0,0 +1,161 @@
+"""Batching time and request count for LLMAnalysis.batch_comments.
+
+Compares the previous batcher (one ``encode`` call per comment, unframed
+costs against a stale base prompt, batches filled in input order) with the
+current one (chunked threaded encoding, exact framed costs, best-fit
+decreasing packing) on 10k synthetic comments. A third run fills batches in
+input order from the exact costs, isolating what the packing saves.
+
+Uses the real gpt-4 tokenizer when tiktoken can load it. Offline it falls back
+to a tiktoken encoding whose vocabulary is the benchmark's own words (plus
+all bytes), so comments tokenize to roughly one token per word, as they
+would with cl100k_base.
+
+Usage:
+    python -m benchmarks.bench_llm_batching [comments]
+"""
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+import tiktoken
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from src.db_manager import DBManager
+from src.llm_analysis import LLMAnalysis
+
+WORDS = (
+    "great video thanks love this camera lens light editing tutorial please more "
+    "ótimo vídeo obrigado não entendi como fazer isso amei 😀 🔥 !!! ?"
+).split()
+
+LEGACY_BASE_PROMPT = """
+            Analyze the following YouTube comments. Extract and summarize:
+            - Common issues
+            - Common wishes
+            - Common pains
+            - Common expressions or catchphrases
+            - Name (Summarize all names into one)
+            - Gender (Summarize all genders into one, based on the average comments it should be male or female)
+            - Age (Summarize all ages into one, based on the content of the comments text which is related to age)
+            - Language (Summarize all languages into one, based on the content of the comments which is related to language)
+
+            Return your response as a single JSON object with four keys: "issues", "wishes", "pains", and "expressions". Each key should correspond to a list of strings (the extracted items).
+
+            Comments:
+        """
+
+
+def load_encoding():
+    try:
+        return tiktoken.encoding_for_model("gpt-4"), "gpt-4 (cl100k_base)"
+    except Exception:
+        return word_level_encoding(), "word-level fallback"
+
+
+def word_level_encoding():
+    """A tiktoken encoding that knows every byte and every benchmark word.
+
+    Each word enters the vocabulary through all of its byte prefixes, so BPE
+    can build it up one merge at a time.
+    """
+    words = WORDS + LEGACY_BASE_PROMPT.split() + ["Author", "Comment", ":"] + list("0123456789")
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in words:
+        for variant in (word.encode(), b" " + word.encode()):
+            for end in range(2, len(variant) + 1):
+                ranks.setdefault(variant[:end], len(ranks))
+    return tiktoken.Encoding(
+        name="bench_words",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+
+def make_comments(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "text": " ".join(rng.choice(WORDS) for _ in range(min(400, int(rng.paretovariate(1.5) * 8)))),
+            "author_clean_name": f"Author {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_batch_comments(analyzer, comments):
+    """The batcher before fused token accounting."""
+    base = analyzer.count_tokens(LEGACY_BASE_PROMPT)
+    max_batch_tokens = analyzer.max_tokens_per_request - base - analyzer.max_tokens_response
+    batches, current, current_tokens = [], [], 0
+    for comment in comments:
+        tokens = analyzer.count_tokens(f"{comment['text']} {comment.get('author_clean_name', '')}")
+        if current_tokens + tokens > max_batch_tokens:
+            if current:
+                batches.append(current)
+            current, current_tokens = [comment], tokens
+        else:
+            current.append(comment)
+            current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def in_order_batch_comments(analyzer, comments):
+    """Exact framed costs, but batches filled in input order."""
+    capacity = (
+        analyzer.max_tokens_per_request - analyzer.max_tokens_response
+        - analyzer._base_prompt_tokens("English")
+    )
+    costs = analyzer.count_tokens_batch([analyzer._format_comment(c) + "\n" for c in comments])
+    batches, current, current_tokens = [], [], 0
+    for comment, cost in zip(comments, costs):
+        if current and current_tokens + cost > capacity:
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(comment)
+        current_tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def overflowing(analyzer, batches):
+    """Batches whose real request exceeds max_tokens_per_request."""
+    requests = analyzer._build_requests(batches, "English")
+    limit = analyzer.max_tokens_per_request - analyzer.max_tokens_response
+    return sum(request["prompt_tokens"] > limit for request in requests)
+
+
+def main(count: int = 10000) -> None:
+    encoding, label = load_encoding()
+    with patch("src.llm_analysis.DBManager", return_value=DBManager(db_name=":memory:")), \
+            patch("src.llm_analysis.tiktoken.encoding_for_model", return_value=encoding):
+        analyzer = LLMAnalysis()
+    comments = make_comments(count)
+    print(f"comments: {count}  tokenizer: {label}  threads: {analyzer.tokenizer_threads}")
+    runs = {
+        "legacy": lambda: legacy_batch_comments(analyzer, comments),
+        "exact, in order": lambda: in_order_batch_comments(analyzer, comments),
+        "exact, best fit": lambda: analyzer.batch_comments(comments),
+    }
+    for name, run in runs.items():
+        elapsed = float("inf")
+        for _ in range(3):  # Best of three
+            start = time.perf_counter()
+            batches = run()
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print(
+            f"{name:20s} {elapsed * 1000:8.1f} ms  {len(batches):4d} batches  "
+            f"{overflowing(analyzer, batches):3d} over the request budget"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,71 @@
+"""LLM analysis wall-clock time against a local fake chat-completions server.
+
+Runs LLMAnalysis.execute on a 400-comment video with one batch in flight at a
+time (the old behaviour, minus its fixed 2 s pause between batches) and with
+the default concurrency, then once more with every reply already in the LLM
+cache. The server sleeps for a simulated model latency on
+every request. Tokens are counted as whitespace-separated words so the
+benchmark runs offline.
+
+Usage:
+    python -m benchmarks.bench_llm_executor [latency_s]
+"""
+import os
+import random
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from src.db_manager import DBManager
+from src.llm_analysis import LLMAnalysis
+from src.llm_cache import LLMCache
+from tests.fakes import FakeChatServer
+
+WORDS = "great video thanks love this camera lens light editing tutorial please more".split()
+
+
+def make_comments(count=400, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+            "clean_text": "",
+            "author_clean_name": f"Author{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def main(latency: float = 1.0) -> None:
+    db = MagicMock(spec=DBManager)
+    db.get_comments.return_value = make_comments()
+    with patch("src.llm_analysis.DBManager", return_value=db), \
+            patch("src.llm_analysis.tiktoken.encoding_for_model") as encoding_for_model, \
+            FakeChatServer(latency=latency) as server:
+        encoding_for_model.return_value.encode_ordinary.side_effect = str.split
+        analyzer = LLMAnalysis()
+        analyzer.base_url = server.base_url
+        cache = LLMCache(DBManager(db_name=":memory:"))
+        batches = len(analyzer.batch_comments(db.get_comments.return_value))
+        print(f"comments: 400  batches: {batches}  latency: {latency} s/request")
+        runs = [
+            ("max_concurrency=1", 1, True),
+            (f"max_concurrency={analyzer.max_concurrency}", analyzer.max_concurrency, True),
+            ("rerun, cached", analyzer.max_concurrency, False),
+        ]
+        for label, concurrency, bypass in runs:
+            analyzer.max_concurrency = concurrency
+            analyzer.cache = cache
+            cache.bypass = bypass
+            requests_before = len(server.requests)
+            start = time.perf_counter()
+            analyzer.execute("bench_video")
+            elapsed = time.perf_counter() - start
+            print(f"{label:20s} {elapsed:7.2f} s  {len(server.requests) - requests_before} API calls")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
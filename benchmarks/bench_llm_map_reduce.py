@@ -0,0 +1,67 @@
+"""Map-reduce LLM analysis of a large video against a local fake server.
+
+Analyzes 50k synthetic comments with LLMAnalysis.execute(map_reduce=True) and
+reports, per tier, the requests sent and the time taken, plus how many
+comments the token budget covered and the tokens the run could have spent.
+Rate limits are lifted so the run measures the pipeline, not the limiter.
+Tokens are counted as whitespace-separated words so the benchmark runs
+offline.
+
+Usage:
+    python -m benchmarks.bench_llm_map_reduce [comments] [token_budget]
+"""
+import os
+import sys
+import time
+from unittest.mock import MagicMock, patch
+
+os.environ.setdefault("TESTING", "true")  # Test API keys; no .env needed
+
+from benchmarks.bench_llm_executor import make_comments
+from src.db_manager import DBManager
+from src.llm_analysis import LLMAnalysis
+from tests.fakes import FakeChatServer, map_reduce_reply
+
+
+def main(count: int = 50000, token_budget: int = 2_000_000) -> None:
+    db = MagicMock(spec=DBManager)
+    db.get_comments.return_value = make_comments(count)
+    with patch("src.llm_analysis.DBManager", return_value=db), \
+            patch("src.llm_analysis.tiktoken.encoding_for_model") as encoding_for_model, \
+            FakeChatServer(latency=0.05, reply=map_reduce_reply) as server:
+        encoding_for_model.return_value.encode_ordinary.side_effect = str.split
+        analyzer = LLMAnalysis()
+        analyzer.base_url = server.base_url
+        analyzer.cache.bypass = True
+        analyzer.token_budget = token_budget
+        analyzer.requests_per_minute = analyzer.tokens_per_minute = 10**9
+
+        tiers = {}
+
+        def progress(tier, done, total):
+            now = time.perf_counter()
+            started, _, _ = tiers.get(tier, (now, 0, total))
+            tiers[tier] = (started, now, total)
+
+        start = time.perf_counter()
+        analyzer.execute("bench_video", map_reduce=True, progress=progress)
+        elapsed = time.perf_counter() - start
+
+    covered = sum(
+        prompt["messages"][1]["content"].count("\nComment: ")
+        for prompt in server.requests
+        if "Partial analyses:" not in prompt["messages"][1]["content"]
+    )
+    spent = sum(
+        len(" ".join(m["content"] for m in r["messages"]).split()) + r["max_tokens"] + 11
+        for r in server.requests
+    )
+    print(f"comments: {count}  analyzed: {covered}  token budget: {token_budget}  upper bound spent: {spent}")
+    for tier, (started, finished, total) in sorted(tiers.items()):
+        name = "map" if tier == 0 else "reduce"
+        print(f"tier {tier} ({name:6s}) {total:5d} requests  {finished - started:6.2f} s")
+    print(f"total {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,59 @@
+"""Mining throughput at 1, 2, 4 and 8 cleaning processes.
+
+Each run mines the same synthetic video from a fresh on-disk database and
+checks that the output matches the serial run.
+
+Usage:
+    python -m benchmarks.bench_mining_workers [comments]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from src.comment import Comment
+from src.db_manager import DBManager, close_all_pools
+from src.mining import Mining
+
+SAMPLES = [
+    "@daniel I want that camera at #Bestbuy. http://bit.ly//WR4Rt great review..",
+    "This is the best explanation I have seen so far kkkkk thanks a lot!!",
+    "rsrs I tried this at home https://example.com/watch?v=abc&t=42s and it worked #diy",
+    "Could you make a follow up video about the settings you used? The lighting looks great.",
+]
+
+
+def mine(db_path: str, count: int, workers: int):
+    db = DBManager(db_name=db_path)
+    db.save_comments_bulk(
+        Comment(
+            video_id="bench",
+            published=datetime(2024, 1, 1),
+            author_display_name=f"@Author #{i}",
+            likes=i % 500,
+            text=f"{SAMPLES[i % len(SAMPLES)] * 3} {i}",
+        )
+        for i in range(count)
+    )
+    start = time.perf_counter()
+    Mining(workers=workers, chunk_size=2000, db=db).execute("bench")
+    elapsed = time.perf_counter() - start
+    mined = db.get_comments("bench", columns=("id", "clean_text", "author_clean_name"), row_format="tuple")
+    return elapsed, sorted(mined)
+
+
+def main(count: int = 100000) -> None:
+    print(f"comments: {count}  cpus: {os.cpu_count()}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for workers in (1, 2, 4, 8):
+            elapsed, mined = mine(os.path.join(tmpdir, f"bench_{workers}.db"), count, workers)
+            baseline = baseline or mined
+            same = "identical" if mined == baseline else "MISMATCH"
+            print(f"workers={workers}  {elapsed:6.2f} s  {count / elapsed:9.0f} comments/s  {same}")
+            close_all_pools()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,64 @@
+"""Sentiment scoring throughput and agreement with the per-comment scorer.
+
+Scores synthetic English comments the way Analysis used to, one
+SentimentAnalyser.sentiment call per comment, and then with score_many per
+backend and worker count. Reports comments/s and how often each result
+agrees with the old output: exactly, and after _round_polarity (negative,
+neutral or positive).
+
+Usage:
+    python -m benchmarks.bench_sentiment [comments]
+"""
+import os
+import random
+import sys
+import time
+
+from src.sentiment_analyzer import SentimentAnalyser
+
+OPENERS = ["", "honestly ", "wow ", "well ", "ok so ", "lol "]
+SUBJECTS = ["this video", "the audio", "your explanation", "the editing", "this channel", "the ending", "it"]
+VERBS = ["is", "was", "looks", "seems", "is not", "was never", "isn't", "is really", "is not very"]
+ADJECTIVES = [
+    "good", "great", "bad", "terrible", "amazing", "boring", "helpful", "confusing", "perfect",
+    "awful", "interesting", "slow", "beautiful", "wrong", "funny", "clear", "useless", "nice",
+]
+TAILS = ["", "!", "!!", ".", " thanks", " but the music is too loud", " and I learned a lot", " 10/10"]
+
+
+def make_texts(count, seed=3):
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(OPENERS)}{rng.choice(SUBJECTS)} {rng.choice(VERBS)} "
+        f"{rng.choice(ADJECTIVES)}{rng.choice(TAILS)}"
+        for _ in range(count)
+    ]
+
+
+def main(count: int = 20000) -> None:
+    texts = make_texts(count)
+    print(f"comments: {count}  cpus: {os.cpu_count()}")
+
+    reference = SentimentAnalyser()
+    start = time.perf_counter()
+    baseline = [reference.sentiment(text) for text in texts]
+    elapsed = time.perf_counter() - start
+    print(f"{'sentiment() per comment':28s} {count / elapsed:9.0f} comments/s")
+    classes = [reference._round_polarity(p) for p in baseline]
+
+    for backend, workers in (("textblob", 1), ("textblob", 2), ("textblob", 4), ("lexicon", 1), ("lexicon", 2)):
+        with SentimentAnalyser(backend, workers) as analyser:
+            analyser.score_many(texts[:10])  # Load the backend outside the timing
+            start = time.perf_counter()
+            scores = analyser.score_many(texts)
+            elapsed = time.perf_counter() - start
+        exact = sum(abs(a - b) < 1e-9 for a, b in zip(scores, baseline)) / count
+        same_class = sum(reference._round_polarity(s) == c for s, c in zip(scores, classes)) / count
+        print(
+            f"{backend:8s} workers={workers}          {count / elapsed:9.0f} comments/s  "
+            f"exact {exact:7.2%}  same class {same_class:7.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
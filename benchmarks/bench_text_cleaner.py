@@ -0,0 +1,58 @@
+"""Micro-benchmarks for comment cleaning over synthetic comment corpora.
+
+Compares the legacy multi-pass pipeline (findall + replace per link, split and
+re-join, three artefact replaces) with TextCleaner.clean_comment and the
+batch clean_many API.
+
+Usage:
+    python -m benchmarks.bench_text_cleaner [comments_per_corpus]
+"""
+import random
+import sys
+import timeit
+
+from src.text_cleaner import TextCleaner
+from tests.test_text_cleaner import legacy_clean_comment
+
+SHORT = ["first!", "lol", "great video", "kkkkk", "rsrs", "thanks!!", "nice 😀", "@ana", "#tbt"]
+SENTENCES = [
+    "This is exactly what I was looking for, thank you so much for sharing.",
+    "I tried this at home and it worked on the first attempt..",
+    "Could you make a follow up about the settings you used for the lighting?",
+    "Eu adorei esse vídeo kkkkk muito bom mesmo rsrs",
+    "The audio is a bit low at the start but the rest is perfect.",
+]
+LINKS = ["http://bit.ly//WR4Rt", "https://youtu.be/dQw4w9WgXcQ?t=42", "https://example.com/a/b?c=d&e=f"]
+
+
+def corpus(kind, count, rng):
+    if kind == "short chat":
+        return [" ".join(rng.choices(SHORT, k=rng.randint(1, 4))) for _ in range(count)]
+    if kind == "sentences":
+        return [" ".join(rng.choices(SENTENCES, k=rng.randint(1, 3))) for _ in range(count)]
+    if kind == "link heavy":
+        return [
+            f"@user{i} {rng.choice(SENTENCES)} {rng.choice(LINKS)} #tag {rng.choice(LINKS)}"
+            for i in range(count)
+        ]
+    return [" ".join(rng.choices(SENTENCES, k=20)) for _ in range(count)]  # long paragraphs
+
+
+def main(count: int = 20000) -> None:
+    rng = random.Random(42)
+    cleaner = TextCleaner()
+    print(f"{'corpus':14s} {'legacy':>12s} {'clean_comment':>14s} {'clean_many':>12s}   (us/comment)")
+    for kind in ("short chat", "sentences", "link heavy", "long paragraphs"):
+        texts = corpus(kind, count, rng)
+        assert cleaner.clean_many(texts) == [legacy_clean_comment(t) for t in texts]
+        timings = [
+            min(timeit.repeat(lambda: [legacy_clean_comment(t) for t in texts], number=1, repeat=3)),
+            min(timeit.repeat(lambda: [cleaner.clean_comment(t) for t in texts], number=1, repeat=3)),
+            min(timeit.repeat(lambda: cleaner.clean_many(texts), number=1, repeat=3)),
+        ]
+        legacy, single, batch = (t / count * 1e6 for t in timings)
+        print(f"{kind:14s} {legacy:12.2f} {single:14.2f} {batch:12.2f}   ({legacy / batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -5,6 +5,7 @@ setup(
     version="0.1",
     packages=find_packages(),
     include_package_data=True,
+    package_data={"src": ["data/*.csv"]},
     install_requires=[
         line.strip()
         for line in open("requirements.txt")
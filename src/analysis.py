@@ -1,109 +1,308 @@
 import logging
+import time
 from .db_manager import DBManager
 from .gender_analyzer import GenderAnalyzer
+from .language_detector import UNDETERMINED, LanguageDetector
 from .sentiment_analyzer import SentimentAnalyser
+from .text_cleaner import TextCleaner
 
 # Comment class might not be directly needed here if we use dicts from db_manager
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from .keyword_extractor import KeywordExtractor
 
 logger = logging.getLogger(__name__)
 
 
+class AnalysisTask:
+    """One analysis in the single pass over a video's comments.
+
+    The pass reads the union of every task's ``columns`` once and hands
+    each chunk of comment dicts to the tasks in order, so a task sees what
+    earlier ones set on the dicts (the language, for sentiment). process()
+    returns ``(comment_id, value)`` pairs that the pass buffers and hands
+    to write() in batches; finish() runs after the last chunk, and close()
+    always runs at the end.
+    """
+
+    name = ""
+    columns: Tuple[str, ...] = ()
+
+    def start(self, video_id: str) -> None:
+        pass
+
+    def process(self, comments: List[Dict[str, Any]]) -> List[Tuple[int, Any]]:
+        return []
+
+    def write(self, rows: List[Tuple[int, Any, datetime]]) -> None:
+        pass
+
+    def finish(self, video_id: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class LanguageTask(AnalysisTask):
+    """Detects the language of comments that do not have one yet."""
+
+    name = "language"
+    columns = ("id", "text", "language")
+
+    def __init__(self, db: DBManager):
+        self.db = db
+        self.detector = LanguageDetector()
+        self.cleaner = TextCleaner()
+
+    def process(self, comments):
+        # The raw text: clean_text has chat artefacts ("rs", "kk") cut out of words
+        todo = [c for c in comments if c["language"] is None]
+        if not todo:
+            return []
+        languages = self.detector.detect_many([self.cleaner.strip_entities_links(c["text"]) for c in todo])
+        for comment, language in zip(todo, languages):
+            comment["language"] = language  # For the sentiment task
+        return [(c["id"], c["language"]) for c in todo]
+
+    def write(self, rows):
+        self.db.update_comments_language_bulk(rows)
+
+    def finish(self, video_id):
+        logger.info(
+            f"Language detection for video {video_id}: {self.detector.prefiltered} comments settled "
+            f"by the prefilter, {self.detector.langdetect_calls} by langdetect"
+        )
+
+
+class SentimentTask(AnalysisTask):
+    """Scores every comment's clean_text with its language's sentiment lexicon."""
+
+    name = "sentiment"
+    columns = ("id", "clean_text", "language")
+
+    def __init__(self, db: DBManager, backend: str = "textblob", workers: Optional[int] = None):
+        self.db = db
+        self.sentiment_analyzer = SentimentAnalyser(backend, workers)
+
+    def process(self, comments):
+        by_language = {}
+        for comment in comments:
+            # clean_text is already stripped of links and entities by Mining
+            if comment["clean_text"]:
+                by_language.setdefault(comment["language"], []).append(comment)
+
+        updates = []
+        for language, group in by_language.items():
+            polarities = self.sentiment_analyzer.score_many([c["clean_text"] for c in group], language)
+            updates += [
+                (c["id"], polarity)
+                for c, polarity in zip(group, polarities)
+                if polarity is not None  # No lexicon for the language; left NULL
+            ]
+        return updates
+
+    def write(self, rows):
+        self.db.update_comments_sentiment_bulk(rows)
+
+    def close(self):
+        self.sentiment_analyzer.close()
+
+
+class GenderTask(AnalysisTask):
+    """Infers the author gender of comments that do not have one yet."""
+
+    name = "gender"
+    columns = ("id", "author_clean_name", "author_gender")
+
+    def __init__(self, db: DBManager, gender_analyzer: GenderAnalyzer):
+        self.db = db
+        self.gender_analyzer = gender_analyzer
+        self.names_found = 0
+
+    def process(self, comments):
+        authors_names = [
+            {"id": str(c["id"]), "name": c["author_clean_name"]}  # GenderAnalyzer expects id as string
+            for c in comments
+            if c["author_gender"] is None and c["author_clean_name"]
+        ]
+        if not authors_names:
+            return []
+        self.names_found += len(authors_names)
+
+        return [
+            (int(item["id"]), "M" if item["gender"] == "male" else "F")
+            for item in self.gender_analyzer.get_names_genders(authors_names)
+            if item["gender"] is not None  # Name does not tell; left NULL
+        ]
+
+    def write(self, rows):
+        self.db.update_comments_gender_bulk(rows)
+
+    def finish(self, video_id):
+        if not self.names_found:
+            logger.info(f"No names found for gender analysis for video {video_id}")
+
+
+class KeywordTask(AnalysisTask):
+    """Collects the video's comments per language and saves their YAKE keywords."""
+
+    name = "keywords"
+    columns = ("clean_text", "language")
+
+    def __init__(self, db: DBManager, keyword_count: int = 40, min_keyword_share: float = 0.05):
+        self.db = db
+        self.keyword_count = keyword_count
+        self.min_keyword_share = min_keyword_share
+        self.corpus: Dict[str, List[str]] = {}  # Texts per language
+
+    def process(self, comments):
+        for comment in comments:
+            if comment["clean_text"]:  # Ensure text is not empty
+                self.corpus.setdefault(comment["language"] or UNDETERMINED, []).append(comment["clean_text"])
+        return []
+
+    def corpora(self) -> List[Tuple[str, List[str], int]]:
+        """Split the corpus into ``(language, texts, keyword count)`` groups.
+
+        Undetermined comments, and languages under ``min_keyword_share`` of
+        the comments, join the main language; each group gets a share of
+        ``keyword_count`` in proportion to its comments.
+        """
+        corpus = self.corpus
+        total = sum(len(texts) for texts in corpus.values())
+        main = max(corpus, key=lambda language: (language != UNDETERMINED, len(corpus[language])))
+        groups = {main: []}
+        for language, texts in corpus.items():
+            if language == UNDETERMINED or len(texts) < self.min_keyword_share * total:
+                language = main
+            groups.setdefault(language, []).extend(texts)
+        return [
+            (
+                "en" if language == UNDETERMINED else language,
+                texts,
+                max(1, round(self.keyword_count * len(texts) / total)),
+            )
+            for language, texts in sorted(groups.items(), key=lambda group: -len(group[1]))
+        ]
+
+    def finish(self, video_id):
+        """Replace the video's keywords, so a rerun does not add a second set."""
+        keywords = []
+        if not self.corpus:
+            logger.info(f"No text found for keyword extraction for video {video_id}")
+        else:
+            keyword_extractor = KeywordExtractor()
+            for language, texts, top in self.corpora():
+                # get_yake_keywords returns (text, score) tuples
+                keywords += keyword_extractor.get_yake_keywords("\n".join(texts), language, top)
+        self.db.replace_comment_keywords(video_id, keywords)
+
+
 class Analysis:
 
+    TASKS = ("language", "sentiment", "gender", "keywords")  # Built-in tasks, in pass order
+
     def __init__(self) -> None:
         self.db = DBManager()
         # self.db.connect() # REMOVED
+        self.sentiment_backend = "textblob"  # Or "lexicon", vectorized and much faster
+        self.sentiment_workers = None  # Scoring processes; None scores in-process
+        self.keyword_count = 40  # Keywords per video, shared out between its languages
+        self.min_keyword_share = 0.05  # Smaller languages join the main one for keywords
+        self.enabled = dict.fromkeys(self.TASKS, True)  # Switch a task off by name
+        self.extra_tasks: List[AnalysisTask] = []  # Run after the built-in ones
+        self.chunk_size = 1000  # Comments read per chunk
+        self.flush_rows = 5000  # Buffered results per task before they are written
+        self.report: Dict[str, Any] = {}  # Figures of the last pass
 
-    def _set_sentiments(self, video_id) -> None:
-        logger.info(f"Starting sentiment analysis for video {video_id}")
-        sentiment_analyzer = SentimentAnalyser()
-
-        comments_data = self.db.get_comments(
-            video_id, no_sentiment=False
-        )  # get_comments returns list of dicts
-        for comment_dict in comments_data:
-            comment_id = comment_dict["id"]
-            clean_text = comment_dict["clean_text"]
-            if clean_text:  # Ensure text is not empty for sentiment analysis
-                polarity = sentiment_analyzer.sentiment(clean_text)
-                self.db.update_comment_sentiment(comment_id, polarity, datetime.now())
-            else:
-                logger.debug(
-                    f"Skipping sentiment analysis for comment_id {comment_id} due to empty clean_text."
-                )
-
-        # self.db.con.commit() # REMOVED - Handled by DBManager method
-        logger.info(f"Finished sentiment analysis for video {video_id}")
+    def _build_task(self, name: str) -> AnalysisTask:
+        if name == "language":
+            return LanguageTask(self.db)
+        if name == "sentiment":
+            return SentimentTask(self.db, self.sentiment_backend, self.sentiment_workers)
+        if name == "gender":
+            return GenderTask(self.db, GenderAnalyzer(self.db))
+        if name == "keywords":
+            return KeywordTask(self.db, self.keyword_count, self.min_keyword_share)
+        raise ValueError(f"Unknown analysis task {name!r}; expected one of {self.TASKS}")
 
-    def _set_genders(self, video_id) -> None:
-        logger.info(f"Starting gender analysis for video {video_id}")
-        gender_analyzer = GenderAnalyzer()
-        authors_names = (
-            []
-        )  # This list will contain dicts like {'id': comment_id, 'name': author_name}
-
-        comments_data = self.db.get_comments(
-            video_id, no_gender=True
-        )  # get_comments returns list of dicts
-        for comment_dict in comments_data:
-            comment_id = comment_dict["id"]
-            author_clean_name = comment_dict["author_clean_name"]
-            if author_clean_name:  # Ensure name is not empty for gender analysis
-                authors_names.append(
-                    {"id": str(comment_id), "name": author_clean_name}
-                )  # GenderAnalyzer expects id as string
-            else:
-                logger.debug(
-                    f"Skipping gender analysis for comment_id {comment_id} due to empty author_clean_name."
-                )
+    def tasks(self) -> List[AnalysisTask]:
+        """The enabled tasks, in the order the pass runs them."""
+        tasks = [self._build_task(name) for name in self.TASKS if self.enabled.get(name, True)]
+        return tasks + [task for task in self.extra_tasks if self.enabled.get(task.name, True)]
 
-        if not authors_names:
-            logger.info(f"No names found for gender analysis for video {video_id}")
-            return
-
-        gender_list = gender_analyzer.get_names_genders(authors_names)
-        for item in gender_list:  # GenderAnalyzer returns a list of dicts
-            comment_id_str = item["id"]
-            gender_code = "M" if item["gender"] == "male" else "F"
-            self.db.update_comment_gender(
-                int(comment_id_str), gender_code, datetime.now()
-            )
+    def run_tasks(self, video_id, tasks: Sequence[AnalysisTask]) -> Dict[str, Any]:
+        """Stream the video's comments once through ``tasks``; returns the pass report."""
+        started = time.perf_counter()
+        columns = tuple(dict.fromkeys(("id",) + tuple(c for task in tasks for c in task.columns)))
+        seconds = {task.name: 0.0 for task in tasks}
+        pending = {task.name: [] for task in tasks}
+        rows_read = chunks = chars_read = 0
 
-        # self.db.con.commit() # REMOVED - Handled by DBManager method
-        logger.info(f"Finished gender analysis for video {video_id}")
+        def timed(task, method, *args):
+            start = time.perf_counter()
+            result = getattr(task, method)(*args)
+            seconds[task.name] += time.perf_counter() - start
+            return result
 
-    def _set_comment_keywords(self, video_id) -> None:
-        logger.info(f"Starting keyword extraction for video {video_id}")
-        corpus = []
-        comments_data = self.db.get_comments(
-            video_id
-        )  # get_comments returns list of dicts
-        for comment_dict in comments_data:
-            clean_text = comment_dict["clean_text"]
-            if clean_text:  # Ensure text is not empty
-                corpus.append(clean_text)
-
-        if not corpus:
-            logger.info(f"No text found for keyword extraction for video {video_id}")
-            return
+        def flush(task):
+            if pending[task.name]:
+                timed(task, "write", pending[task.name])
+                pending[task.name] = []
+
+        try:
+            for task in tasks:
+                timed(task, "start", video_id)
+            for comments in self.db.iter_comments(video_id, chunk_size=self.chunk_size, columns=columns):
+                chunks += 1
+                rows_read += len(comments)
+                chars_read += sum(len(value) for c in comments for value in c.values() if isinstance(value, str))
+                now = datetime.now()
+                for task in tasks:
+                    pending[task.name] += [(i, value, now) for i, value in timed(task, "process", comments)]
+                    if len(pending[task.name]) >= self.flush_rows:
+                        flush(task)
+            for task in tasks:
+                flush(task)
+                timed(task, "finish", video_id)
+        finally:
+            for task in tasks:
+                task.close()
 
-        keyword_extractor = KeywordExtractor()
-        keywords = keyword_extractor.get_yake_keywords("\n".join(corpus))
-        for (
-            keyword_text,
-            keyword_score,
-        ) in keywords:  # Adjusted to expect tuple from get_yake_keywords
-            self.db.save_comment_keyword(video_id, keyword_text, keyword_score)
+        report = {
+            "video_id": video_id,
+            "seconds": time.perf_counter() - started,
+            "rows_read": rows_read,
+            "chunks": chunks,
+            "columns": columns,
+            "chars_read": chars_read,
+            "task_seconds": seconds,
+        }
+        logger.info(
+            f"Analysed video {video_id} in {report['seconds']:.2f}s: one pass over {rows_read} comments "
+            f"({len(columns)} columns, {chars_read} characters of text) for "
+            + ", ".join(f"{name} {s:.2f}s" for name, s in seconds.items())
+        )
+        return report
 
-        # self.db.con.commit() # REMOVED - Handled by DBManager method
-        logger.info(f"Finished keyword extraction for video {video_id}")
+    def _run_task(self, video_id, name: str) -> None:
+        self.report = self.run_tasks(video_id, [self._build_task(name)])
+
+    def _set_languages(self, video_id) -> None:
+        self._run_task(video_id, "language")
+
+    def _set_sentiments(self, video_id) -> None:
+        self._run_task(video_id, "sentiment")
+
+    def _set_genders(self, video_id) -> None:
+        self._run_task(video_id, "gender")
+
+    def _set_comment_keywords(self, video_id) -> None:
+        self._run_task(video_id, "keywords")
 
     def execute(self, video_id) -> None:
         logger.info(f"Starting full analysis phase for video {video_id}")
-        self._set_sentiments(video_id)
-        self._set_genders(video_id)
-        self._set_comment_keywords(video_id)
+        self.report = self.run_tasks(video_id, self.tasks())
         # self.db.close() # REMOVED - Handled by DBManager context manager
         logger.info(f"Finished full analysis phase for video {video_id}")
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import gradio as gr
 from pathlib import Path
@@ -17,6 +18,8 @@ logger = logging.getLogger(__name__)
 
 from src.db_manager import DBManager  # Moved up
 from src.services import PersonaGenerator, PersonaData  # Moved up
+from src.jobs import JobQueue
+from src.pipeline import DONE, FAILED
 
 # from main import main # main is used in services.py, not directly here anymore
 # from llm_analysis import LLMAnalysis # LLMAnalysis is used in services.py
@@ -30,6 +33,9 @@ class PersonaUI:
         self.db = (
             DBManager()
         )  # DBManager instance for PersonaUI specific tasks like get_video_list
+        self.jobs = JobQueue(self.generator)  # Pipelines run here, not in event handlers
+        self.jobs.start()
+        self.poll_seconds = 1.0  # Between progress updates of a running job
 
     def _format_for_display(self, persona: PersonaData) -> Tuple:
         """Format persona data for Gradio display"""
@@ -51,10 +57,42 @@ class PersonaUI:
             persona.status,
         )
 
-    def process_video(self, video_id: str, language: str) -> Tuple:
-        """Process video and format for display"""
-        persona = self.generator.generate_persona(video_id, language)
-        return self._format_for_display(persona)
+    def submit_job(self, video_id: str, language: str) -> Tuple:
+        """Queue a persona job; returns the job ID (None if refused) and a status line"""
+        try:
+            job_id = self.jobs.submit(video_id, language)
+        except ValueError as e:
+            return None, str(e)
+        return job_id, f"Job {job_id} queued for video {video_id.strip()}"
+
+    def _format_progress(self, job: dict) -> str:
+        """One status line: the job's state and each pipeline stage's"""
+        stages = ", ".join(f"{name} {state}" for name, state in job["stages"].items())
+        return f"Job {job['id']} {job['status']}" + (f": {stages}" if stages else "")
+
+    async def follow_job(self, job_id):
+        """Stream a job's progress to the status box, then its persona.
+
+        Waits without holding a worker thread, so any number of users can
+        follow their jobs while the pipelines run in the background. The
+        status reads are SQLite queries, so they run off the event loop.
+        """
+        no_change = (gr.update(),) * 9
+        if job_id is None:
+            return
+        while True:
+            job = await asyncio.to_thread(self.jobs.status, job_id)
+            if job is None:
+                yield no_change + (f"Job {job_id} not found",)
+                return
+            if job["status"] in (DONE, FAILED) and job["persona"]:
+                yield self._format_for_display(job["persona"])
+                return
+            if job["status"] == FAILED:
+                yield no_change + (f"Job {job_id} failed: {job['error']}",)
+                return
+            yield no_change + (self._format_progress(job),)
+            await asyncio.sleep(self.poll_seconds)
 
     def get_video_list(self) -> List[Tuple[str, str]]:
         """Get list of available videos"""
@@ -204,27 +242,37 @@ class PersonaUI:
                                 col_count=(1, "fixed"),
                             )
 
-            # Event handlers with loading states
+            # Event handlers with loading states. Jobs run in the background
+            # queue; the handlers only queue them and stream their progress.
+            job_state = gr.State(None)
+            persona_outputs = [
+                persona_title,
+                persona_name,
+                persona_gender,
+                persona_age,
+                persona_language,
+                issues_list,
+                wishes_list,
+                pains_list,
+                vocab_list,
+                status_output,
+            ]
+
             submit_btn.click(
-                fn=lambda: (gr.Button(interactive=False), "Generating persona..."),
+                fn=lambda: (gr.Button(interactive=False), "Queuing persona job..."),
                 inputs=None,
                 outputs=[submit_btn, status_output],
                 queue=False,
             ).then(
-                fn=self.process_video,
+                fn=self.submit_job,
                 inputs=[video_id_input, language_input],
-                outputs=[
-                    persona_title,
-                    persona_name,
-                    persona_gender,
-                    persona_age,
-                    persona_language,
-                    issues_list,
-                    wishes_list,
-                    pains_list,
-                    vocab_list,
-                    status_output,
-                ],
+                outputs=[job_state, status_output],
+                concurrency_limit=None,
+            ).then(
+                fn=self.follow_job,
+                inputs=job_state,
+                outputs=persona_outputs,
+                concurrency_limit=None,
             ).then(
                 fn=lambda: gr.Button(interactive=True),
                 inputs=None,
@@ -242,20 +290,15 @@ class PersonaUI:
                 outputs=[load_btn, status_output],
                 queue=False,
             ).then(
-                fn=self.process_video,
-                inputs=video_list,
-                outputs=[
-                    persona_title,
-                    persona_name,
-                    persona_gender,
-                    persona_age,
-                    persona_language,
-                    issues_list,
-                    wishes_list,
-                    pains_list,
-                    vocab_list,
-                    status_output,
-                ],
+                fn=self.submit_job,
+                inputs=[video_list, language_input],
+                outputs=[job_state, status_output],
+                concurrency_limit=None,
+            ).then(
+                fn=self.follow_job,
+                inputs=job_state,
+                outputs=persona_outputs,
+                concurrency_limit=None,
             ).then(
                 fn=lambda: gr.Button(interactive=True),
                 inputs=None,
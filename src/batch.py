@@ -0,0 +1,159 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .db_manager import DBManager
+from .gathering import Gathering
+from .llm_analysis import LLMAnalysis
+from .main import STAGES, build_stages
+from .pipeline import FAILED, Pipeline, Stage
+
+logger = logging.getLogger(__name__)
+
+
+def read_video_ids(lines: Iterable[str]) -> List[str]:
+    """Video IDs from ``lines``, one per line.
+
+    Blank lines and ``#`` comments are skipped; a repeated ID is kept once.
+    """
+    video_ids = []
+    for line in lines:
+        video_id = line.split("#", 1)[0].strip()
+        if video_id:
+            video_ids.append(video_id)
+    return list(dict.fromkeys(video_ids))
+
+
+class BatchRunner:
+    """Runs many videos through one pipeline in a single process.
+
+    Up to ``workers`` videos are in flight at once. Their stages share two
+    limits: ``network_workers`` for the stages that wait on the YouTube and
+    OpenAI APIs, ``cpu_workers`` for the ones that crunch text, so videos
+    waiting on the network do not hold back the ones that have text to
+    process. Models are loaded once for the whole batch, and without
+    ``stages`` one Gathering and one LLMAnalysis serve every video: their
+    YouTube clients, quota tally and YouTube and OpenAI rate limits are
+    shared across the batch.
+    """
+
+    def __init__(
+        self,
+        stages: Optional[Sequence[Stage]] = None,
+        workers: int = 4,
+        network_workers: int = 4,
+        cpu_workers: Optional[int] = None,
+        db: Optional[DBManager] = None,
+    ):
+        self.workers = workers
+        self.limits = {"network": network_workers, "cpu": cpu_workers or os.cpu_count() or 1}
+        self.gathering = None
+        self.llm_analyzer = None
+        if stages is None:
+            self.gathering = Gathering()
+            self.llm_analyzer = LLMAnalysis()
+            stages = build_stages(self.gathering, self.llm_analyzer)
+        self.pipeline = Pipeline(stages, db, limits=self.limits)
+
+    def run_video(
+        self, video_id: str, from_stage: Optional[str] = None, only: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Run one video; returns its entry of the summary instead of raising."""
+        timings: Dict[str, float] = {}
+        failed_stages: List[str] = []
+        error = None
+        started = time.perf_counter()
+        try:
+            self.pipeline.run(video_id, from_stage, only, timings=timings)
+        except Exception as e:
+            logger.error(f"Batch: video {video_id} failed: {e}")
+            states = self.pipeline.db.get_stage_states(video_id)
+            failed_stages = [name for name in self.pipeline.order if states.get(name) == FAILED]
+            error = f"{type(e).__name__}: {e}"
+        return {
+            "video_id": video_id,
+            "status": "failed" if error else "done",
+            "seconds": round(time.perf_counter() - started, 3),
+            "stages": {name: round(timings[name], 3) for name in self.pipeline.order if name in timings},
+            "failed_stages": failed_stages,
+            "error": error,
+        }
+
+    def run(
+        self, video_ids: Iterable[str], from_stage: Optional[str] = None, only: Optional[Sequence[str]] = None
+    ) -> Dict[str, Any]:
+        """Run every video and return the batch summary."""
+        video_ids = list(dict.fromkeys(video_ids))
+        logger.info(f"Starting batch of {len(video_ids)} videos ({self.workers} at a time, limits {self.limits})")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="video") as pool:
+            results = list(pool.map(lambda video_id: self.run_video(video_id, from_stage, only), video_ids))
+
+        failed = [result["video_id"] for result in results if result["status"] == "failed"]
+        summary = {
+            "videos": len(results),
+            "done": len(results) - len(failed),
+            "failed": len(failed),
+            "seconds": round(time.perf_counter() - started, 3),
+            "workers": self.workers,
+            "limits": self.limits,
+            "results": results,
+        }
+        if self.gathering is not None:
+            summary["youtube_quota"] = self.gathering.quota.spent
+        logger.info(
+            f"Finished batch of {len(results)} videos in {summary['seconds']:.2f}s: "
+            f"{summary['done']} done, {len(failed)} failed" + (f" ({', '.join(failed)})" if failed else "")
+        )
+        return summary
+
+
+def parse_args(argv=None):
+    names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Build personas for a list of YouTube videos.")
+    parser.add_argument(
+        "source", nargs="?", default="-", help="File with one video ID per line; - (the default) reads stdin"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Videos processed at once")
+    parser.add_argument("--network-workers", type=int, default=4, help="YouTube and OpenAI stages running at once")
+    parser.add_argument(
+        "--cpu-workers", type=int, default=None, help="Text-processing stages running at once (default: CPUs)"
+    )
+    parser.add_argument("--summary", default="-", help="Where to write the JSON summary; - (the default) is stdout")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--from-stage", choices=names, help="Rerun this stage and every stage after it")
+    group.add_argument(
+        "--only", choices=names, action="append", metavar="STAGE", help="Run just this stage (repeatable)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.source == "-":
+        video_ids = read_video_ids(sys.stdin)
+    else:
+        with open(args.source, encoding="utf-8") as f:
+            video_ids = read_video_ids(f)
+
+    runner = BatchRunner(
+        workers=args.workers, network_workers=args.network_workers, cpu_workers=args.cpu_workers
+    )
+    summary = runner.run(video_ids, args.from_stage, args.only)
+
+    text = json.dumps(summary, indent=2)
+    if args.summary == "-":
+        print(text)
+    else:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,8 @@ class Comment:
     sentiment: float = 0.0  # Ensured default for float
     created: datetime = None
     updated: datetime = None
+    youtube_id: str = ""
+    language: str = ""
 
     # Removed custom __init__(self, db_row)
 
@@ -35,5 +37,7 @@ class Comment:
                 sentiment=db_row[9],
                 created=db_row[10],
                 updated=db_row[11],
+                youtube_id=db_row[12] if len(db_row) > 12 else "",
+                language=db_row[13] if len(db_row) > 13 else "",
             )
         return cls()  # Return an empty Comment object with default values
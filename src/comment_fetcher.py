@@ -0,0 +1,295 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Union
+
+from .db_manager import DBManager
+from .metadata_extractor import MetadataExtractor
+
+logger = logging.getLogger(__name__)
+
+# YouTube Data API v3 quota cost per call, in units
+QUOTA_COSTS = {
+    "videos.list": 1,
+    "commentThreads.list": 1,
+    "playlistItems.list": 1,
+    "playlists.list": 1,
+    "channels.list": 1,
+}
+
+# The API silently caps commentThreads.list at 100 results per page
+MAX_RESULTS_PER_PAGE = 100
+
+_DONE = object()
+
+
+class QuotaExceededError(RuntimeError):
+    """Raised when a call would push quota spend past the configured budget."""
+
+
+class QuotaTracker:
+    """Thread-safe tally of YouTube quota units spent during a run."""
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.spent = 0
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def charge(self, method: str) -> None:
+        """Record one call to ``method``, refusing it if it would exceed the budget."""
+        cost = QUOTA_COSTS.get(method, 1)
+        with self._lock:
+            if self.budget is not None and self.spent + cost > self.budget:
+                raise QuotaExceededError(
+                    f"YouTube quota budget of {self.budget} units exhausted ({self.spent} spent)"
+                )
+            self.spent += cost
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def remaining(self) -> Optional[int]:
+        with self._lock:
+            return None if self.budget is None else self.budget - self.spent
+
+
+class RateLimiter:
+    """Token bucket shared by all threads that talk to one API."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CommentFetcher:
+    """Producer/consumer comment gatherer for the YouTube Data API.
+
+    A producer thread pages through ``commentThreads.list`` and hands raw
+    responses to the calling thread over a bounded queue, so network I/O for
+    the next page overlaps with parsing and writing the current one.
+
+    ``client_factory`` builds a YouTube client. Clients are checked out of a
+    small pool so no two threads share one (the underlying HTTP transport is
+    not thread-safe) while still being reused across videos.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable,
+        db: Optional[DBManager] = None,
+        quota: Optional[QuotaTracker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        queue_size: int = 4,
+        batch_size: int = DBManager.BULK_BATCH_SIZE,
+        min_length: int = 20,
+    ):
+        self.client_factory = client_factory
+        self.db = db or DBManager()
+        self.quota = quota or QuotaTracker()
+        self.rate_limiter = rate_limiter
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.min_length = min_length
+        self.extractor = MetadataExtractor()
+        self._clients = queue.LifoQueue()
+
+    @contextmanager
+    def client(self):
+        """Check a YouTube client out of the pool, building one if none is idle."""
+        try:
+            youtube = self._clients.get_nowait()
+        except queue.Empty:
+            youtube = self.client_factory()
+        try:
+            yield youtube
+        finally:
+            self._clients.put(youtube)
+
+    def call(self, method: str, request):
+        """Execute an API request, honouring the rate limiter and quota budget."""
+        self.quota.charge(method)
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return request.execute()
+
+    def _extract(self, item, video_id):
+        comment = self.extractor.extract(item)
+        comment.video_id = video_id
+        return comment
+
+    def _page_comments(self, response, video_id):
+        """Yield the comments of one API response page that are worth keeping."""
+        for item in response.get("items", []):
+            comment = self._extract(item, video_id)
+            if len(comment.text) > self.min_length:
+                yield comment
+
+    def _list_pages(
+        self, youtube, video_id, stop: threading.Event = None, max_pages: Optional[int] = None, **list_args
+    ):
+        """Yield ``commentThreads.list`` responses for a video, one page at a time.
+
+        Stops after ``max_pages`` pages when given.
+        """
+        page_token = None
+        pages = 0
+        while not (stop and stop.is_set()) and (max_pages is None or pages < max_pages):
+            params = dict(
+                part="snippet",
+                maxResults=MAX_RESULTS_PER_PAGE,
+                videoId=video_id,
+                **list_args,
+            )
+            if page_token:
+                params["pageToken"] = page_token
+            response = self.call(
+                "commentThreads.list", youtube.commentThreads().list(**params)
+            )
+            pages += 1
+            yield response
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+    def _produce(self, video_id, pages: queue.Queue, stop: threading.Event, **list_args):
+        """Page through a video's comment threads, feeding ``pages``."""
+        try:
+            with self.client() as youtube:
+                for response in self._list_pages(youtube, video_id, stop, **list_args):
+                    self._put(pages, response, stop)
+            self._put(pages, _DONE, stop)
+        except BaseException as e:  # Hand any failure to the consumer
+            self._put(pages, e, stop)
+
+    def _put(self, pages: queue.Queue, item, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def iter_pages(self, video_id, **list_args):
+        """Yield raw ``commentThreads.list`` responses, prefetched in the background."""
+        pages = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(
+            target=self._produce,
+            args=(video_id, pages, stop),
+            kwargs=list_args,
+            name=f"comment-fetch-{video_id}",
+            daemon=True,
+        )
+        producer.start()
+        try:
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+    def fetch(self, video_id, incremental: bool = False, max_pages: Optional[int] = None) -> int:
+        """Gather and store the comments of one video; returns how many were written.
+
+        With ``incremental`` set, once a gather of every page of the video
+        has finished, only comments newer than the newest stored one are
+        fetched (see fetch_new). Until then every page is fetched again, so
+        a gather that failed or was capped partway is completed rather than
+        left with a gap. At most ``max_pages`` pages are requested when given.
+        """
+        if incremental and self.db.full_gather_finished(video_id):
+            newest = self.db.get_newest_comment(video_id)
+            if newest:
+                return self.fetch_new(video_id, newest[1], max_pages)
+
+        saved = 0
+        last = None
+        for response in self.iter_pages(video_id, max_pages=max_pages):
+            saved += self.db.save_comments_bulk(
+                self._page_comments(response, video_id), batch_size=self.batch_size
+            )
+            last = response
+        if last is not None and not last.get("nextPageToken"):  # Not cut short by max_pages
+            self.db.finish_full_gather(video_id)
+        logger.info(f"Saved {saved} comments for video {video_id}")
+        return saved
+
+    def fetch_new(self, video_id, since: datetime, max_pages: Optional[int] = None) -> int:
+        """Fetch comments published at or after ``since``, newest first.
+
+        Pages are requested in time order without prefetching, and paging stops
+        at the first page that reaches back past ``since``, so a refresh costs
+        one API call per page of new comments. Comments that were already
+        stored are upserted, not duplicated. If ``max_pages`` stops it before
+        it reaches ``since``, the video's full gather is forgotten, so the
+        next gather fills the gap.
+        """
+        saved = 0
+        caught_up = False
+        with self.client() as youtube:
+            for response in self._list_pages(youtube, video_id, max_pages=max_pages, order="time"):
+                comments = [self._extract(item, video_id) for item in response.get("items", [])]
+                fresh = [c for c in comments if c.published >= since]
+                saved += self.db.save_comments_bulk(
+                    (c for c in fresh if len(c.text) > self.min_length),
+                    batch_size=self.batch_size,
+                )
+                caught_up = len(fresh) < len(comments) or not response.get("nextPageToken")
+                if len(fresh) < len(comments):
+                    break  # This page reaches back into comments we already have
+        if not caught_up:
+            logger.info(f"Stopped before reaching the stored comments of video {video_id}; next gather is full")
+            self.db.clear_full_gather(video_id)
+        logger.info(f"Saved {saved} new comments for video {video_id}")
+        return saved
+
+    def fetch_many(
+        self,
+        video_ids: Iterable[str],
+        max_workers: int = 4,
+        incremental: bool = False,
+        max_pages: Optional[int] = None,
+    ) -> Dict[str, Union[int, Exception]]:
+        """Fetch several videos concurrently, at most ``max_pages`` pages each.
+
+        Returns a mapping of video ID to the number of comments saved, or to
+        the exception that stopped that video.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        results: Dict[str, Union[int, Exception]] = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gather") as pool:
+            futures = {
+                pool.submit(self.fetch, video_id, incremental, max_pages): video_id
+                for video_id in video_ids
+            }
+            for future, video_id in futures.items():
+                try:
+                    results[video_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to gather comments for video {video_id}: {e}")
+                    results[video_id] = e
+        return results
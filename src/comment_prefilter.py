@@ -0,0 +1,175 @@
+import random
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_WORD = re.compile(r"\w+")
+_LETTER = re.compile(r"[^\W\d_]")
+
+_MASK_32 = np.uint64(0xFFFFFFFF)
+
+
+class CommentPrefilter:
+    """Trims a video's comments before they are sent to the LLM.
+
+    Three steps, each cheaper than the tokens it saves:
+
+    1. Low-information comments (emoji-only, "first!", "kkkkkk", ...) are
+       dropped.
+    2. Near-duplicates are found with MinHash over character shingles and
+       LSH banding, then folded into their most liked member, which inherits
+       the group's likes.
+    3. ``sample`` draws a likes-weighted random sample of what is left under
+       a token budget. The random source is seeded, so the same comments
+       always give the same sample (and the same LLM cache keys).
+    """
+
+    def __init__(
+        self,
+        min_distinct_words: int = 2,
+        min_letters: int = 4,
+        shingle_size: int = 5,
+        num_perm: int = 64,
+        bands: int = 8,
+        similarity: float = 0.8,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            min_distinct_words: Comments with fewer distinct words are low-information.
+            min_letters: Comments with fewer letters are low-information.
+            shingle_size: Characters per shingle compared by MinHash.
+            num_perm: MinHash signature length; must be a multiple of ``bands``.
+            bands: LSH bands; more bands find less similar candidate pairs.
+            similarity: Estimated Jaccard similarity at which comments are duplicates.
+            seed: Seed for the hash functions and the sample.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.min_distinct_words = min_distinct_words
+        self.min_letters = min_letters
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.similarity = similarity
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash family: odd multipliers, high 32 bits of the product
+        self._a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+        self._powers = np.uint64(1_000_003) ** np.arange(shingle_size, dtype=np.uint64)
+
+    @staticmethod
+    def _text(comment: Dict) -> str:
+        return comment.get("clean_text") or comment.get("text") or ""
+
+    def is_low_information(self, text: str) -> bool:
+        words = {word.lower() for word in _WORD.findall(text)}
+        return len(words) < self.min_distinct_words or len(_LETTER.findall(text)) < self.min_letters
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """32-bit hashes of the byte shingles of the normalised text."""
+        data = np.frombuffer(" ".join(text.lower().split()).encode("utf-8"), dtype=np.uint8)
+        if len(data) < self.shingle_size:
+            data = np.pad(data, (0, self.shingle_size - len(data)))
+        windows = sliding_window_view(data, self.shingle_size).astype(np.uint64)
+        return np.unique((windows * self._powers).sum(axis=1) & _MASK_32)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """MinHash signature per text, shape ``(len(texts), num_perm)``."""
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        with np.errstate(over="ignore"):  # uint64 products wrap by design
+            for row, text in enumerate(texts):
+                hashes = self._shingles(text)[:, None] * self._a + self._b
+                signatures[row] = (hashes >> np.uint64(32)).min(axis=0)
+        return signatures
+
+    def duplicate_groups(self, texts: Sequence[str]) -> List[int]:
+        """For each text, the index of the first text in its near-duplicate group."""
+        parent = list(range(len(texts)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        signatures = self.signatures(texts)
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            buckets: Dict[bytes, int] = {}
+            for i, key in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+                first = buckets.setdefault(key.tobytes(), i)
+                if first == i:
+                    continue
+                a, b = find(first), find(i)
+                if a == b:
+                    continue
+                # LSH only proposes the pair; the full signatures decide
+                if np.mean(signatures[first] == signatures[i]) >= self.similarity:
+                    parent[max(a, b)] = min(a, b)
+        return [find(i) for i in range(len(texts))]
+
+    def filter(self, comments: Sequence[Dict]) -> Tuple[List[Dict], Dict[str, List[int]]]:
+        """Drop low-information comments and fold near-duplicates.
+
+        Returns the kept comments, in input order, and the input indexes
+        removed for each reason (``"low_information"`` and ``"duplicate"``).
+        A kept comment that absorbed duplicates carries the group's summed
+        ``likes`` and the number of comments folded into it as ``duplicates``.
+        """
+        removed = {"low_information": [], "duplicate": []}
+        candidates = []
+        for i, comment in enumerate(comments):
+            if self.is_low_information(self._text(comment)):
+                removed["low_information"].append(i)
+            else:
+                candidates.append(i)
+
+        groups = self.duplicate_groups([self._text(comments[i]) for i in candidates])
+        members: Dict[int, List[int]] = {}
+        for position, group in enumerate(groups):
+            members.setdefault(group, []).append(candidates[position])
+
+        kept = []
+        for group in members.values():
+            # Most liked member represents the group; ties go to the earliest
+            best = max(group, key=lambda i: (comments[i].get("likes") or 0, -i))
+            representative = dict(comments[best])
+            if len(group) > 1:
+                representative["likes"] = sum(comments[i].get("likes") or 0 for i in group)
+                representative["duplicates"] = len(group) - 1
+                removed["duplicate"].extend(i for i in group if i != best)
+            kept.append((best, representative))
+        kept.sort(key=lambda entry: entry[0])
+        return [comment for _, comment in kept], removed
+
+    def sample(
+        self,
+        comments: Sequence[Dict],
+        costs: Sequence[int],
+        token_budget: int,
+        max_comments: Optional[int] = None,
+    ) -> List[int]:
+        """Indexes of a likes-weighted random sample whose ``costs`` fit ``token_budget``.
+
+        Sampling without replacement with weight ``1 + likes`` (Efraimidis-
+        Spirakis keys); comments that do not fit the remaining budget are
+        skipped. The indexes come back in input order.
+        """
+        rng = random.Random(self.seed)
+        keys = [
+            rng.random() ** (1.0 / (1 + max(0, comment.get("likes") or 0)))
+            for comment in comments
+        ]
+        chosen, spent = [], 0
+        for i in sorted(range(len(comments)), key=keys.__getitem__, reverse=True):
+            if max_comments is not None and len(chosen) >= max_comments:
+                break
+            if spent + costs[i] <= token_budget:
+                chosen.append(i)
+                spent += costs[i]
+        return sorted(chosen)
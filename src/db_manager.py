@@ -1,90 +1,383 @@
+import atexit
+import os
 import sqlite3
+import threading
+import weakref
 from datetime import datetime
 import json
-from typing import List, Tuple, Dict, Optional, Union
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Tuple, Dict, Optional, Union
 from contextlib import contextmanager
 
+from .comment import Comment
+
+# Columns of the comment table, in table order
+COMMENT_COLUMNS = (
+    "id",
+    "video_id",
+    "published",
+    "author_display_name",
+    "author_clean_name",
+    "author_gender",
+    "likes",
+    "text",
+    "clean_text",
+    "sentiment",
+    "created",
+    "updated",
+    "youtube_id",
+    "language",
+)
+
+# UPDATE ... RETURNING needs SQLite 3.35
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+
+# Columns of the job table, in table order
+JOB_COLUMNS = (
+    "id", "video_id", "language", "refresh", "status", "error", "result", "created", "started", "finished",
+)
+
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Never edit a released entry; append a new one instead.
+MIGRATIONS = [
+    # 1: base schema
+    """
+    CREATE TABLE IF NOT EXISTS comment (
+        id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+        video_id CHAR(150) NOT NULL,
+        published DATETIME NOT NULL,
+        author_display_name CHAR(100) NOT NULL,
+        author_clean_name CHAR(100),
+        author_gender CHAR(1),
+        likes INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        clean_text TEXT,
+        sentiment REAL,
+        created DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated DATETIME
+    );
+
+    CREATE TABLE IF NOT EXISTS comment_keywords (
+        id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+        video_id CHAR(150) NOT NULL,
+        text TEXT NOT NULL,
+        score REAL,
+        created DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS video (
+        id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+        video_id CHAR(150) NOT NULL UNIQUE,
+        title TEXT,
+        created DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+        video_id CHAR(150) NOT NULL,
+        name TEXT,
+        gender TEXT,
+        age TEXT,
+        language TEXT,
+        issues TEXT,
+        wishes TEXT,
+        pains TEXT,
+        expressions TEXT,
+        created DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated DATETIME,
+        UNIQUE(video_id)
+    );
+    """,
+    # 2: composite indexes for the per-video lookups
+    """
+    CREATE INDEX IF NOT EXISTS idx_comment_video_likes
+        ON comment (video_id, likes DESC);
+    CREATE INDEX IF NOT EXISTS idx_comment_video_gender
+        ON comment (video_id, author_gender, author_clean_name);
+    CREATE INDEX IF NOT EXISTS idx_comment_keywords_video_score
+        ON comment_keywords (video_id, score, text);
+    """,
+    # 3: natural key for YouTube comments, enabling upserts and incremental gathering
+    """
+    ALTER TABLE comment ADD COLUMN youtube_id TEXT;
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_comment_youtube_id
+        ON comment (youtube_id);
+    CREATE INDEX IF NOT EXISTS idx_comment_video_published
+        ON comment (video_id, published);
+    """,
+    # 4: content-addressed cache of LLM replies
+    """
+    CREATE TABLE IF NOT EXISTS llm_cache (
+        key CHAR(64) PRIMARY KEY NOT NULL,
+        model TEXT NOT NULL,
+        response TEXT NOT NULL,
+        created DATETIME NOT NULL,
+        accessed DATETIME NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed
+        ON llm_cache (accessed);
+    """,
+    # 5: first names resolved by the remote gender service
+    """
+    CREATE TABLE IF NOT EXISTS name_gender (
+        name TEXT PRIMARY KEY NOT NULL,
+        male_probability REAL,
+        source TEXT NOT NULL,
+        updated DATETIME NOT NULL
+    );
+    """,
+    # 6: detected language of each comment (ISO 639-1, or "und")
+    """
+    ALTER TABLE comment ADD COLUMN language TEXT;
+    """,
+    # 7: per-video pipeline stage checkpoints
+    """
+    CREATE TABLE IF NOT EXISTS pipeline_stage (
+        video_id CHAR(150) NOT NULL,
+        stage TEXT NOT NULL,
+        status TEXT NOT NULL,
+        error TEXT,
+        started DATETIME,
+        finished DATETIME,
+        PRIMARY KEY (video_id, stage)
+    );
+    """,
+    # 8: channels and playlists as groups of videos, analysed as one
+    """
+    CREATE TABLE IF NOT EXISTS video_group (
+        group_id CHAR(150) NOT NULL,
+        video_id CHAR(150) NOT NULL,
+        PRIMARY KEY (group_id, video_id)
+    );
+    """,
+    # 9: persona generation jobs; at most one queued or running job per video and language
+    """
+    CREATE TABLE IF NOT EXISTS job (
+        id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
+        video_id CHAR(150) NOT NULL,
+        language TEXT NOT NULL,
+        refresh INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        error TEXT,
+        result TEXT,
+        created DATETIME NOT NULL,
+        started DATETIME,
+        finished DATETIME
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_job_active_video
+        ON job (video_id) WHERE status IN ('queued', 'running');
+    CREATE INDEX IF NOT EXISTS idx_job_status
+        ON job (status, id);
+    """,
+    # 10: when each video's comments were last gathered in full, so gathers only
+    # go incremental after one finished
+    """
+    ALTER TABLE video ADD COLUMN last_full_gather DATETIME;
+    """,
+]
+
+
+def _split_statements(script: str) -> List[str]:
+    """Split a SQL script into complete statements."""
+    statements, pending = [], ""
+    for part in script.split(";"):
+        pending += part + ";"
+        if sqlite3.complete_statement(pending):
+            if pending.strip(" \n;"):
+                statements.append(pending.strip())
+            pending = ""
+    return statements
+
+
+class _ThreadConnection:
+    """Holds a thread's connection in the pool's thread-local storage.
+
+    The thread-local value is dropped when its thread exits, which lets a
+    weakref finalizer close the connection.
+    """
+
+    __slots__ = ("con", "__weakref__")
+
+    def __init__(self, con: sqlite3.Connection):
+        self.con = con
+
+
+class ConnectionPool:
+    """Thread-aware pool of long-lived SQLite connections for one database file.
+
+    Every thread gets its own connection, opened lazily on first use and
+    closed when the thread exits, so short-lived worker threads do not pile
+    up open connections. Connections run in WAL journal mode so readers do
+    not block the writer.
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-16000",  # 16 MB page cache
+        "PRAGMA mmap_size=268435456",  # 256 MB memory-mapped I/O
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = set()
+
+    def get(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it if needed."""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            # check_same_thread is off only so close_all() and the thread-exit
+            # finalizer can close it; it is still used by its owning thread alone.
+            con = sqlite3.connect(self.db_name, check_same_thread=False)
+            for pragma in self.PRAGMAS:
+                con.execute(pragma)
+            holder = _ThreadConnection(con)
+            with self._lock:
+                self._connections.add(con)
+            weakref.finalize(holder, self._release, con)
+            self._local.holder = holder
+        return holder.con
+
+    def size(self) -> int:
+        """Number of connections currently open."""
+        with self._lock:
+            return len(self._connections)
+
+    def _release(self, con: sqlite3.Connection) -> None:
+        with self._lock:
+            self._connections.discard(con)
+        try:
+            con.close()
+        except sqlite3.Error:
+            pass
+
+    def close_all(self):
+        """Close every connection handed out by this pool."""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for con in connections:
+            try:
+                con.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_schema_ready = set()
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_name: str) -> ConnectionPool:
+    """Return the process-wide pool for a database file."""
+    key = os.path.abspath(db_name)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_name)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    """Close all pooled connections (registered to run at interpreter exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _schema_ready.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+atexit.register(close_all_pools)
+
 
 class DBManager:
-    def __init__(self, db_name="youtube.db"):
+    BULK_BATCH_SIZE = 500
+    # Bulk updates larger than this go through a temp table and one UPDATE ... FROM
+    TEMP_TABLE_THRESHOLD = 5000
+
+    def __init__(self, db_name="youtube.db", pooled=True):
         self.db_name = db_name
         self.conn = None
+        self.pool = None
         if self.db_name == ":memory:":
-            self.conn = sqlite3.connect(self.db_name)
+            # One shared connection; the lock serialises threads that use it
+            self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
+            self._conn_lock = threading.RLock()
             cur = self.conn.cursor()
             self._ensure_tables_exist(cur) # Ensure tables are created for in-memory DB
+        elif pooled:
+            self.pool = get_pool(self.db_name)
+
+    def _ensure_schema_once(self, con):
+        """Create the schema the first time this process touches the DB file."""
+        key = os.path.abspath(self.db_name)
+        if key in _schema_ready:
+            return
+        with _pools_lock:
+            if key not in _schema_ready:
+                self._ensure_tables_exist(con.cursor())
+                _schema_ready.add(key)
 
     @contextmanager
     def _managed_cursor(self, commit_on_exit=False):
         """Context manager for database cursor with automatic connection management."""
         if self.conn:  # If there's a persistent connection (for :memory:)
             con = self.conn
+            self._conn_lock.acquire()
+        elif self.pool:  # Long-lived per-thread connection for file DBs
+            con = self.pool.get()
+            self._ensure_schema_once(con)
         else:
             con = sqlite3.connect(self.db_name)
         
         cur = con.cursor()
         
-        if not self.conn: # Only call _ensure_tables_exist if it's not a persistent conn
-                          # (assuming it was called for persistent conn in __init__)
+        if not self.conn and not self.pool: # Only for throwaway connections
             self._ensure_tables_exist(cur) # This ensures tables for file DBs on each new temp connection
         
         try:
             yield cur
             if commit_on_exit:
                 con.commit()
+        except Exception:
+            if con.in_transaction:
+                con.rollback()
+            raise
         finally:
-            if not self.conn: # Only close if it's not the persistent connection
+            cur.close()
+            if self.conn:
+                self._conn_lock.release()
+            elif not self.pool: # Only close throwaway connections
                 con.close()
             
     def _ensure_tables_exist(self, cursor):
-        """Ensure all required tables exist."""
-        cursor.executescript("""
-        CREATE TABLE IF NOT EXISTS comment (
-            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-            video_id CHAR(150) NOT NULL,
-            published DATETIME NOT NULL,
-            author_display_name CHAR(100) NOT NULL,
-            author_clean_name CHAR(100),
-            author_gender CHAR(1),
-            likes INTEGER NOT NULL,
-            text TEXT NOT NULL,
-            clean_text TEXT,
-            sentiment REAL,
-            created DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated DATETIME
-        );
-        
-        CREATE TABLE IF NOT EXISTS comment_keywords (
-            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-            video_id CHAR(150) NOT NULL,
-            text TEXT NOT NULL,
-            score REAL,
-            created DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        CREATE TABLE IF NOT EXISTS video (
-            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-            video_id CHAR(150) NOT NULL UNIQUE,
-            title TEXT,
-            created DATETIME DEFAULT CURRENT_TIMESTAMP
-        );
-        
-        CREATE TABLE IF NOT EXISTS analysis (
-            id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-            video_id CHAR(150) NOT NULL,
-            name TEXT,
-            gender TEXT,
-            age TEXT,
-            language TEXT,
-            issues TEXT,
-            wishes TEXT,
-            pains TEXT,
-            expressions TEXT,
-            created DATETIME DEFAULT CURRENT_TIMESTAMP,
-            updated DATETIME,
-            UNIQUE(video_id)
-        );
-        """)
+        """Ensure all required tables exist by applying pending schema migrations.
+
+        The schema version is tracked in ``PRAGMA user_version``; every entry in
+        ``MIGRATIONS`` past the stored version is applied in order, inside one
+        write transaction so concurrent processes cannot apply it twice.
+        """
+        if cursor.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+            return
+
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            for target, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                for statement in _split_statements(script):
+                    cursor.execute(statement)
+                cursor.execute(f"PRAGMA user_version = {target}")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
 
     def _execute_query(
         self,
@@ -102,119 +395,290 @@ class DBManager:
                 return cur.fetchall()
             return None  # Or cur.rowcount, depending on desired return for non-select queries
 
-    def _row_to_dict(self, row):
-        """Convert a database row to a dictionary"""
-        return {
-            "id": row[0],
-            "video_id": row[1],
-            "published": row[2],
-            "author_display_name": row[3],
-            "author_clean_name": row[4],
-            "author_gender": row[5],
-            "likes": row[6],
-            "text": row[7],
-            "clean_text": row[8],
-            "sentiment": row[9],
-            "created": row[10],
-            "updated": row[11],
-        }
+    def _execute_many(self, sql: str, params_iter: Iterable[tuple], batch_size: int = None) -> int:
+        """Run ``executemany`` over ``params_iter`` in chunks, inside one transaction.
+
+        Returns the number of parameter rows written.
+        """
+        batch_size = batch_size or self.BULK_BATCH_SIZE
+        params_iter = iter(params_iter)
+        total = 0
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            while True:
+                chunk = list(islice(params_iter, batch_size))
+                if not chunk:
+                    break
+                cur.executemany(sql, chunk)
+                total += len(chunk)
+        return total
 
     def create_db(self):
         """Create all required database tables if they don't exist."""
         with sqlite3.connect(self.db_name) as conn:
-            cur = conn.cursor()
-            
-            # Create comment table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS comment (
-                id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-                video_id CHAR(150) NOT NULL,
-                published DATETIME NOT NULL,
-                author_display_name CHAR(100) NOT NULL,
-                author_clean_name CHAR(100),
-                author_gender CHAR(1),
-                likes INTEGER NOT NULL,
-                text TEXT NOT NULL,
-                clean_text TEXT,
-                sentiment REAL,
-                created DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated DATETIME
-            )
-            """)
-            
-            # Create comment_keywords table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS comment_keywords (
-                id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-                video_id CHAR(150) NOT NULL,
-                text TEXT NOT NULL,
-                score REAL,
-                created DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Create video table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS video (
-                id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-                video_id CHAR(150) NOT NULL UNIQUE,
-                title TEXT,
-                created DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            # Create analysis table
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS analysis (
-                id INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,
-                video_id CHAR(150) NOT NULL,
-                name TEXT,
-                gender TEXT,
-                age TEXT,
-                language TEXT,
-                issues TEXT,
-                wishes TEXT,
-                pains TEXT,
-                expressions TEXT,
-                created DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated DATETIME,
-                UNIQUE(video_id)
-            )
-            """)
-            
-            conn.commit()
+            self._ensure_tables_exist(conn.cursor())
 
-    def save_comment(self, comment):
-        sql = "INSERT INTO comment(created, published, video_id, author_display_name, likes, text) VALUES (?,?,?,?,?,?)"
-        params = (
-            datetime.now(),
+    # Comments carrying a YouTube ID are upserted: a re-gathered comment refreshes
+    # its likes and text, and loses its derived fields only if the text changed.
+    COMMENT_UPSERT_SQL = """
+    INSERT INTO comment(created, published, video_id, author_display_name, likes, text, youtube_id)
+    VALUES (?,?,?,?,?,?,?)
+    ON CONFLICT(youtube_id) DO UPDATE SET
+        likes = excluded.likes,
+        author_display_name = excluded.author_display_name,
+        clean_text = CASE WHEN comment.text = excluded.text THEN comment.clean_text END,
+        sentiment = CASE WHEN comment.text = excluded.text THEN comment.sentiment END,
+        language = CASE WHEN comment.text = excluded.text THEN comment.language END,
+        text = excluded.text,
+        updated = excluded.created
+    """
+
+    def _comment_params(self, comment, now: datetime) -> tuple:
+        return (
+            now,
             comment.published,
             comment.video_id,
             comment.author_display_name,
             comment.likes,
             comment.text,
+            getattr(comment, "youtube_id", None) or None,
         )
-        self._execute_query(sql, params, commit=True)
+
+    def save_comment(self, comment):
+        params = self._comment_params(comment, datetime.now())
+        self._execute_query(self.COMMENT_UPSERT_SQL, params, commit=True)
+
+    def save_comments_bulk(self, comments: Iterable, batch_size: int = None) -> int:
+        """Save many comments with ``executemany`` in a single transaction.
+
+        ``comments`` may be a list (e.g. one API page) or any iterator, such as
+        a generator spanning several pages; it is consumed ``batch_size`` rows
+        at a time. Comments already stored under the same YouTube ID are
+        updated in place. Returns the number of comments written.
+        """
+        now = datetime.now()
+        params = (self._comment_params(comment, now) for comment in comments)
+        return self._execute_many(self.COMMENT_UPSERT_SQL, params, batch_size)
+
+    def get_newest_comment(self, video_id: str) -> Optional[Tuple[str, datetime]]:
+        """Return ``(youtube_id, published)`` of the newest gathered comment of a video."""
+        sql = (
+            "SELECT youtube_id, published FROM comment "
+            "WHERE video_id = ? AND youtube_id IS NOT NULL "
+            "ORDER BY published DESC LIMIT 1"
+        )
+        row = self._execute_query(sql, (video_id,), fetch_one=True)
+        if not row:
+            return None
+        published = row[1]
+        if isinstance(published, str):
+            published = datetime.fromisoformat(published)
+        return row[0], published
+
+    def full_gather_finished(self, video_id: str) -> bool:
+        """Whether every comment page of the video has been gathered at least once."""
+        sql = "SELECT 1 FROM video WHERE video_id = ? AND last_full_gather IS NOT NULL"
+        return self._execute_query(sql, (video_id,), fetch_one=True) is not None
+
+    def finish_full_gather(self, video_id: str) -> int:
+        """Record that the video's comments were just gathered in full.
+
+        Legacy comments stored without a YouTube ID that now have a keyed
+        copy are deleted, so a regather does not keep both. Returns how many
+        were deleted.
+        """
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            cur.execute(
+                "INSERT INTO video (video_id, last_full_gather) VALUES (?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET last_full_gather = excluded.last_full_gather",
+                (video_id, datetime.now()),
+            )
+            cur.execute(
+                """
+                DELETE FROM comment WHERE video_id = ? AND youtube_id IS NULL AND EXISTS (
+                    SELECT 1 FROM comment AS keyed
+                    WHERE keyed.video_id = comment.video_id
+                        AND keyed.youtube_id IS NOT NULL
+                        AND keyed.published = comment.published
+                        AND keyed.author_display_name = comment.author_display_name
+                        AND keyed.text = comment.text
+                )
+                """,
+                (video_id,),
+            )
+            return cur.rowcount
+
+    def clear_full_gather(self, video_id: str) -> None:
+        """Forget the video's full gather, so its next gather fetches every page again."""
+        sql = "UPDATE video SET last_full_gather = NULL WHERE video_id = ?"
+        self._execute_query(sql, (video_id,), commit=True)
 
     def save_video_title(self, video_id: str, title: str):
-        """Saves a new video with its ID and title."""
-        sql = "INSERT INTO video (video_id, title) VALUES (?, ?)"
+        """Saves a video with its ID and title, refreshing the title if already known."""
+        sql = (
+            "INSERT INTO video (video_id, title) VALUES (?, ?) "
+            "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title"
+        )
         params = (video_id, title)
         self._execute_query(sql, params, commit=True)
 
-    def get_comments(self, video_id, no_sentiment=False, no_gender=False):
-        sql_base = "SELECT * FROM comment WHERE video_id = ? order by likes DESC"
-        params = (video_id,)
+    def save_video_titles(self, rows: Iterable[Tuple[str, str]]) -> int:
+        """Bulk save_video_title for ``(video_id, title)`` pairs."""
+        sql = (
+            "INSERT INTO video (video_id, title) VALUES (?, ?) "
+            "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title"
+        )
+        return self._execute_many(sql, rows)
+
+    def save_video_group(self, group_id: str, title: str, video_ids: Iterable[str]) -> None:
+        """Store a channel or playlist as a group of videos.
 
+        The group gets a video row of its own, so its persona is built,
+        stored and listed like a video's; reading its comments reads those
+        of all its videos.
+        """
+        self.save_video_title(group_id, title)
+        self._execute_many(
+            "INSERT OR IGNORE INTO video_group (group_id, video_id) VALUES (?, ?)",
+            ((group_id, video_id) for video_id in video_ids),
+        )
+
+    def get_group_videos(self, group_id: str) -> List[str]:
+        """Video IDs of a group; empty when ``group_id`` is not a group."""
+        sql = "SELECT video_id FROM video_group WHERE group_id = ? ORDER BY video_id"
+        return [row[0] for row in self._execute_query(sql, (group_id,), fetch_all=True) or []]
+
+    def _video_filter(self, video_id: str) -> Tuple[str, list]:
+        """WHERE condition on comment.video_id matching a video, or every video of a group."""
+        sql = "SELECT 1 FROM video_group WHERE group_id = ? LIMIT 1"
+        if self._execute_query(sql, (video_id,), fetch_one=True):
+            return "video_id IN (SELECT video_id FROM video_group WHERE group_id = ?)", [video_id]
+        return "video_id = ?", [video_id]
+
+    def _build_comment_query(
+        self,
+        video_id: str,
+        no_sentiment: bool = False,
+        no_gender: bool = False,
+        columns: Optional[Iterable[str]] = None,
+        is_null: Iterable[str] = (),
+        not_null: Iterable[str] = (),
+        min_likes: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after: Optional[Tuple[int, int]] = None,
+    ) -> Tuple[str, tuple, Tuple[str, ...]]:
+        """Build the SELECT behind get_comments; returns ``(sql, params, columns)``.
+
+        ``after`` is the ``(likes, id)`` of a row; only rows that come after
+        it in the result's order are selected.
+        """
+        columns = tuple(columns) if columns else COMMENT_COLUMNS
+        is_null, not_null = tuple(is_null), tuple(not_null)
         if no_sentiment:
-            sql = f"{sql_base} AND sentiment IS NULL"
-        elif no_gender:
-            sql = f"{sql_base} AND author_gender IS NULL"
-        else:
-            sql = sql_base  # No change needed for params
+            is_null += ("sentiment",)
+        if no_gender:
+            is_null += ("author_gender",)
+        unknown = set(columns + is_null + not_null) - set(COMMENT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown comment column(s): {', '.join(sorted(unknown))}")
+
+        video_filter, params = self._video_filter(video_id)
+        where = [video_filter]
+        where += [f"{column} IS NULL" for column in is_null]
+        where += [f"{column} IS NOT NULL" for column in not_null]
+        if min_likes is not None:
+            where.append("likes >= ?")
+            params.append(min_likes)
+        if after is not None:
+            where.append("likes <= ? AND (likes < ? OR id > ?)")
+            params += [after[0], after[0], after[1]]
+
+        sql = f"SELECT {', '.join(columns)} FROM comment WHERE {' AND '.join(where)} ORDER BY likes DESC, id"
+        if limit is not None or offset is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset or 0]
+        return sql, tuple(params), columns
+
+    def _format_comment_rows(self, rows, columns: Tuple[str, ...], row_format: str) -> list:
+        """Convert raw rows to tuples, dicts or (for "comment") Comment objects."""
+        if row_format == "tuple":
+            return list(rows)
+        if row_format == "dict":
+            return [dict(zip(columns, row)) for row in rows]
+        return [Comment(**dict(zip(columns, row))) for row in rows]
+
+    def _check_row_format(self, row_format: str) -> None:
+        if row_format not in ("tuple", "dict", "comment"):
+            raise ValueError(f"Unknown row format: {row_format}")
 
+    def get_comments(
+        self,
+        video_id,
+        no_sentiment=False,
+        no_gender=False,
+        columns: Optional[Iterable[str]] = None,
+        is_null: Iterable[str] = (),
+        not_null: Iterable[str] = (),
+        min_likes: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        row_format: str = "dict",
+    ) -> list:
+        """Get a video's comments, most liked first.
+
+        Args:
+            video_id: Video, or video group, whose comments are returned.
+            no_sentiment: Only comments without a sentiment score.
+            no_gender: Only comments without an author gender.
+            columns: Columns to select (default: all of COMMENT_COLUMNS).
+            is_null / not_null: Columns that must be NULL / NOT NULL.
+            min_likes: Only comments with at least this many likes.
+            limit / offset: Page through the result in SQL.
+            row_format: "dict" (default), "tuple" or "comment".
+        """
+        self._check_row_format(row_format)
+        sql, params, columns = self._build_comment_query(
+            video_id, no_sentiment, no_gender, columns, is_null, not_null,
+            min_likes, limit, offset,
+        )
         rows = self._execute_query(sql, params, fetch_all=True)
-        return [self._row_to_dict(row) for row in rows] if rows else []
+        return self._format_comment_rows(rows, columns, row_format) if rows else []
+
+    def iter_comments(
+        self,
+        video_id,
+        chunk_size: int = 1000,
+        row_format: str = "dict",
+        **filters,
+    ) -> Iterator[list]:
+        """Stream a video's comments in chunks of at most ``chunk_size`` rows.
+
+        Accepts the same filters as get_comments and yields lists in the same
+        row format, so only one chunk is held in memory at a time. Each chunk
+        is its own query, resuming after the last row of the one before, so
+        no SELECT is left open while the caller writes between chunks.
+        """
+        self._check_row_format(row_format)
+        columns = tuple(filters.pop("columns", None) or COMMENT_COLUMNS)
+        limit = filters.pop("limit", None)
+        offset = filters.pop("offset", None)
+        after = None
+        while limit is None or limit > 0:
+            size = chunk_size if limit is None else min(chunk_size, limit)
+            # likes and id ride along after the requested columns to key the next chunk
+            sql, params, _ = self._build_comment_query(
+                video_id, columns=columns + ("likes", "id"), limit=size, offset=offset, after=after, **filters
+            )
+            rows = self._execute_query(sql, params, fetch_all=True)
+            if not rows:
+                break
+            yield self._format_comment_rows([row[:-2] for row in rows], columns, row_format)
+            if len(rows) < size:
+                break
+            after = rows[-1][-2:]
+            offset = None
+            if limit is not None:
+                limit -= len(rows)
 
     def save_analysis(self, video_id: str, analysis_data: dict) -> None:
         """Save analysis results to the database."""
@@ -266,10 +730,10 @@ class DBManager:
         genders_count = {"M": 0, "F": 0}
         names = {"F": {}, "M": {}}
 
-        sql = "SELECT author_clean_name, author_gender FROM comment WHERE video_id = ? AND author_gender IS NOT NULL"
-        params = (video_id,)
+        video_filter, params = self._video_filter(video_id)
+        sql = f"SELECT author_clean_name, author_gender FROM comment WHERE {video_filter} AND author_gender IS NOT NULL"
 
-        results = self._execute_query(sql, params, fetch_all=True)
+        results = self._execute_query(sql, tuple(params), fetch_all=True)
 
         if results:
             for name, gender in results:
@@ -329,6 +793,12 @@ class DBManager:
         params = (video_id,)
         return bool(self._execute_query(sql, params, fetch_one=True))
 
+    def analysis_exists(self, video_id: str) -> bool:
+        """Check if an LLM analysis is stored for a video."""
+        sql = "SELECT 1 FROM analysis WHERE video_id = ?"
+        params = (video_id,)
+        return bool(self._execute_query(sql, params, fetch_one=True))
+
     def get_all_videos(self) -> List[Tuple[str, str]]:
         """Get all videos with their titles."""
         sql = "SELECT video_id, title FROM video ORDER BY created DESC"
@@ -371,13 +841,275 @@ class DBManager:
         params = (gender, updated_time, comment_id)
         self._execute_query(sql, params, commit=True)
 
+    def _bulk_update_comments(self, columns: Tuple[str, ...], rows: List[tuple]) -> int:
+        """Apply ``(id, *values, updated)`` rows to ``columns`` of the comment table.
+
+        Small sets use ``executemany``; large ones are loaded into a temp table
+        and applied with a single ``UPDATE ... FROM`` join. Either way the whole
+        set is written in one transaction. Returns the number of rows applied.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        assignments = ", ".join(f"{column}=?" for column in columns)
+        use_temp_table = (
+            len(rows) > self.TEMP_TABLE_THRESHOLD
+            and sqlite3.sqlite_version_info >= (3, 33, 0)
+        )
+
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            if not use_temp_table:
+                cur.executemany(
+                    f"UPDATE comment SET {assignments}, updated=? WHERE id=?",
+                    (row[1:] + row[:1] for row in rows),
+                )
+                return len(rows)
+
+            # One staging table per column set, emptied rather than dropped:
+            # SQLite cannot drop a table while a read (iter_comments) is open
+            table = "comment_update_" + "_".join(columns)
+            cur.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {', '.join(columns)}, updated)"
+            )
+            cur.execute(f"DELETE FROM temp.{table}")
+            placeholders = ", ".join("?" * (len(columns) + 2))
+            cur.executemany(
+                f"INSERT OR REPLACE INTO temp.{table} VALUES ({placeholders})", rows
+            )
+            joined = ", ".join(f"{column}=u.{column}" for column in columns)
+            cur.execute(
+                f"UPDATE comment SET {joined}, updated=u.updated "
+                f"FROM temp.{table} AS u WHERE comment.id = u.id"
+            )
+            cur.execute(f"DELETE FROM temp.{table}")
+        return len(rows)
+
+    def update_comments_processed_text_bulk(
+        self, rows: List[Tuple[int, str, str, datetime]]
+    ) -> int:
+        """Bulk variant of update_comment_processed_text.
+
+        ``rows`` holds ``(comment_id, clean_text, author_clean_name, updated_time)``.
+        """
+        return self._bulk_update_comments(("clean_text", "author_clean_name"), rows)
+
+    def update_comments_sentiment_bulk(
+        self, rows: List[Tuple[int, float, datetime]]
+    ) -> int:
+        """Bulk variant of update_comment_sentiment.
+
+        ``rows`` holds ``(comment_id, sentiment_score, updated_time)``.
+        """
+        return self._bulk_update_comments(("sentiment",), rows)
+
+    def update_comments_gender_bulk(
+        self, rows: List[Tuple[int, str, datetime]]
+    ) -> int:
+        """Bulk variant of update_comment_gender.
+
+        ``rows`` holds ``(comment_id, gender, updated_time)``.
+        """
+        return self._bulk_update_comments(("author_gender",), rows)
+
+    def update_comments_language_bulk(
+        self, rows: List[Tuple[int, str, datetime]]
+    ) -> int:
+        """Store detected comment languages.
+
+        ``rows`` holds ``(comment_id, language, updated_time)``.
+        """
+        return self._bulk_update_comments(("language",), rows)
+
     def save_comment_keyword(self, video_id: str, text: str, score: float):
         """Saves a new comment keyword."""
         sql = "INSERT INTO comment_keywords (video_id, text, score) VALUES (?,?,?)"
         params = (video_id, text, score)
         self._execute_query(sql, params, commit=True)
 
+    def replace_comment_keywords(self, video_id: str, keywords: Iterable[Tuple[str, float]]) -> int:
+        """Replace the video's keywords with ``(text, score)`` rows in one transaction.
+
+        Returns the number of keywords saved.
+        """
+        rows = [(video_id, text, score) for text, score in keywords]
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            cur.execute("DELETE FROM comment_keywords WHERE video_id = ?", (video_id,))
+            cur.executemany("INSERT INTO comment_keywords (video_id, text, score) VALUES (?,?,?)", rows)
+        return len(rows)
+
+    def get_llm_response(self, key: str, created_after: Optional[datetime] = None) -> Optional[str]:
+        """Return the cached LLM reply stored under ``key``.
+
+        Entries created before ``created_after`` count as missing. This is a
+        plain read; callers record the use with touch_llm_responses.
+        """
+        sql = "SELECT response FROM llm_cache WHERE key = ? AND created >= ?"
+        row = self._execute_query(sql, (key, created_after or datetime.min), fetch_one=True)
+        return row[0] if row else None
+
+    def touch_llm_responses(self, keys: Iterable[str]) -> int:
+        """Mark cached LLM replies as used now, in one write; returns how many keys were given."""
+        now = datetime.now()
+        return self._execute_many("UPDATE llm_cache SET accessed = ? WHERE key = ?", ((now, key) for key in keys))
+
+    def save_llm_response(self, key: str, model: str, response: str) -> None:
+        """Store an LLM reply under ``key``, replacing any previous one."""
+        sql = """
+        INSERT INTO llm_cache (key, model, response, created, accessed)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            model = excluded.model,
+            response = excluded.response,
+            created = excluded.created,
+            accessed = excluded.accessed
+        """
+        now = datetime.now()
+        self._execute_query(sql, (key, model, response, now, now), commit=True)
+
+    def evict_llm_cache(
+        self, created_before: Optional[datetime] = None, max_entries: Optional[int] = None
+    ) -> int:
+        """Delete cached LLM replies older than ``created_before``, then the least
+        recently used ones beyond ``max_entries``. Returns the number deleted."""
+        deleted = 0
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            if created_before is not None:
+                cur.execute("DELETE FROM llm_cache WHERE created < ?", (created_before,))
+                deleted += cur.rowcount
+            if max_entries is not None:
+                cur.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,),
+                )
+                deleted += cur.rowcount
+        return deleted
+
+    def get_name_genders(self, names: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Cached male probability per first name; names never resolved are absent.
+
+        A name the service could not place is present with None.
+        """
+        names = list(dict.fromkeys(names))
+        found = {}
+        for start in range(0, len(names), self.BULK_BATCH_SIZE):
+            chunk = names[start:start + self.BULK_BATCH_SIZE]
+            sql = (
+                "SELECT name, male_probability FROM name_gender "
+                f"WHERE name IN ({','.join('?' * len(chunk))})"
+            )
+            found.update(self._execute_query(sql, tuple(chunk), fetch_all=True) or [])
+        return found
+
+    def save_name_genders(self, rows: Iterable[Tuple[str, Optional[float]]], source: str) -> int:
+        """Cache ``(name, male_probability)`` pairs resolved by ``source``."""
+        sql = """
+        INSERT INTO name_gender (name, male_probability, source, updated)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            male_probability = excluded.male_probability,
+            source = excluded.source,
+            updated = excluded.updated
+        """
+        now = datetime.now()
+        return self._execute_many(
+            sql, ((name, probability, source, now) for name, probability in rows)
+        )
+
+    def get_stage_states(self, video_id: str) -> Dict[str, str]:
+        """Status of each pipeline stage recorded for a video, by stage name."""
+        sql = "SELECT stage, status FROM pipeline_stage WHERE video_id = ?"
+        return dict(self._execute_query(sql, (video_id,), fetch_all=True) or [])
+
+    def set_stage_state(
+        self, video_id: str, stage: str, status: str, error: Optional[str] = None
+    ) -> None:
+        """Record a pipeline stage's status for a video.
+
+        "running" stamps the start time, "done" and "failed" the finish time;
+        "pending" clears both.
+        """
+        now = datetime.now()
+        started = now if status == "running" else None
+        finished = now if status in ("done", "failed") else None
+        sql = """
+        INSERT INTO pipeline_stage (video_id, stage, status, error, started, finished)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(video_id, stage) DO UPDATE SET
+            status = excluded.status,
+            error = excluded.error,
+            started = CASE WHEN excluded.status = 'pending' THEN NULL
+                           ELSE COALESCE(excluded.started, started) END,
+            finished = excluded.finished
+        """
+        self._execute_query(sql, (video_id, stage, status, error, started, finished), commit=True)
+
+    def create_job(self, video_id: str, language: str, refresh: bool = False) -> Tuple[int, bool]:
+        """Queue a persona job for a video, unless one is already queued or running.
+
+        Returns ``(job_id, created)``; ``created`` is False when that active
+        job was returned instead. The pipeline and the stored analysis are
+        per video, so a request in another language joins the active job too.
+        """
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            cur.execute(
+                "INSERT OR IGNORE INTO job (video_id, language, refresh, status, created) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (video_id, language, int(refresh), datetime.now()),
+            )
+            created = cur.rowcount == 1
+            cur.execute(
+                "SELECT id FROM job WHERE video_id = ? AND status IN ('queued', 'running')",
+                (video_id,),
+            )
+            return cur.fetchone()[0], created
+
+    def claim_next_job(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job running and return it; None when none is queued."""
+        if not SQLITE_HAS_RETURNING:
+            return self._claim_next_job_compat()
+        sql = f"""
+        UPDATE job SET status = 'running', started = ?
+        WHERE id = (SELECT id FROM job WHERE status = 'queued' ORDER BY id LIMIT 1)
+        RETURNING {', '.join(JOB_COLUMNS)}
+        """
+        rows = self._execute_query(sql, (datetime.now(),), fetch_all=True, commit=True)
+        return dict(zip(JOB_COLUMNS, rows[0])) if rows else None
+
+    def _claim_next_job_compat(self) -> Optional[Dict[str, Any]]:
+        """claim_next_job for SQLite before 3.35: pick, then claim only if still queued."""
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            while True:
+                row = cur.execute("SELECT id FROM job WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+                if row is None:
+                    return None
+                cur.execute(
+                    "UPDATE job SET status = 'running', started = ? WHERE id = ? AND status = 'queued'",
+                    (datetime.now(), row[0]),
+                )
+                if cur.rowcount == 1:  # Otherwise another worker claimed it first
+                    break
+        return self.get_job(row[0])
+
+    def finish_job(self, job_id: int, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Record the outcome of a running job."""
+        sql = "UPDATE job SET status = ?, result = ?, error = ?, finished = ? WHERE id = ?"
+        self._execute_query(sql, (status, result, error, datetime.now(), job_id), commit=True)
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        sql = f"SELECT {', '.join(JOB_COLUMNS)} FROM job WHERE id = ?"
+        row = self._execute_query(sql, (job_id,), fetch_one=True)
+        return dict(zip(JOB_COLUMNS, row)) if row else None
+
+    def requeue_running_jobs(self) -> int:
+        """Queue again the jobs left running by a process that stopped; returns how many."""
+        with self._managed_cursor(commit_on_exit=True) as cur:
+            cur.execute("UPDATE job SET status = 'queued', started = NULL WHERE status = 'running'")
+            return cur.rowcount
+
     def close(self):
         if self.conn:
             self.conn.close()
             self.conn = None
+        # Pooled connections are shared process-wide; see close_all_pools().
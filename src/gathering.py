@@ -1,34 +1,94 @@
 import os
+import re
 import googleapiclient.discovery
 import googleapiclient.errors
 import logging
+from typing import List, Optional, Tuple
 
 from .settings import YOUTUBE_DEVELOPER_KEY as DEVELOPER_KEY
 from .db_manager import DBManager
-from .metadata_extractor import MetadataExtractor
+from .comment_fetcher import CommentFetcher, QuotaTracker, RateLimiter
 
 logger = logging.getLogger(__name__)
 
+CHANNEL_ID = re.compile(r"^UC[\w-]{22}$")
+# Longer than the 11 characters of a video ID
+PLAYLIST_ID = re.compile(r"^(?:PL|UU|LL|FL|OL|RD)[\w-]{12,}$")
+PLAYLIST_PAGE_SIZE = 50  # The most playlistItems.list returns per page
+
+
+def source_kind(source_id: str) -> str:
+    """"channel", "playlist" or "video", from the shape of a YouTube ID."""
+    if CHANNEL_ID.match(source_id):
+        return "channel"
+    if PLAYLIST_ID.match(source_id):
+        return "playlist"
+    return "video"
+
 
 class Gathering:
-    def __init__(self) -> None:
-        api_service_name = "youtube"
-        api_version = "v3"
-        
+    def __init__(
+        self,
+        batch_size: int = DBManager.BULK_BATCH_SIZE,
+        quota_budget: int = None,
+        requests_per_second: float = 10.0,
+        client_factory=None,
+        max_workers: int = 4,
+        max_videos: Optional[int] = None,
+    ) -> None:
         # Disable OAuthlib's HTTPS verification for local development
         # This is required by the YouTube API client. Do not enable in production.
         os.environ["OAUTHLIB_INSECURE_TRANSPORT"] = "1"
-        
-        self.youtube = googleapiclient.discovery.build(
+
+        # Clients come from the fetcher's pool, so one Gathering can serve
+        # several threads without two of them sharing a client
+        self.client_factory = client_factory or self._build_client
+        self.db = DBManager()
+        self.quota = QuotaTracker(quota_budget)
+        self.fetcher = CommentFetcher(
+            self.client_factory,
+            db=self.db,
+            quota=self.quota,
+            rate_limiter=RateLimiter(requests_per_second, burst=max(1, int(requests_per_second))),
+            batch_size=batch_size,
+        )
+        self.max_workers = max_workers  # Videos of a channel or playlist gathered at once
+        self.max_videos = max_videos  # Most videos taken from a channel or playlist
+
+    def _build_client(self):
+        api_service_name = "youtube"
+        api_version = "v3"
+        return googleapiclient.discovery.build(
             api_service_name, api_version, developerKey=DEVELOPER_KEY
         )
-        self.db = DBManager()
 
-    def execute(self, video_id):
+    def _save_video(self, video_id):
+        """Look up a video's title and store it; raises ValueError if it is not accessible."""
+        with self.fetcher.client() as youtube:
+            request_video_details = youtube.videos().list(part="snippet", id=video_id)
+            response_video_details = self.fetcher.call("videos.list", request_video_details)
+
+        # Check if video exists
+        if not response_video_details.get("items"):
+            error_msg = f"Video {video_id} not found or not accessible. Please check if the video ID is correct and the video is publicly available."
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        video_title = response_video_details["items"][0]["snippet"]["title"]
+        logger.info(f"Found video: {video_title} ({video_id})")
+        self.db.save_video_title(video_id, video_title)
+
+    def execute(self, video_id, incremental=None):
         """Execute the gathering process for the given video ID.
+
+        Channel and playlist IDs are expanded into their videos and gathered
+        as a group (see execute_channel and execute_playlist).
         
         Args:
-            video_id (str): The YouTube video ID to gather comments from.
+            video_id (str): The YouTube video, channel or playlist ID to gather comments from.
+            incremental (bool): Only fetch comments newer than the newest stored
+                one. Defaults to doing so once a gather of every comment page
+                of the video has finished.
             
         Raises:
             ValueError: If video_id is empty or invalid
@@ -39,55 +99,30 @@ class Gathering:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+        kind = source_kind(video_id)
+        if kind == "channel":
+            self.execute_channel(video_id)
+            return
+        if kind == "playlist":
+            self.execute_playlist(video_id)
+            return
+
         try:
-            extractor = MetadataExtractor()
+            self._save_video(video_id)
 
-            # Get video details
-            request_video_details = self.youtube.videos().list(part="snippet", id=video_id)
-            response_video_details = request_video_details.execute()
-            
-            # Check if video exists
-            if not response_video_details.get("items"):
-                error_msg = f"Video {video_id} not found or not accessible. Please check if the video ID is correct and the video is publicly available."
-                logger.error(error_msg)
-                raise ValueError(error_msg)
-            
-            video_title = response_video_details["items"][0]["snippet"]["title"]
-            logger.info(f"Found video: {video_title} ({video_id})")
-            self.db.save_video_title(video_id, video_title)
+            if incremental is None:
+                incremental = self.db.full_gather_finished(video_id)
 
-            # Get comments
-            request = self.youtube.commentThreads().list(
-                part="snippet", maxResults=3000, videoId=video_id
-            )
-            response = request.execute()
+            # Pages are prefetched in the background while earlier ones are written
+            saved = self.fetcher.fetch(video_id, incremental=incremental)
+            logger.info(f"YouTube quota spent so far: {self.quota.spent} units")
 
             # Check if video has comments
-            if not response.get("items"):
+            if not saved and not incremental:
                 warning_msg = f"No comments found for video {video_id}"
                 logger.warning(warning_msg)
                 return
 
-            # Process all comment pages
-            while response:
-                for item in response["items"]:
-                    comment = extractor.extract(item)
-                    comment.video_id = video_id
-                    if len(comment.text) > 20:
-                        self.db.save_comment(comment)
-
-                # Get the next page of comments if available
-                if "nextPageToken" not in response:
-                    break
-                    
-                request = self.youtube.commentThreads().list(
-                    part="snippet",
-                    maxResults=3000,
-                    videoId=video_id,
-                    pageToken=response["nextPageToken"],
-                )
-                response = request.execute()
-
         except googleapiclient.errors.HttpError as e:
             error_msg = f"YouTube API error occurred: {str(e)}"
             logger.error(error_msg)
@@ -96,3 +131,118 @@ class Gathering:
             error_msg = f"An unexpected error occurred: {str(e)}"
             logger.error(error_msg)
             raise
+
+    def execute_many(self, video_ids, max_workers: int = 4, incremental: bool = False) -> dict:
+        """Gather several videos concurrently through the shared rate limiter.
+
+        Returns a mapping of video ID to the number of comments saved, or to
+        the exception that stopped that video.
+        """
+        results = {}
+        accessible = []
+        for video_id in dict.fromkeys(video_ids):
+            try:
+                self._save_video(video_id)
+                accessible.append(video_id)
+            except Exception as e:
+                results[video_id] = e
+        results.update(
+            self.fetcher.fetch_many(accessible, max_workers=max_workers, incremental=incremental)
+        )
+        logger.info(
+            f"Gathered {len(accessible)} videos using {self.quota.spent} YouTube quota units"
+        )
+        return results
+
+    def list_playlist_videos(self, playlist_id, max_videos: Optional[int] = None) -> List[Tuple[str, str]]:
+        """``(video_id, title)`` of a playlist's public and unlisted videos, in playlist order.
+
+        Pages through ``playlistItems.list``, 50 videos per quota unit, and
+        stops once ``max_videos`` are found.
+        """
+        videos = []
+        page_token = None
+        while max_videos is None or len(videos) < max_videos:
+            params = dict(part="snippet,status", playlistId=playlist_id, maxResults=PLAYLIST_PAGE_SIZE)
+            if page_token:
+                params["pageToken"] = page_token
+            with self.fetcher.client() as youtube:
+                response = self.fetcher.call("playlistItems.list", youtube.playlistItems().list(**params))
+            for item in response.get("items", []):
+                # Private and deleted videos stay listed but have no comments to read
+                if item.get("status", {}).get("privacyStatus") in ("public", "unlisted"):
+                    videos.append((item["snippet"]["resourceId"]["videoId"], item["snippet"]["title"]))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+        return videos[:max_videos]
+
+    def execute_channel(self, channel_id, max_videos: Optional[int] = None) -> dict:
+        """Gather the uploads of a channel as one group named after the channel ID."""
+        with self.fetcher.client() as youtube:
+            request = youtube.channels().list(part="snippet,contentDetails", id=channel_id)
+            response = self.fetcher.call("channels.list", request)
+        if not response.get("items"):
+            error_msg = f"Channel {channel_id} not found or not accessible."
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        channel = response["items"][0]
+        uploads = channel["contentDetails"]["relatedPlaylists"]["uploads"]
+        return self._execute_group(channel_id, channel["snippet"]["title"], uploads, max_videos)
+
+    def execute_playlist(self, playlist_id, max_videos: Optional[int] = None) -> dict:
+        """Gather the videos of a playlist as one group named after the playlist ID."""
+        with self.fetcher.client() as youtube:
+            request = youtube.playlists().list(part="snippet", id=playlist_id)
+            response = self.fetcher.call("playlists.list", request)
+        if not response.get("items"):
+            error_msg = f"Playlist {playlist_id} not found or not accessible."
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        return self._execute_group(playlist_id, response["items"][0]["snippet"]["title"], playlist_id, max_videos)
+
+    def _execute_group(self, group_id, title, playlist_id, max_videos: Optional[int] = None) -> dict:
+        """Gather every video of a playlist and store them as the group ``group_id``.
+
+        Titles come with the playlist listing, so no video costs a
+        ``videos.list`` call. The videos share the fetcher's workers, rate
+        limiter and quota budget; with a budget, what is left after the
+        listing is split evenly into a page cap per video. A video cut short
+        by its cap has not finished a full gather, so a later run reads it
+        from the first page again rather than only its new comments. Returns
+        a mapping of video ID to comments saved, or to the exception that
+        stopped it.
+        """
+        try:
+            videos = self.list_playlist_videos(playlist_id, max_videos or self.max_videos)
+        except googleapiclient.errors.HttpError as e:
+            error_msg = f"YouTube API error occurred: {str(e)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg) from e
+        video_ids = [video_id for video_id, _ in videos]
+        self.db.save_video_titles(videos)
+        self.db.save_video_group(group_id, title, video_ids)
+        if not video_ids:
+            logger.warning(f"No videos found for {group_id} ({title})")
+            return {}
+
+        remaining = self.quota.remaining()
+        max_pages = None if remaining is None else max(1, remaining // len(video_ids))
+        logger.info(
+            f"Gathering {len(video_ids)} videos of {title} ({group_id}), {self.max_workers} at a time"
+            + (f", at most {max_pages} pages each" if max_pages is not None else "")
+        )
+        # Only videos whose full gather finished fetch just their new comments;
+        # the fetcher checks that per video
+        results = self.fetcher.fetch_many(
+            video_ids, max_workers=self.max_workers, incremental=True, max_pages=max_pages
+        )
+        failed = [video_id for video_id, result in results.items() if isinstance(result, Exception)]
+        logger.info(
+            f"Gathered {len(video_ids) - len(failed)} of {len(video_ids)} videos of {group_id} "
+            f"({sum(r for r in results.values() if not isinstance(r, Exception))} comments) "
+            f"using {self.quota.spent} YouTube quota units"
+        )
+        if len(failed) == len(video_ids):
+            raise ValueError(f"No video of {group_id} could be gathered: {results[failed[0]]}")
+        return results
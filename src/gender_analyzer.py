@@ -1,16 +1,136 @@
-import json
+import logging
+from typing import Dict, Iterable, List, Optional
+
 import requests
+
 from . import settings
+from .db_manager import DBManager
+from .model_registry import models
+from .name_gender_table import NameGenderTable, load_bundled_table, normalize_first_name
+
+logger = logging.getLogger(__name__)
 
 
 class GenderAnalyzer:
+    """Infers an author's gender from the first name in their display name.
+
+    First names are looked up in the bundled name table, then in the
+    ``name_gender`` cache of names resolved before. Only names found in
+    neither are sent to Namsor's batch endpoint, ``batch_size`` at a time,
+    and the answers are cached, so each distinct name is resolved remotely
+    once across all videos. Without a Namsor key, unknown names stay unknown.
+    """
+
+    SOURCE = "namsor"
+
+    def __init__(
+        self,
+        db: Optional[DBManager] = None,
+        table: Optional[NameGenderTable] = None,
+        api_key: Optional[str] = settings.NAMSOR_KEY,
+        base_url: str = settings.NAMSOR_URL,
+        batch_size: int = 100,
+        min_confidence: float = 0.6,
+        timeout: float = 30.0,
+    ):
+        """
+        Args:
+            db: Holds the cache of remotely resolved names.
+            table: Local name table (default: the bundled one, loaded once per process).
+            api_key: Namsor API key; None disables the remote lookup.
+            base_url: Namsor API root.
+            batch_size: Names per Namsor request; the API accepts up to 100.
+            min_confidence: Probability a gender needs to be assigned.
+            timeout: Seconds to wait for a Namsor response.
+        """
+        self.db = db or DBManager()
+        self.table = table or models.get(load_bundled_table)
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.min_confidence = min_confidence
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.remote_lookups = 0  # Names sent to Namsor by this instance
+
+    def _request_namsor(self, names: List[str]) -> Dict[str, float]:
+        """Male probability of each of ``names`` (at most ``batch_size``) per Namsor."""
+        response = self.session.post(
+            f"{self.base_url}/api2/json/genderBatch",
+            json={
+                "personalNames": [
+                    {"id": str(i), "firstName": name, "lastName": ""} for i, name in enumerate(names)
+                ]
+            },
+            headers={"X-API-KEY": self.api_key},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        probabilities = {}
+        for person in response.json().get("personalNames", []):
+            scale = person.get("genderScale")  # -1 male ... 1 female
+            if scale is not None:
+                probabilities[names[int(person["id"])]] = (1 - float(scale)) / 2
+        return probabilities
+
+    def _resolve_remote(self, names: List[str]) -> Dict[str, Optional[float]]:
+        resolved = {}
+        for start in range(0, len(names), self.batch_size):
+            chunk = names[start:start + self.batch_size]
+            try:
+                probabilities = self._request_namsor(chunk)
+            except (requests.RequestException, ValueError) as e:
+                # Not cached, so the next run tries these names again
+                logger.error(f"Namsor lookup of {len(chunk)} names failed: {e}")
+                continue
+            self.remote_lookups += len(chunk)
+            answers = [(name, probabilities.get(name)) for name in chunk]
+            self.db.save_name_genders(answers, self.SOURCE)
+            resolved.update(answers)
+        return resolved
+
+    def male_probabilities(self, first_names: Iterable[str]) -> Dict[str, Optional[float]]:
+        """Male probability per normalised first name; None where it is unknown."""
+        probabilities = {}
+        unknown = []
+        for name in dict.fromkeys(first_names):
+            probability = self.table.get(name)
+            if probability is None:
+                unknown.append(name)
+            else:
+                probabilities[name] = probability
+
+        if unknown:
+            cached = self.db.get_name_genders(unknown)
+            probabilities.update(cached)
+            unknown = [name for name in unknown if name not in cached]
+        if unknown and self.api_key:
+            logger.info(f"Resolving {len(unknown)} first names with Namsor")
+            probabilities.update(self._resolve_remote(unknown))
+        for name in unknown:
+            probabilities.setdefault(name, None)
+        return probabilities
+
+    def gender(self, male_probability: Optional[float]) -> Optional[str]:
+        """"male", "female", or None below ``min_confidence``."""
+        if male_probability is None:
+            return None
+        if male_probability >= self.min_confidence:
+            return "male"
+        if 1 - male_probability >= self.min_confidence:
+            return "female"
+        return None
 
-    def get_names_genders(self, full_name_list) -> str:
-        genders = {}
-        for name_dict in full_name_list:
-            # Assuming each item in full_name_list is a dict with an 'author' key
-            author_name = name_dict.get("id", "")
-            if author_name:
-                genders[author_name] = "male"
+    def get_names_genders(self, full_name_list: List[Dict[str, str]]) -> List[Dict[str, Optional[str]]]:
+        """Gender of each author.
 
-        return genders
+        Takes ``{"id": ..., "name": ...}`` dicts and returns ``{"id": ...,
+        "gender": ...}`` dicts in the same order, with "male", "female" or
+        None when the name does not tell.
+        """
+        first_names = [normalize_first_name(item.get("name", "")) for item in full_name_list]
+        probabilities = self.male_probabilities(name for name in first_names if name)
+        return [
+            {"id": item["id"], "gender": self.gender(probabilities.get(first_name))}
+            for item, first_name in zip(full_name_list, first_names)
+        ]
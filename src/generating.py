@@ -36,19 +36,22 @@ class PersonaBuilder:
             {}
         )  # Maps author_clean_name to gender to avoid double counting if name appears with different genders (unlikely)
 
-        comments_data = self.db.get_comments(video_id)  # Returns list of dicts
-        for comment_dict in comments_data:
-            author_name = comment_dict.get("author_clean_name")
-            author_gender = comment_dict.get("author_gender")
-
-            if (
-                author_name and author_gender
-            ):  # Process only if name and gender are present
-                if author_name not in author_gender_map:
-                    author_gender_map[author_name] = author_gender
-                    genders_count[author_gender] = (
-                        genders_count.get(author_gender, 0) + 1
-                    )
+        chunks = self.db.iter_comments(
+            video_id,
+            columns=("author_clean_name", "author_gender"),
+            not_null=("author_clean_name", "author_gender"),
+            row_format="tuple",
+        )  # Streams lists of (name, gender) tuples
+        for comments_data in chunks:
+            for author_name, author_gender in comments_data:
+                if (
+                    author_name and author_gender
+                ):  # Process only if name and gender are present
+                    if author_name not in author_gender_map:
+                        author_gender_map[author_name] = author_gender
+                        genders_count[author_gender] = (
+                            genders_count.get(author_gender, 0) + 1
+                        )
 
         if not genders_count or (genders_count["M"] == 0 and genders_count["F"] == 0):
             logger.warning(
@@ -0,0 +1,149 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[\W_]+")
+_NOT_CONTRACTION = re.compile(r"n['’]t\b")  # "isn't" -> "is not"
+
+# Words that negate a statement, per language LLMAnalysis writes items in.
+# Per language because a negation in one is an ordinary word in another:
+# Spanish "no" is "in the" in Portuguese ("no vídeo")
+NEGATION_WORDS: Dict[str, FrozenSet[str]] = {
+    "English": frozenset("no not never none nobody nothing nor neither cannot".split()),
+    "Portuguese": frozenset("não nao nunca nem nada ninguém nenhum nenhuma jamais".split()),
+    "Spanish": frozenset("no ni nunca jamás nada nadie ninguno ninguna tampoco".split()),
+    "French": frozenset("ne n pas jamais rien personne aucun aucune".split()),
+    "German": frozenset("nicht kein keine keinen keinem keiner nie niemals nichts".split()),
+}
+
+
+class ItemClusterer:
+    """Groups near-duplicate short texts, such as the issues or wishes of a persona.
+
+    Items are compared as TF-IDF vectors of their character n-grams (taken
+    within word boundaries, after lowercasing and dropping punctuation), so
+    "Video is too long" and "The video is too long." end up together while
+    "Video is too short" does not. Items are never merged when they use
+    different negation words of the items' language, so "Video is not too
+    long" stays apart from "Video is too long" however similar their
+    n-grams. Everything runs
+    locally in NumPy.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        ngram_size: int = 3,
+        dimensions: int = 1024,
+        block_size: int = 1024,
+    ):
+        """
+        Args:
+            threshold: Cosine similarity at or above which two items are duplicates.
+            ngram_size: Length of the character n-grams compared.
+            dimensions: Width of the vectors; n-grams beyond it share columns.
+            block_size: Rows of the similarity matrix computed at a time.
+        """
+        self.threshold = threshold
+        self.ngram_size = ngram_size
+        self.dimensions = dimensions
+        self.block_size = block_size
+
+    def normalize(self, item: str) -> str:
+        item = _NOT_CONTRACTION.sub(" not", item.lower())
+        return " ".join(_NON_WORD.sub(" ", item).split())
+
+    def _negation_classes(self, texts: List[str], language: str) -> np.ndarray:
+        """One integer per normalised text; equal for texts with the same negation words.
+
+        Languages without a list of their own use the English one.
+        """
+        negation_words = NEGATION_WORDS.get(language, NEGATION_WORDS["English"])
+        classes: Dict[frozenset, int] = {}
+        return np.array(
+            [classes.setdefault(negation_words.intersection(text.split()), len(classes)) for text in texts]
+        )
+
+    def _ngrams(self, text: str) -> List[str]:
+        n = self.ngram_size
+        grams = []
+        for word in text.split():
+            word = f" {word} "
+            grams.extend(word[i:i + n] for i in range(max(1, len(word) - n + 1)))
+        return grams
+
+    def _vectors(self, texts: List[str]) -> np.ndarray:
+        """L2-normalised TF-IDF rows, one per text."""
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for gram in self._ngrams(text):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(gram, len(vocabulary)) % self.dimensions)
+
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        if not rows:
+            return matrix
+        np.add.at(matrix, (np.array(rows), np.array(cols)), 1.0)
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        matrix *= (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def cluster(self, items: Iterable[str], language: str = "English") -> List[Tuple[str, int]]:
+        """Cluster ``items``; returns ``(representative, weight)`` per cluster.
+
+        Items that normalise to the same text are counted together first.
+        Then, heaviest first, each not yet clustered item starts a cluster and
+        claims every unclustered item similar enough to it that has the same
+        negation words in ``language``. A cluster's
+        weight is the number of input items in it; its representative is the
+        most frequent spelling of its heaviest member. Clusters come out
+        heaviest first, ties in order of their representative's first
+        appearance.
+        """
+        forms: Dict[str, Dict[str, int]] = {}  # Normalised text -> spelling -> count
+        for item in items:
+            item = item.strip()
+            if not item:
+                continue
+            key = self.normalize(item) or item.lower()
+            spellings = forms.setdefault(key, {})
+            spellings[item] = spellings.get(item, 0) + 1
+        if not forms:
+            return []
+
+        keys = list(forms)
+        weights = np.array([sum(forms[key].values()) for key in keys])
+        vectors = self._vectors(keys)
+        negations = self._negation_classes(keys, language)
+
+        neighbours = []
+        for start in range(0, len(keys), self.block_size):
+            similarity = vectors[start:start + self.block_size] @ vectors.T
+            neighbours.extend(np.flatnonzero(row >= self.threshold) for row in similarity)
+
+        # Heaviest first; the stable sort keeps first appearance among equals
+        order = np.argsort(-weights, kind="stable")
+        leader = np.full(len(keys), -1)
+        for i in order:
+            if leader[i] >= 0:
+                continue
+            candidates = neighbours[i]
+            members = candidates[(leader[candidates] < 0) & (negations[candidates] == negations[i])]
+            leader[members] = i
+            leader[i] = i
+
+        totals: Dict[int, int] = {}
+        for i, lead in enumerate(leader):
+            totals[lead] = totals.get(lead, 0) + int(weights[i])
+        clusters = sorted(totals.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [
+            (max(forms[keys[lead]].items(), key=lambda form: form[1])[0], weight)
+            for lead, weight in clusters
+        ]
+
+    def dedupe(self, items: Iterable[str], language: str = "English") -> List[str]:
+        """One representative per cluster, heaviest first."""
+        return [representative for representative, _ in self.cluster(items, language)]
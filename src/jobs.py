@@ -0,0 +1,127 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional
+
+from .db_manager import DBManager
+from .main import STAGES
+from .pipeline import DONE, FAILED
+from .services import PersonaData, PersonaGenerator
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+ERROR_TITLES = ("Error", "No Video Selected")  # PersonaData titles of failed generations
+
+
+class JobQueue:
+    """Persona generation in background workers, fed through the ``job`` table.
+
+    submit() only writes a row, so a UI handler returns at once however
+    long the pipeline takes. Requests for a video that already has a queued
+    or running job get that job's ID, so concurrent users share one run.
+    Pollers read the job and the video's pipeline stage checkpoints, which
+    the workers update as they go. Jobs left running by a process that
+    stopped are queued again on start() and resume from their last
+    completed stage.
+    """
+
+    def __init__(
+        self,
+        generator: Optional[PersonaGenerator] = None,
+        db: Optional[DBManager] = None,
+        workers: int = 2,
+        poll_interval: float = 0.5,
+    ):
+        self.generator = generator or PersonaGenerator()
+        self.db = db if db is not None else DBManager()
+        self.workers = workers
+        self.poll_interval = poll_interval  # Fallback wait between checks for queued jobs
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start the workers, first queueing again any job an earlier process left running."""
+        requeued = self.db.requeue_running_jobs()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted persona jobs")
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"persona-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers once their current jobs finish."""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, video_id: str, language: str = "English", refresh: bool = False) -> int:
+        """Queue a persona for a video; returns the job ID, shared with any active job for it."""
+        video_id = (video_id or "").strip()
+        if not video_id:
+            raise ValueError("Please enter a video ID")
+        job_id, created = self.db.create_job(video_id, language, refresh)
+        if created:
+            logger.info(f"Queued persona job {job_id} for video {video_id}")
+            with self._wakeup:
+                self._wakeup.notify()
+        else:
+            logger.info(f"Video {video_id} already has active job {job_id}; joining it")
+        return job_id
+
+    def status(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """The job's row, or None for an unknown job.
+
+        Adds ``stages``, the video's pipeline stage statuses in stage order,
+        and ``persona``, the finished PersonaData (None until then).
+        """
+        job = self.db.get_job(job_id)
+        if job is None:
+            return None
+        states = self.db.get_stage_states(job["video_id"])
+        job["stages"] = {stage.name: states[stage.name] for stage in STAGES if stage.name in states}
+        job["persona"] = PersonaData(**json.loads(job["result"])) if job["result"] else None
+        return job
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until the job is done or failed, or ``timeout`` passes; returns its status."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job is None or job["status"] in (DONE, FAILED):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(self.poll_interval)
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            job = self.db.claim_next_job()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        video_id = job["video_id"]
+        logger.info(f"Running persona job {job['id']} for video {video_id}")
+        try:
+            persona = self.generator.generate_persona(video_id, job["language"], bool(job["refresh"]))
+        except Exception as e:  # generate_persona reports errors in the persona; this is a bug
+            logger.error(f"Persona job {job['id']} for video {video_id} failed: {e}", exc_info=True)
+            self.db.finish_job(job["id"], FAILED, error=f"{type(e).__name__}: {e}")
+            return
+        if persona.title in ERROR_TITLES:
+            self.db.finish_job(job["id"], FAILED, json.dumps(asdict(persona)), persona.status)
+        else:
+            self.db.finish_job(job["id"], DONE, json.dumps(asdict(persona)))
+        logger.info(f"Finished persona job {job['id']} for video {video_id}: {persona.status}")
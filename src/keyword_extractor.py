@@ -1,13 +1,46 @@
+import nltk
 from rake_nltk import Rake
 import yake
-import spacy
+
+from .model_registry import models
+
+SPACY_MODEL = "en_core_web_sm"  # The model requirements.txt installs
+
+
+def load_rake_stopwords(language):
+    return set(nltk.corpus.stopwords.words(language))
+
+
+def load_yake(language, top):
+    return yake.KeywordExtractor(
+        lan=language,
+        n=3,  # max_ngram_size
+        dedupLim=0.8,  # deduplication_threshold
+        dedupFunc="seqm",
+        windowsSize=1,
+        top=top,
+        features=None,
+    )
+
+
+def load_spacy(name, pipes):
+    import spacy  # Slow to import; only needed for get_spacy_keyword
+
+    return spacy.load(name, enable=list(pipes))
 
 
 class KeywordExtractor:
+    """Keyword extraction over a video's comments.
 
-    def get_rake_keywords(self, text):
+    Models and extractors come from the per-process model registry, so
+    they are built once and shared by every video analysed after that.
+    """
+
+    def get_rake_keywords(self, text, language="english"):
+        # Rake keeps per-text state, so only its stopwords are shared
         rake_nltk_var = Rake(
-            language="english",
+            stopwords=models.get(load_rake_stopwords, language),
+            language=language,
             include_repeated_phrases=False,
             min_length=2,
             max_length=4,
@@ -25,28 +58,14 @@ class KeywordExtractor:
         return keywords
 
     # the best one
-    def get_yake_keywords(self, text):
-        language = "en"
-        max_ngram_size = 3
-        deduplication_threshold = 0.8
-        deduplication_algo = "seqm"
-        windowSize = 1
-        numOfKeywords = 40
-
-        custom_kw_extractor = yake.KeywordExtractor(
-            lan=language,
-            n=max_ngram_size,
-            dedupLim=deduplication_threshold,
-            dedupFunc=deduplication_algo,
-            windowsSize=windowSize,
-            top=numOfKeywords,
-            features=None,
-        )
+    def get_yake_keywords(self, text, language="en", top=40):
+        """Top YAKE keywords of ``text`` with the stopwords of ``language``."""
+        custom_kw_extractor = models.get(load_yake, language, top)
         keywords = custom_kw_extractor.extract_keywords(text)
         return keywords
 
-    def get_spacy_keyword(self, text):
-        nlp = spacy.load("en_core_news_sm")
+    def get_spacy_keyword(self, text, model=SPACY_MODEL):
+        nlp = models.get(load_spacy, model, ("ner",))  # Entities are all this needs
         doc = nlp(text)
 
         return [ent for ent in doc.ents]
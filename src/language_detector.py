@@ -0,0 +1,123 @@
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langdetect import DetectorFactory, LangDetectException
+from langdetect.detector_factory import PROFILES_DIRECTORY
+
+from .model_registry import models
+
+UNDETERMINED = "und"  # ISO 639-2 code for "no language could be told"
+
+# Frequent function words of the comment languages the UI offers. Words
+# shared by several languages ("que", "a") count for each of them.
+FUNCTION_WORDS = {
+    "en": """the and is are was were this that these you your it its of to in for with
+        what have has not but my so just very really thanks thank be on they we me do
+        how why about from would there their will an if at or when people know think
+        don can i he she his her our been because than""",
+    "pt": """o os a as e é não nao que de do da dos das em no na um uma para com muito muita
+        mais mas eu você voce vc ele ela isso esse essa este esta meu minha obrigado
+        obrigada parabéns está tá são também como só já bem bom boa aqui quando
+        porque tudo sim pra pelo pela seu sua nos ao vídeo""",
+    "es": """el la los las y es no pero muy más por para con que de del en un una lo le
+        me mi tu yo este esta esto gracias también como cuando porque todo bien bueno
+        buena hay está son se su sus al ya eres hola muchas mucho pero ese eso""",
+    "fr": """le la les et est un une des du de je tu il elle nous vous ce cette pas ne que
+        qui pour avec dans sur très mais merci bien bravo vidéo j n l d c qu au aux mon
+        ma mes ton ça sont aussi comme tout trop vraiment génial leur cest suis""",
+    "de": """der die das und ist ich du er sie es wir ihr nicht ein eine einen mit auf für
+        von zu den dem sehr auch aber danke wie was noch mal schon gut toll immer mehr
+        wenn dass bitte wirklich kann habe hast sind bin dieses diese hier""",
+}
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+
+def load_langdetect(seed):
+    factory = DetectorFactory()
+    factory.load_profile(PROFILES_DIRECTORY)
+    factory.seed = seed  # Detectors reseed with it on every call
+    return factory
+
+
+class LanguageDetector:
+    """Language of each comment, as an ISO 639-1 code or UNDETERMINED.
+
+    A fast prefilter settles most comments without langdetect: a comment
+    that uses at least ``min_hits`` FUNCTION_WORDS of one language, and more
+    than twice as many as of any other, is that language. The rest go to
+    langdetect, seeded so the same text always gets the same answer, unless
+    they have fewer than ``min_letters`` letters; those, and langdetect
+    guesses below ``min_probability``, are UNDETERMINED. Results are cached
+    by text, so repeated comments are detected once.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        min_hits: int = 2,
+        min_probability: float = 0.8,
+        min_letters: int = 12,
+        cache_size: int = 100_000,
+    ):
+        self.seed = seed
+        self.min_hits = min_hits
+        self.min_probability = min_probability
+        self.min_letters = min_letters
+        self.cache_size = cache_size
+        self._factory = None  # langdetect profiles, shared and loaded on first use
+        self._cache: Dict[str, str] = {}
+        self._languages: Dict[str, Tuple[str, ...]] = {}
+        for language, words in FUNCTION_WORDS.items():
+            for word in words.split():
+                self._languages[word] = self._languages.get(word, ()) + (language,)
+        self.prefiltered = 0  # Comments settled by the prefilter
+        self.langdetect_calls = 0
+
+    def _prefilter(self, words: Iterable[str]) -> Optional[str]:
+        hits = dict.fromkeys(FUNCTION_WORDS, 0)
+        for word in words:
+            for language in self._languages.get(word, ()):
+                hits[language] += 1
+        second, best = sorted(hits.values())[-2:]
+        if best >= self.min_hits and best > 2 * second:
+            return max(hits, key=hits.get)
+        return None
+
+    def _langdetect(self, text: str) -> str:
+        if self._factory is None:
+            self._factory = models.get(load_langdetect, self.seed)
+        self.langdetect_calls += 1
+        detector = self._factory.create()
+        detector.append(text)
+        try:
+            guess = detector.get_probabilities()[0]
+        except (LangDetectException, IndexError):  # Nothing langdetect can read
+            return UNDETERMINED
+        if guess.prob < self.min_probability:
+            return UNDETERMINED
+        return guess.lang.split("-")[0]  # "zh-cn" is "zh"
+
+    def detect(self, text: str) -> str:
+        language = self._cache.get(text)
+        if language is not None:
+            return language
+
+        words = _WORD.findall(text.lower())
+        language = self._prefilter(words)
+        if language is not None:
+            self.prefiltered += 1
+        elif sum(map(len, words)) < self.min_letters:
+            language = UNDETERMINED  # Too short for langdetect to be any good
+        else:
+            language = self._langdetect(text)
+
+        if self.cache_size:
+            if len(self._cache) >= self.cache_size:
+                del self._cache[next(iter(self._cache))]  # Oldest first
+            self._cache[text] = language
+        return language
+
+    def detect_many(self, texts: Sequence[str]) -> List[str]:
+        """Language of each text, in input order."""
+        return [self.detect(text) for text in texts]
@@ -1,11 +1,20 @@
 from .db_manager import DBManager
 from .comment import Comment
-from openai import OpenAI
+from .comment_prefilter import CommentPrefilter
+from .item_clustering import ItemClusterer
+from .llm_cache import LLMCache
+from .llm_executor import LLMExecutor, TokenBucketLimiter
+from openai import AsyncOpenAI
 from .settings import OPENAI_API_KEY  # Import OPENAI_API_KEY
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, List, Dict, Optional, Tuple
+import asyncio
+import bisect
+import os
+import threading
 import json
 from itertools import islice
-import time
 import tiktoken
 import logging
 
@@ -17,6 +26,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "You are a helpful assistant that analyzes YouTube comments and returns JSON."
+
+# Tokens the chat format adds around each message, and before the reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMER_TOKENS = 3
+
+# Below this many texts per thread, threading costs more than it saves
+MIN_TEXTS_PER_THREAD = 256
+
 
 class LLMAnalysis:
     def __init__(self) -> None:
@@ -27,9 +45,23 @@ class LLMAnalysis:
         self.model = "gpt-4"  # Using standard GPT-4 model
         self.max_tokens_per_request = 6000  # Reduced to stay under context limit
         self.max_tokens_response = 1000  # Reduced response size
-
-        # Initialize OpenAI client with the imported API key
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.max_comments = 400  # Most comments sent to the LLM outside map-reduce
+        self.candidate_pool = 4000  # Most liked comments the prefilter samples from
+        self.sample_token_budget = 40000  # Comment tokens sampled outside map-reduce
+        self.token_budget = 2_000_000  # Per map-reduce run, across all tiers
+        self.max_items_per_list = 10  # Per list in a consolidated analysis
+        self.max_concurrency = 8  # Batches in flight at once
+        self.requests_per_minute = 500  # Account rate limits for self.model
+        self.tokens_per_minute = 40000
+        self.max_retries = 3
+        self.tokenizer_threads = min(8, os.cpu_count() or 1)
+        self.base_url = None  # OpenAI-compatible endpoint; None uses the OpenAI API
+        self.cache = LLMCache(self.db)  # Set self.cache.bypass to force fresh replies
+        self.clusterer = ItemClusterer()  # Folds near-duplicate items in merge_results
+        self.prefilter = CommentPrefilter()  # None sends comments unfiltered
+        self.prefilter_report: Dict[str, int] = {}  # Of the last prefiltered video
+        self._limiter: Optional[TokenBucketLimiter] = None  # Built on first use
+        self._limiter_lock = threading.Lock()
 
         try:
             self.encoding = tiktoken.encoding_for_model("gpt-4")
@@ -39,66 +71,105 @@ class LLMAnalysis:
 
     def count_tokens(self, text: str) -> int:
         """Count the number of tokens in a text string."""
-        return len(self.encoding.encode(text))
-
-    def batch_comments(self, comments: List[Dict]) -> List[List[Dict]]:
-        """Split comments into batches based on token count."""
-        current_batch = []
-        current_tokens = 0
-        batches = []
-
-        # Updated prompt for token counting
-        new_prompt_text = """
-            Analyze the following YouTube comments. Extract and summarize:
-            - Common issues
-            - Common wishes
-            - Common pains
-            - Common expressions or catchphrases
-            - Name (Summarize all names into one)
-            - Gender (Summarize all genders into one, based on the average comments it should be male or female)
-            - Age (Summarize all ages into one, based on the content of the comments text which is related to age)
-            - Language (Summarize all languages into one, based on the content of the comments which is related to language)
-
-            Return your response as a single JSON object with four keys: "issues", "wishes", "pains", and "expressions". Each key should correspond to a list of strings (the extracted items).
-
-            Comments:
-        """  # Note: removed {comments} placeholder for base token count
-        base_prompt_tokens = self.count_tokens(new_prompt_text)
-
-        max_batch_tokens = (
-            self.max_tokens_per_request - base_prompt_tokens - self.max_tokens_response
+        # Comments are user text: special-token markup is counted as plain text
+        return len(self.encoding.encode_ordinary(text))
+
+    def _count_tokens_chunk(self, texts: List[str]) -> List[int]:
+        return [len(self.encoding.encode_ordinary(text)) for text in texts]
+
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts, encoded across tokenizer threads.
+
+        tiktoken releases the GIL while encoding. Its own encode_batch submits
+        one thread-pool task per text, which costs more than encoding a short
+        comment, so each thread gets one contiguous chunk instead.
+        """
+        workers = min(self.tokenizer_threads, len(texts) // MIN_TEXTS_PER_THREAD)
+        if workers <= 1:
+            return self._count_tokens_chunk(texts)
+        size = -(-len(texts) // workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(
+                self._count_tokens_chunk, (texts[i:i + size] for i in range(0, len(texts), size))
+            )
+            return [count for chunk in chunks for count in chunk]
+
+    def _format_comment(self, comment: Dict) -> str:
+        """A comment as framed in the prompt."""
+        return f"Author: {comment.get('author_clean_name', '')}\nComment: {comment['text']}\n"
+
+    def _base_prompt_tokens(self, language: str) -> int:
+        """Tokens of a request without comments: both messages and the chat framing."""
+        texts = [SYSTEM_PROMPT, self._build_prompt([], language)]
+        return sum(self.count_tokens_batch(texts)) + 2 * MESSAGE_OVERHEAD_TOKENS + REPLY_PRIMER_TOKENS
+
+    def _truncate_comment(self, comment: Dict, excess_tokens: int) -> Dict:
+        """Copy of ``comment`` with its text shortened by ``excess_tokens`` tokens."""
+        tokens = self.encoding.encode_ordinary(comment["text"])
+        text = self.encoding.decode(tokens[: max(0, len(tokens) - excess_tokens)])
+        return {**comment, "text": text}
+
+    def _comment_costs(self, comments: List[Dict], language: str) -> Tuple[List[Dict], List[int], int]:
+        """Framed token cost of every comment, and the tokens a request has for comments.
+
+        Each comment costs exactly its framed tokens in the prompt (plus the
+        newline joining it to the next). A comment too long for any request
+        is truncated to fit; the returned list holds the truncated copies.
+        """
+        capacity = (
+            self.max_tokens_per_request - self.max_tokens_response - self._base_prompt_tokens(language)
         )
-
-        for comment in comments:
-            # Calculate tokens for both text and author name
-            comment_content = f"{comment['text']} {comment.get('author_clean_name', '')}"
-            comment_tokens = self.count_tokens(comment_content)
-            if current_tokens + comment_tokens > max_batch_tokens:
-                if current_batch:  # Save current batch if it exists
-                    batches.append(current_batch)
-                current_batch = [comment]
-                current_tokens = comment_tokens
+        if capacity <= 0:
+            raise ValueError("max_tokens_per_request leaves no room for comments")
+
+        comments = list(comments)
+        costs = self.count_tokens_batch([self._format_comment(c) + "\n" for c in comments])
+        for i, cost in enumerate(costs):
+            if cost > capacity:
+                logger.warning(f"Truncating comment {comments[i].get('id')} ({cost} tokens) to fit a request")
+                comments[i] = self._truncate_comment(comments[i], cost - capacity)
+                costs[i] = capacity
+        return comments, costs, capacity
+
+    @staticmethod
+    def _pack(costs: List[int], capacity: int) -> List[List[int]]:
+        """Group item indexes into as few bins of ``capacity`` as best-fit decreasing finds.
+
+        Indexes stay in input order within a bin, and bins are ordered by
+        their first index.
+        """
+        bins: List[List[int]] = []
+        free: List[Tuple[int, int]] = []  # (remaining tokens, bin index), sorted
+        for i in sorted(range(len(costs)), key=costs.__getitem__, reverse=True):
+            pos = bisect.bisect_left(free, (costs[i], -1))
+            if pos == len(free):
+                bins.append([i])
+                bisect.insort(free, (capacity - costs[i], len(bins) - 1))
             else:
-                current_batch.append(comment)
-                current_tokens += comment_tokens
-
-        if current_batch:  # Add the last batch if it exists
-            batches.append(current_batch)
-
-        return batches
-
-    def analyze_batch(self, comments_batch: List[Dict], language: str = "English") -> dict:
-        """Analyze a batch of comments using OpenAI API."""
-        try:
-            # Format comments with author names
-            formatted_comments = [
-                f"Author: {comment['author_clean_name']}\nComment: {comment['text']}\n"
-                for comment in comments_batch
-            ]
-            comments_text = "\n".join(formatted_comments)
-
-            # Updated prompt to request JSON
-            prompt = """
+                remaining, b = free.pop(pos)
+                bins[b].append(i)
+                bisect.insort(free, (remaining - costs[i], b))
+        return sorted(sorted(b) for b in bins)
+
+    def batch_comments(self, comments: List[Dict], language: str = "English") -> List[List[Dict]]:
+        """Split comments into as few requests as fit the token budget.
+
+        Comments are packed best-fit decreasing on their exact framed cost;
+        within a batch, and across batches by their first comment, the input
+        order is kept. A comment too long for any request is truncated to fit.
+        """
+        if not comments:
+            return []
+        comments, costs, capacity = self._comment_costs(comments, language)
+        return [[comments[i] for i in batch] for batch in self._pack(costs, capacity)]
+
+    def _build_prompt(self, comments_batch: List[Dict], language: str) -> str:
+        """Build the analysis prompt for one batch of comments."""
+        # Format comments with author names
+        comments_text = "\n".join(self._format_comment(comment) for comment in comments_batch)
+
+        # Updated prompt to request JSON
+        return """
             
             Analyze the following YouTube comments. Extract and summarize:
             - Common issues
@@ -129,48 +200,251 @@ class LLMAnalysis:
                 comments=comments_text,
                 language=language
             )
-            
-            #print(f"Prompt for batch analysis:\n{prompt}\n")  # Debugging line
-
-            max_retries = 3
-            retry_delay = 20  # seconds
-
-            last_exception = None
-            for attempt in range(max_retries):
-                try:
-                    logger.info(
-                        f"Attempting batch analysis (attempt {attempt + 1}/{max_retries})"
-                    )
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "You are a helpful assistant that analyzes YouTube comments and returns JSON.",
-                            },
-                            {"role": "user", "content": prompt},
-                        ],
-                        max_tokens=self.max_tokens_response,
-                    )
-                    return self._parse_response(response.choices[0].message.content)
-
-                except Exception as e:
-                    last_exception = e
-                    logger.error(f"Error in attempt {attempt + 1}: {str(e)}")
-                    if "rate_limit" in str(e).lower() and attempt < max_retries - 1:
-                        wait_time = retry_delay * (2**attempt)  # Exponential backoff
-                        logger.info(f"Rate limit hit, waiting {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
 
-            if last_exception:
-                raise last_exception  # Re-raise the last exception if all retries failed
-            
-            raise Exception("All retry attempts failed without an exception")
+    def _build_reduce_prompt(self, results: List[dict], language: str) -> str:
+        """Build the prompt that consolidates partial analyses into one."""
+        analyses = ",\n".join(json.dumps(result, ensure_ascii=False) for result in results)
+        return """
 
-        except Exception as e:
-            logger.error(f"Error in analyze_batch: {str(e)}")
-            raise
+            Below is a JSON array of partial analyses of the comments of one YouTube video, each made from a different batch of comments.
+            Consolidate them into a single analysis:
+            - Merge items that say the same thing in different words
+            - Rank each list by how many partial analyses support it, best supported first
+            - Keep at most {max_items} items per list
+            - For name, gender, age and language pick the value best supported by the partial analyses. The gender need match with the name
+
+            Return your response as a single JSON object with the keys "issues", "wishes", "pains" and "expressions" (lists of strings) and "name", "gender", "age" and "language" (strings).
+
+            The values should be in the language specified: {language}.
+
+            Partial analyses:
+            [
+            {analyses}
+            ]
+            """.format(
+                max_items=self.max_items_per_list,
+                analyses=analyses,
+                language=language
+            )
+
+    def _requests_for_prompts(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """Arguments for LLMExecutor.complete, one per prompt."""
+        prompt_tokens = self.count_tokens_batch(prompts)
+        return [
+            {
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                "max_tokens": self.max_tokens_response,
+                "prompt_tokens": tokens,
+            }
+            for prompt, tokens in zip(prompts, prompt_tokens)
+        ]
+
+    def _build_requests(self, batches: List[List[Dict]], language: str) -> List[Dict[str, Any]]:
+        """Arguments for LLMExecutor.complete, one per batch."""
+        return self._requests_for_prompts([self._build_prompt(batch, language) for batch in batches])
+
+    @property
+    def limiter(self) -> TokenBucketLimiter:
+        """The rate limiter shared by every run of this instance, in any thread."""
+        with self._limiter_lock:
+            if self._limiter is None:
+                self._limiter = TokenBucketLimiter(self.requests_per_minute, self.tokens_per_minute)
+            return self._limiter
+
+    @asynccontextmanager
+    async def _executor(self):
+        """An LLMExecutor on a fresh AsyncOpenAI client, closed on exit.
+
+        The client's connections belong to the running event loop, so each
+        run gets its own; the rate limiter is shared across runs.
+        """
+        # Retries are ours so that they go through the shared rate limiter
+        client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY, base_url=self.base_url, max_retries=0
+        )
+        try:
+            yield LLMExecutor(
+                client,
+                self.model,
+                limiter=self.limiter,
+                max_concurrency=self.max_concurrency,
+                max_retries=self.max_retries,
+                cache=self.cache,
+            )
+        finally:
+            await client.close()
+
+    async def _run_tier(
+        self,
+        executor: LLMExecutor,
+        tier: int,
+        requests: List[Dict[str, Any]],
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> List[Any]:
+        """Run one tier of requests; returns parsed results or exceptions, in order."""
+        name = "map" if tier == 0 else "reduce"
+        tokens = sum(r["prompt_tokens"] + r["max_tokens"] for r in requests)
+        logger.info(f"Tier {tier} ({name}): {len(requests)} requests, up to {tokens} tokens")
+
+        def report(done, total):
+            if progress is not None:
+                progress(tier, done, total)
+
+        report(0, len(requests))
+        replies = await executor.run(requests, progress=report)
+        return [
+            reply if isinstance(reply, Exception) else self._parse_response(reply)
+            for reply in replies
+        ]
+
+    async def analyze_batches(self, batches: List[List[Dict]], language: str = "English") -> List[Any]:
+        """Analyze all batches concurrently.
+
+        Returns one entry per batch, in batch order: the parsed result, or the
+        exception the batch failed with after retries.
+        """
+        async with self._executor() as executor:
+            replies = await executor.run(self._build_requests(batches, language))
+        return [
+            reply if isinstance(reply, Exception) else self._parse_response(reply)
+            for reply in replies
+        ]
+
+    def _reduce_capacity(self, language: str) -> int:
+        """Tokens a reduce request has for partial analyses."""
+        texts = [SYSTEM_PROMPT, self._build_reduce_prompt([], language)]
+        base = sum(self.count_tokens_batch(texts)) + 2 * MESSAGE_OVERHEAD_TOKENS + REPLY_PRIMER_TOKENS
+        return self.max_tokens_per_request - self.max_tokens_response - base
+
+    def _reduce_fan_in(self, language: str) -> int:
+        """Partial analyses one reduce request is guaranteed to hold."""
+        # A reply, serialized again, plus the separator joining it to the next
+        return max(2, self._reduce_capacity(language) // (self.max_tokens_response + 2))
+
+    def _reduce_cost_bound(self, leaves: int, fan_in: int) -> int:
+        """Upper bound on the tokens the reduce tiers spend on ``leaves`` map results."""
+        calls = 0
+        while leaves > 1:
+            leaves = -(-leaves // fan_in)
+            calls += leaves
+        return calls * self.max_tokens_per_request
+
+    def _plan_map_tier(self, comments: List[Dict], language: str) -> List[List[Dict]]:
+        """Batch the most liked comments whose map and reduce tiers fit ``token_budget``.
+
+        A request is charged its full prompt and ``max_tokens_response``, so
+        the estimate is an upper bound on what the run can spend.
+        """
+        comments, costs, capacity = self._comment_costs(comments, language)
+        per_request = self.max_tokens_per_request - capacity  # Prompt framing and reply
+        fan_in = self._reduce_fan_in(language)
+
+        # Largest prefix whose cost fits, assuming perfectly filled batches
+        count, content = 0, 0
+        for cost in costs:
+            batches = -(-(content + cost) // capacity)
+            total = content + cost + batches * per_request + self._reduce_cost_bound(batches, fan_in)
+            if total > self.token_budget:
+                break
+            content += cost
+            count += 1
+
+        # Real packing can need a few more batches; shrink until it fits
+        while count:
+            bins = self._pack(costs[:count], capacity)
+            total = (
+                sum(costs[:count]) + len(bins) * per_request
+                + self._reduce_cost_bound(len(bins), fan_in)
+            )
+            if total <= self.token_budget:
+                break
+            count = int(count * 0.95)
+        else:
+            bins = []
+
+        if count < len(comments):
+            logger.info(
+                f"Token budget of {self.token_budget} covers the {count} most liked "
+                f"of {len(comments)} comments"
+            )
+        return [[comments[i] for i in batch] for batch in bins]
+
+    def _group_for_reduce(self, results: List[dict], language: str) -> List[List[int]]:
+        """Pack partial results into reduce requests."""
+        capacity = self._reduce_capacity(language)
+        costs = self.count_tokens_batch(
+            [json.dumps(result, ensure_ascii=False) + ",\n" for result in results]
+        )
+        # An analysis too large to share a request ends up alone in its group
+        return self._pack([min(cost, capacity) for cost in costs], capacity)
+
+    async def map_reduce(
+        self,
+        comments: List[Dict],
+        language: str = "English",
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> Optional[dict]:
+        """Analyze comments hierarchically.
+
+        Tier 0 analyzes every batch in parallel. Each following tier asks the
+        LLM to consolidate and rank groups of the previous tier's results,
+        until one analysis is left. ``progress(tier, done, total)`` is called
+        as requests complete. Failed requests are skipped; a group whose
+        reduce fails falls back to merge_results.
+        """
+        batches = self._plan_map_tier(comments, language)
+        if not batches:
+            return None
+
+        async with self._executor() as executor:
+            results = await self._run_tier(executor, 0, self._build_requests(batches, language), progress)
+            for i, result in enumerate(results, 1):
+                if isinstance(result, Exception):
+                    logger.error(f"Error analyzing batch {i}: {str(result)}")
+            results = [r for r in results if not isinstance(r, Exception)]
+
+            tier = 1
+            while len(results) > 1:
+                groups = self._group_for_reduce(results, language)
+                if len(groups) == len(results):
+                    logger.warning("Partial analyses too large to consolidate; merging locally")
+                    break
+                # A group of one has nothing to consolidate and moves up as is
+                merging = [group for group in groups if len(group) > 1]
+                prompts = [
+                    self._build_reduce_prompt([results[i] for i in group], language)
+                    for group in merging
+                ]
+                reduced = iter(
+                    await self._run_tier(executor, tier, self._requests_for_prompts(prompts), progress)
+                )
+                next_results = []
+                for group in groups:
+                    if len(group) == 1:
+                        next_results.append(results[group[0]])
+                        continue
+                    result = next(reduced)
+                    if isinstance(result, Exception):
+                        logger.error(f"Error in reduce tier {tier}: {str(result)}; merging locally")
+                        result = self.merge_results([results[i] for i in group], language)
+                    next_results.append(result)
+                results = next_results
+                tier += 1
+
+        if not results:
+            return None
+        return results[0] if len(results) == 1 else self.merge_results(results, language)
+
+    def analyze_batch(self, comments_batch: List[Dict], language: str = "English") -> dict:
+        """Analyze a batch of comments using OpenAI API."""
+        result = _run_coroutine(self.analyze_batches([comments_batch], language))[0]
+        if isinstance(result, Exception):
+            logger.error(f"Error in analyze_batch: {str(result)}")
+            raise result
+        return result
 
     def _parse_response(self, response: str) -> dict:
         """Parse the JSON response into structured categories."""
@@ -224,8 +498,8 @@ class LLMAnalysis:
             logger.error(f"LLM Response was: {response}")
             return categories  # Return default structure on other errors
 
-    def merge_results(self, results: List[dict]) -> dict:
-        """Merge multiple analysis results."""
+    def merge_results(self, results: List[dict], language: str = "English") -> dict:
+        """Merge multiple analysis results, whose items are written in ``language``."""
         merged = {
             "issues": [], 
             "wishes": [], 
@@ -237,13 +511,13 @@ class LLMAnalysis:
             "language": ""
         }
 
-        # Merge list fields
+        # Merge list fields: near-duplicates collapse into their most frequent
+        # spelling, and the items reported by the most batches come first
         for category in ["issues", "wishes", "pains", "expressions"]:
             all_items = []
             for result in results:
                 all_items.extend(result.get(category, []))
-            # Remove duplicates while preserving order
-            merged[category] = list(dict.fromkeys(all_items))
+            merged[category] = self.clusterer.dedupe(all_items, language)
         
         # For demographic fields, take the most common non-empty value
         for field in ["name", "gender", "age", "language"]:
@@ -259,49 +533,62 @@ class LLMAnalysis:
 
         return merged
 
-    def execute(self, video_id, language= "English") -> Optional[Dict[str, List[str]]]:
-        """Perform LLM analysis on comments for a given video ID."""
+    def execute(
+        self,
+        video_id,
+        language= "English",
+        map_reduce: bool = False,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> Optional[Dict[str, List[str]]]:
+        """Perform LLM analysis on comments for a given video ID.
+
+        By default a likes-weighted sample of the ``candidate_pool`` most
+        liked comments, at most ``max_comments`` of them and
+        ``sample_token_budget`` tokens, is analyzed and the batch results
+        merged locally. With ``map_reduce`` every comment the ``token_budget``
+        allows is analyzed and the LLM consolidates the results; see
+        map_reduce for ``progress``. Either way the ``prefilter`` first drops
+        low-information comments and near-duplicates.
+        """
         try:
-            comments = self.db.get_comments(video_id)
+            if map_reduce:
+                limit = None
+            else:
+                limit = self.max_comments if self.prefilter is None else self.candidate_pool
+            # Most liked first; outside map-reduce the cap is applied in SQL
+            comments = self.db.get_comments(
+                video_id,
+                columns=("id", "text", "clean_text", "author_clean_name", "likes"),
+                limit=limit,
+            )
 
             if not comments:
                 logger.warning(f"No comments found for video {video_id}")
                 return None
 
-            # Limit to 400 comments, taking most recent ones
-            if len(comments) > 400:
+            if self.prefilter is not None:
+                comments = self._prefilter(video_id, comments, language, sample=not map_reduce)
+                if not comments:
+                    logger.warning(f"No informative comments found for video {video_id}")
+                    return None
+
+            if map_reduce:
                 logger.info(
-                    f"Limiting analysis to 400 comments out of {len(comments)} total comments"
+                    f"Map-reduce analysis of {len(comments)} comments "
+                    f"({self.max_concurrency} requests at a time) in {language}..."
                 )
-                comments = comments[:400]
+                final_analysis = _run_coroutine(self.map_reduce(comments, language, progress))
+            else:
+                final_analysis = self._analyze_capped(comments, language)
 
-            # Split comments into batches based on token count
-            batches = self.batch_comments(comments)
             logger.info(
-                f"Processing {len(comments)} comments in {len(batches)} batches..."
+                f"LLM cache: {self.cache.hits} hits, {self.cache.misses} misses so far"
             )
 
-            results = []
-            for i, batch in enumerate(batches, 1):
-                try:
-                    logger.info(
-                        f"Processing batch {i}/{len(batches)} ({len(batch)} comments) in {language}..."
-                    )
-                    batch_result = self.analyze_batch(batch, language)
-                    results.append(batch_result)
-                    # Small delay between batches to avoid rate limits
-                    if i < len(batches):
-                        time.sleep(2)
-                except Exception as e:
-                    logger.error(f"Error analyzing batch {i}: {str(e)}")
-                    continue
-
-            if not results:
+            if final_analysis is None:
                 logger.error(f"No successful analysis results for video {video_id}")
                 return None
 
-            final_analysis = self.merge_results(results)
-
             # Store the results in the database
             self.db.save_analysis(video_id, final_analysis)
             # Removed self.db.con.commit() as it's handled by DBManager's context manager
@@ -313,3 +600,80 @@ class LLMAnalysis:
             logger.error(f"Error in execute: {str(e)}")
             # Removed self.db.close() as it's handled by DBManager's context manager
             raise
+
+    def _prefilter(
+        self, video_id, comments: List[Dict], language: str, sample: bool
+    ) -> List[Dict]:
+        """Run ``comments`` through the prefilter and log the tokens it saved.
+
+        With ``sample`` the survivors are also sampled down to
+        ``max_comments`` comments and ``sample_token_budget`` tokens.
+        """
+        _, costs, _ = self._comment_costs(comments, language)
+        kept, removed = self.prefilter.filter(comments)
+        dropped = set(removed["low_information"]) | set(removed["duplicate"])
+        kept_costs = [cost for i, cost in enumerate(costs) if i not in dropped]
+        if sample:
+            chosen = self.prefilter.sample(
+                kept, kept_costs, self.sample_token_budget, self.max_comments
+            )
+            kept = [kept[i] for i in chosen]
+            kept_costs = [kept_costs[i] for i in chosen]
+
+        report = {
+            "comments": len(comments),
+            "tokens": sum(costs),
+            "low_information": len(removed["low_information"]),
+            "low_information_tokens": sum(costs[i] for i in removed["low_information"]),
+            "duplicates": len(removed["duplicate"]),
+            "duplicate_tokens": sum(costs[i] for i in removed["duplicate"]),
+            "kept": len(kept),
+            "kept_tokens": sum(kept_costs),
+        }
+        report["tokens_saved"] = report["tokens"] - report["kept_tokens"]
+        self.prefilter_report = report
+        logger.info(
+            f"Prefilter for video {video_id}: dropped {report['low_information']} "
+            f"low-information ({report['low_information_tokens']} tokens) and "
+            f"{report['duplicates']} near-duplicate ({report['duplicate_tokens']} tokens) "
+            f"comments; keeping {report['kept']} of {report['comments']} comments, "
+            f"{report['tokens_saved']} of {report['tokens']} tokens saved"
+        )
+        return kept
+
+    def _analyze_capped(self, comments: List[Dict], language: str) -> Optional[dict]:
+        """Analyze ``comments`` and merge the batch results locally."""
+        if self.prefilter is None and len(comments) == self.max_comments:
+            logger.info(
+                f"Limiting analysis to the {self.max_comments} most liked comments"
+            )
+
+        # Split comments into batches based on token count
+        batches = self.batch_comments(comments, language)
+        logger.info(
+            f"Processing {len(comments)} comments in {len(batches)} batches "
+            f"({self.max_concurrency} at a time) in {language}..."
+        )
+
+        # Batches run concurrently; results come back in batch order
+        results = []
+        for i, result in enumerate(_run_coroutine(self.analyze_batches(batches, language)), 1):
+            if isinstance(result, Exception):
+                logger.error(f"Error analyzing batch {i}: {str(result)}")
+                continue
+            results.append(result)
+
+        return self.merge_results(results, language) if results else None
+
+
+def _run_coroutine(coro):
+    """Run ``coro`` to completion from synchronous code.
+
+    Uses a helper thread when the caller is already inside an event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
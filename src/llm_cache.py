@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """Persistent, content-addressed cache of LLM replies.
+
+    Replies are stored in the ``llm_cache`` table under a SHA-256 of the
+    model, the messages and the generation parameters, so an identical
+    request is answered locally no matter which video or run produced it.
+    Entries expire after ``ttl``; past ``max_entries`` the least recently
+    used ones are evicted. With ``bypass`` set, lookups always miss but
+    fresh replies are still stored.
+
+    Lookups only read. Hits are recorded in memory and written back
+    ``touch_every`` at a time, and before every eviction, so concurrent
+    lookups do not queue up behind one write each.
+    """
+
+    def __init__(
+        self,
+        db: Optional[DBManager] = None,
+        ttl: Optional[timedelta] = timedelta(days=30),
+        max_entries: Optional[int] = 10000,
+        bypass: bool = False,
+        evict_every: int = 100,
+        touch_every: int = 50,
+    ):
+        self.db = db or DBManager()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.evict_every = evict_every
+        self.touch_every = touch_every
+        self.hits = 0
+        self.misses = 0
+        self._saves = 0
+        self._touched = set()  # Keys hit since the last flush
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        """Content address of one chat-completion request."""
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _created_after(self) -> Optional[datetime]:
+        return datetime.now() - self.ttl if self.ttl is not None else None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reply for ``key``, or None on a miss."""
+        response = None if self.bypass else self.db.get_llm_response(key, self._created_after())
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._touched.add(key)
+            due = len(self._touched) >= self.touch_every
+        if due:
+            self.flush()
+        return response
+
+    def flush(self) -> None:
+        """Write the last-used time of the entries hit since the last flush."""
+        with self._lock:
+            touched, self._touched = self._touched, set()
+        if touched:
+            self.db.touch_llm_responses(touched)
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a reply, evicting stale entries every ``evict_every`` saves."""
+        self.db.save_llm_response(key, model, response)
+        with self._lock:
+            self._saves += 1
+            due = self._saves % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Apply the TTL and size limit now. Returns the number of entries removed."""
+        self.flush()  # Recently used entries must not look stale
+        deleted = self.db.evict_llm_cache(self._created_after(), self.max_entries)
+        if deleted:
+            logger.info(f"Evicted {deleted} LLM cache entries")
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
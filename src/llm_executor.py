@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import openai
+
+from .llm_cache import LLMCache
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt; anything else (bad request, auth) fails at once
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the server through ``retry-after-ms``/``retry-after``, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue  # HTTP-date form; fall back to our own backoff
+    return None
+
+
+class TokenBucketLimiter:
+    """Async limiter enforcing requests-per-minute and tokens-per-minute together.
+
+    Both buckets start full and refill continuously. Each request reserves
+    its share on arrival, running the buckets into debt if need be, and
+    waits until the debt is paid back, so waiters are served in arrival
+    order. ``pause`` holds everyone back, e.g. after the server answered
+    with Retry-After. The state sits behind a thread lock rather than an
+    asyncio one, so one limiter can be shared by event loops in several
+    threads, such as the videos of a batch.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last
+        self._last = now
+        self._requests = min(
+            self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60
+        )
+        self._tokens = min(
+            self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request costing ``tokens`` tokens may be sent."""
+        # A request larger than the whole bucket could never be admitted
+        tokens = min(tokens, self.tokens_per_minute)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._requests -= 1
+            self._tokens -= tokens
+            ready_at = now + max(
+                0.0,
+                -self._requests * 60 / self.requests_per_minute,
+                -self._tokens * 60 / self.tokens_per_minute,
+            )
+        while True:
+            wait = max(ready_at, self._paused_until) - time.monotonic()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Admit no request for the next ``seconds`` seconds."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class LLMExecutor:
+    """Runs chat completions concurrently against an ``AsyncOpenAI`` client.
+
+    At most ``max_concurrency`` requests are in flight and every request
+    passes through the shared ``limiter`` first. Rate limits, connection
+    errors and 5xx responses are retried, waiting as long as the server's
+    Retry-After asks for or backing off exponentially when it does not say.
+    With a ``cache``, requests it can answer never reach the API.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        limiter: Optional[TokenBucketLimiter] = None,
+        max_concurrency: int = 8,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.limiter = limiter
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = retry_after_seconds(error)
+        if delay is None:
+            # Full jitter keeps concurrent retries from arriving together
+            delay = random.uniform(0, self.base_delay * 2**attempt)
+        return min(delay, self.max_delay)
+
+    async def complete(
+        self, messages: List[Dict[str, str]], max_tokens: int, prompt_tokens: int = 0
+    ) -> str:
+        """Send one chat completion and return the reply text."""
+        if self.cache is not None:
+            key = self.cache.key(self.model, messages, max_tokens=max_tokens)
+            # SQLite calls run in a worker thread so they never block the event loop
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                await self.limiter.acquire(prompt_tokens + max_tokens)
+            try:
+                response = await self.client.chat.completions.create(
+                    model=self.model, messages=messages, max_tokens=max_tokens
+                )
+                content = response.choices[0].message.content
+                if self.cache is not None and content:
+                    await asyncio.to_thread(self.cache.put, key, self.model, content)
+                return content
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e)
+                if self.limiter is not None and isinstance(e, openai.RateLimitError):
+                    self.limiter.pause(delay)
+                logger.info(
+                    f"{type(e).__name__} on attempt {attempt + 1}/{self.max_retries + 1}, "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def run(
+        self,
+        requests: Sequence[Dict[str, Any]],
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Any]:
+        """Run ``complete(**request)`` for every request concurrently.
+
+        Returns one entry per request, in request order: the reply text, or
+        the exception that request finally failed with. ``progress(done,
+        total)`` is called each time a request finishes, failed or not.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        done = 0
+
+        async def bounded(request):
+            nonlocal done
+            try:
+                async with semaphore:
+                    return await self.complete(**request)
+            finally:
+                done += 1
+                if progress is not None:
+                    progress(done, len(requests))
+
+        results = await asyncio.gather(
+            *(bounded(request) for request in requests), return_exceptions=True
+        )
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.flush)
+        return results
@@ -1,5 +1,8 @@
+import argparse
 import sys
 import logging
+from functools import partial
+from typing import List, Optional
 
 from .gathering import Gathering
 from .mining import Mining
@@ -8,6 +11,7 @@ from .generating import (
     Generating,
 )  # Added import for consistency, though not used in original main
 from .analysis import Analysis # Added as per subtask description
+from .pipeline import Pipeline, Stage
 
 # Configure logging - This will configure the root logger.
 # If other modules (like app.py) also configure it, the first one wins,
@@ -23,43 +27,89 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main(video_id):
-    logger.info(f"Starting full pipeline for video_id: {video_id}")
-
+def gather(video_id, gathering: Optional[Gathering] = None):
     logger.info("Starting Gathering phase...")
-    gathering = Gathering()
+    gathering = gathering or Gathering()
     gathering.execute(video_id)
     logger.info("Finished Gathering phase.")
 
+
+def mine(video_id):
     logger.info("Starting Mining phase...")
     mining = Mining()
     mining.execute(video_id)
     logger.info("Finished Mining phase.")
 
+
+def analyse(video_id):
     logger.info("Starting Content Analysis phase (sentiments, genders, keywords)...")
-    content_analyzer = LLMAnalysis()
+    content_analyzer = Analysis()
     content_analyzer.execute(video_id)
     logger.info("Finished Content Analysis phase.")
 
-    # Assuming LLMAnalysis is a separate step, not explicitly mentioned to add here
-    # but was part of the original app.py flow (PersonaGenerator._ensure_video_analyzed)
-    # For this refactoring, only adding Generating as per implication.
 
+def analyse_with_llm(video_id, llm_analyzer: Optional[LLMAnalysis] = None):
+    logger.info("Starting LLM Analysis phase (issues, wishes, pains, expressions)...")
+    llm_analyzer = llm_analyzer or LLMAnalysis()
+    llm_analyzer.execute(video_id)
+    logger.info("Finished LLM Analysis phase.")
+
+
+def generate(video_id):
     logger.info("Starting Generating phase (persona report)...")
     generating = Generating()
     generating.execute(video_id)
     logger.info("Finished Generating phase.")
 
+
+def build_stages(
+    gathering: Optional[Gathering] = None, llm_analyzer: Optional[LLMAnalysis] = None
+) -> List[Stage]:
+    """The pipeline's stages.
+
+    A ``gathering`` or ``llm_analyzer`` given here serves every video, so
+    their API clients, quota tally and rate limits are shared; without one,
+    each run of the stage builds its own.
+    """
+    # Both analyses only need the mined text, so they run side by side;
+    # the persona report needs the author genders and the LLM analysis.
+    return [
+        Stage("gathering", partial(gather, gathering=gathering), resource="network"),
+        Stage("mining", mine, after=("gathering",), resource="cpu"),
+        Stage("analysis", analyse, after=("mining",), resource="cpu"),
+        Stage("llm_analysis", partial(analyse_with_llm, llm_analyzer=llm_analyzer), after=("mining",), resource="network"),
+        Stage("generating", generate, after=("analysis", "llm_analysis"), resource="cpu"),
+    ]
+
+
+STAGES = build_stages()
+
+
+def main(video_id, from_stage=None, only=None, db=None):
+    """Run the pipeline for a video, resuming from its last completed stage.
+
+    ``from_stage`` reruns that stage and everything after it; ``only`` runs
+    just the stages named.
+    """
+    logger.info(f"Starting full pipeline for video_id: {video_id}")
+    Pipeline(STAGES, db).run(video_id, from_stage, only)
     logger.info(f"Full pipeline finished for video_id: {video_id}")
 
 
+def parse_args(argv=None):
+    names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Build the persona of a YouTube video's audience.")
+    parser.add_argument("video_id")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--from-stage", choices=names, help="Rerun this stage and every stage after it")
+    group.add_argument(
+        "--only", choices=names, action="append", metavar="STAGE",
+        help=f"Run just this stage (repeatable); one of {', '.join(names)}",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        video_id_arg = str(sys.argv[1])
-        logger.info(
-            f"Running pipeline for video_id from command line argument: {video_id_arg}"
-        )
-        main(video_id_arg)
-    else:
-        logger.error("No video_id provided as command line argument.")
-        print("Usage: python main.py <video_id>")
+    args = parse_args()
+    logger.info(f"Running pipeline for video_id from command line argument: {args.video_id}")
+    main(args.video_id, args.from_stage, args.only)
@@ -14,7 +14,8 @@ class MetadataExtractor:
         """
         comment = Comment(None)  # Initialize with None since we're not reading from DB
         
-        snippet = item["snippet"]["topLevelComment"]["snippet"]
+        top_level_comment = item["snippet"]["topLevelComment"]
+        snippet = top_level_comment["snippet"]
         
         comment.video_id = ""  # This will be set by the caller
         comment.published = datetime.strptime(snippet["publishedAt"], "%Y-%m-%dT%H:%M:%SZ")
@@ -27,5 +28,6 @@ class MetadataExtractor:
         comment.sentiment = 0  # This will be set by the analysis process
         comment.created = datetime.now()
         comment.updated = None
+        comment.youtube_id = top_level_comment.get("id") or item.get("id", "")
         
         return comment
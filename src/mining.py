@@ -1,61 +1,95 @@
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import List, Optional, Tuple
 from .comment import Comment
 from .db_manager import DBManager
 from .text_cleaner import TextCleaner
 
 logger = logging.getLogger(__name__)
 
+_cleaner = None
+
+
+def clean_comment_rows(
+    rows: List[Tuple[int, str, str]]
+) -> List[Tuple[int, str, str]]:
+    """Clean ``(id, text, author_display_name)`` rows.
+
+    Returns ``(id, clean_text, author_clean_name)`` tuples in input order.
+    Module-level so it can run in worker processes.
+    """
+    global _cleaner
+    if _cleaner is None:
+        _cleaner = TextCleaner()
+
+    clean_texts = _cleaner.clean_many([text for _, text, _ in rows])
+    return [
+        (comment_id, clean_text, _cleaner.clean_entities_symbols(author_display_name))
+        for (comment_id, _, author_display_name), clean_text in zip(rows, clean_texts)
+    ]
+
 
 class Mining:
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = 1000,
+        db: Optional[DBManager] = None,
+    ) -> None:
+        """
+        Args:
+            workers: Number of cleaning processes; ``None`` or 1 cleans in-process.
+            chunk_size: Comments read, cleaned and written back per chunk.
+            db: Database to mine (defaults to the application database).
+        """
         self.cleaner = TextCleaner()
-        self.db = DBManager()  # Ensure DBManager is initialized
+        self.db = db or DBManager()  # Ensure DBManager is initialized
+        self.workers = workers
+        self.chunk_size = chunk_size
 
     def clear_name(self, name):
         clean_name = self.cleaner.clean_entities_symbols(name)
         return clean_name
 
+    def _write_back(self, cleaned: List[Tuple[int, str, str]]) -> None:
+        now = datetime.now()
+        # One transaction per chunk instead of a commit per comment
+        self.db.update_comments_processed_text_bulk(
+            [(comment_id, clean_text, author_clean_name, now)
+             for comment_id, clean_text, author_clean_name in cleaned]
+        )
+
     def execute(self, video_id):
         logger.info(f"Starting mining for video {video_id}")
-        # self.db.connect() # REMOVED
-
-        # Assuming get_comments returns list of dictionaries now, as per DBManager refactoring
-        comments_data = self.db.get_comments(video_id)
-
-        for comment_dict in comments_data:
-            # Create Comment object from dictionary
-            # This assumes Comment class can be initialized from a dict or has a method for it
-            # Based on previous refactoring, Comment.from_db_row expects a tuple.
-            # However, db_manager._row_to_dict is used in get_comments.
-            # Let's adjust to construct Comment object field by field from dict for clarity
-            # Or better, ensure Comment has a from_dict method or adapt from_db_row if possible.
-            # For now, let's assume get_comments returns dicts and we'll manually construct or adapt.
-            # If Comment.from_db_row is strictly for tuples, we might need to fetch raw rows,
-            # or adapt Comment.from_db_row to handle dicts, or add from_dict.
-            # Given current Comment.from_db_row expects a tuple (db_row[0], etc.),
-            # and db_manager.get_comments returns list of dicts, this is a mismatch.
-            # For this step, I will assume get_comments can return raw tuples or adapt.
-            # Re-checking db_manager.py: get_comments returns list of dicts via _row_to_dict.
-            # So, Comment.from_db_row(row) is incorrect if row is a dict.
-            # We'll need to access dict keys.
-
-            comment_id = comment_dict["id"]
-            original_text = comment_dict["text"]
-            author_display_name = comment_dict["author_display_name"]
-
-            clean_text = self.cleaner.strip_entities_links(original_text).replace(
-                "..", "."
-            )
-            clean_text = clean_text.replace("kk", "")
-            clean_text = clean_text.replace("rs", "")
-            author_clean_name = self.clear_name(author_display_name)
-
-            self.db.update_comment_processed_text(
-                comment_id, "".join(clean_text), author_clean_name, datetime.now()
-            )
-
-        # self.db.con.commit() # REMOVED - Handled by DBManager methods
-        # self.db.close() # REMOVED - Handled by DBManager context manager
+
+        chunks = self.db.iter_comments(
+            video_id,
+            chunk_size=self.chunk_size,
+            columns=("id", "text", "author_display_name"),
+            row_format="tuple",
+        )
+        if self.workers and self.workers > 1:
+            self._execute_parallel(chunks)
+        else:
+            for rows in chunks:
+                self._write_back(clean_comment_rows(rows))
+
         logger.info(f"Finished mining for video {video_id}")
+
+    def _execute_parallel(self, chunks) -> None:
+        """Clean chunks in a process pool, writing results back in submission order.
+
+        At most two chunks per worker are in flight, which keeps memory bounded
+        while the pool stays busy.
+        """
+        in_flight = deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for rows in chunks:
+                in_flight.append(pool.submit(clean_comment_rows, rows))
+                if len(in_flight) >= 2 * self.workers:
+                    self._write_back(in_flight.popleft().result())
+            while in_flight:
+                self._write_back(in_flight.popleft().result())
@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Iterable, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Per-process cache of NLP models, each built once on first use.
+
+    A model is identified by the module-level function that builds it and
+    that function's arguments: ``models.get(load_yake, "pt", 12)`` builds
+    the Portuguese YAKE extractor the first time and returns the same one
+    for every later video. Build times and reuse counts are kept for
+    stats(). Because loaders are module-level functions, specs of the form
+    ``(loader, *args)`` can be sent to worker processes, where warm()
+    builds them before the first task arrives.
+    """
+
+    def __init__(self):
+        self._models: Dict[tuple, Any] = {}
+        self._load_seconds: Dict[tuple, float] = {}
+        self._hits: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, loader: Callable[..., Any], *args: Hashable) -> Any:
+        """``loader(*args)``, built on the first call and shared after that."""
+        key = (loader,) + args
+        with self._lock:  # Held while loading, so two threads never build the same model
+            if key in self._models:
+                self._hits[key] += 1
+                return self._models[key]
+            start = time.perf_counter()
+            model = loader(*args)
+            self._load_seconds[key] = time.perf_counter() - start
+            self._hits[key] = 0
+            self._models[key] = model
+        logger.info(f"Loaded {self._name(key)} in {self._load_seconds[key]:.2f}s")
+        return model
+
+    def warm(self, specs: Iterable[Sequence]) -> None:
+        """Build every ``(loader, *args)`` spec now rather than on first use."""
+        for loader, *args in specs:
+            self.get(loader, *args)
+
+    @staticmethod
+    def _name(key: tuple) -> str:
+        loader, *args = key
+        return f"{loader.__name__}({', '.join(map(repr, args))})"
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Load time in seconds and number of reuses of each model built so far."""
+        with self._lock:
+            return {
+                self._name(key): {"load_seconds": self._load_seconds[key], "hits": self._hits[key]}
+                for key in self._models
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._load_seconds.clear()
+            self._hits.clear()
+
+
+# The registry of this process
+models = ModelRegistry()
+
+
+def warm(specs: Iterable[Sequence]) -> None:
+    """Build ``specs`` in the registry of this process.
+
+    Meant as a ProcessPoolExecutor ``initializer``, so each worker loads
+    its models once when it starts.
+    """
+    models.warm(specs)
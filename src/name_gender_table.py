@@ -0,0 +1,163 @@
+import csv
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import unicodedata
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+NAMES_CSV = os.path.join(DATA_DIR, "first_names.csv")
+# Built tables go here rather than into the package, which may be read-only
+CACHE_DIR = os.getenv("PERSONA_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache")), "persona_from_comments"
+)
+
+# Capitalised or lowercase runs, so "JohnSmith99" and "john_smith" both start with "john"
+_ASCII_NAME_PART = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])")
+_NAME_PART = re.compile(r"[^\W\d_]{2,}")
+
+
+def normalize_first_name(name: str) -> str:
+    """Lowercase, unaccented first name found in an author name, or "" if none.
+
+    ``"@JoãoSilva_99"`` and ``"joao silva"`` both give ``"joao"``. Names
+    in other scripts keep their base letters: ``"Ольга"`` gives ``"ольга"``.
+    """
+    if not name:
+        return ""
+    unaccented = "".join(
+        char for char in unicodedata.normalize("NFKD", name) if not unicodedata.combining(char)
+    )
+    for part in _ASCII_NAME_PART.findall(unaccented):
+        if len(part) >= 2:
+            return part.lower()
+    match = _NAME_PART.search(unaccented)
+    return match.group(0).lower() if match else ""
+
+
+class NameGenderTable:
+    """First name to probability of being male, as an open-addressing hash table.
+
+    Records are ``(key, male)`` pairs where ``key`` is a 64-bit hash of the
+    normalised name (0 marks an empty slot). The table is at most half full
+    and uses linear probing, so a lookup reads one or two slots. Saved as a
+    ``.npy`` file, it is memory-mapped rather than read in.
+    """
+
+    DTYPE = np.dtype([("key", "<u8"), ("male", "<f4")])
+
+    def __init__(self, records: np.ndarray):
+        self._keys = records["key"]
+        self._male = records["male"]
+        self._mask = len(records) - 1
+        self._records = records
+        self._size = int(np.count_nonzero(self._keys))
+
+    @staticmethod
+    def key(name: str) -> int:
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    @classmethod
+    def build(cls, probabilities: Dict[str, float]) -> "NameGenderTable":
+        """In-memory table over normalised ``name -> male probability`` pairs."""
+        slots = 2
+        while slots < 2 * len(probabilities):
+            slots *= 2
+        records = np.zeros(slots, dtype=cls.DTYPE)
+        mask = slots - 1
+        for name, probability in probabilities.items():
+            key = cls.key(name)
+            slot = key & mask
+            while records["key"][slot] not in (0, key):
+                slot = (slot + 1) & mask
+            records[slot] = (key, probability)
+        return cls(records)
+
+    @classmethod
+    def from_csv(cls, csv_path: str = NAMES_CSV) -> "NameGenderTable":
+        """Table over a ``name,male_probability`` CSV, names normalised on the way in."""
+        probabilities = {}
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                name = normalize_first_name(row["name"])
+                if name:
+                    probabilities[name] = float(row["male_probability"])
+        return cls.build(probabilities)
+
+    def save(self, path: str) -> None:
+        """Write the table to ``path`` atomically: readers see the old file or the whole new one."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, self._records)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "NameGenderTable":
+        return cls(np.load(path, mmap_mode="r"))
+
+    @staticmethod
+    def cache_path(csv_path: str) -> str:
+        """Where the table built from ``csv_path`` is cached."""
+        csv_path = os.path.abspath(csv_path)
+        digest = hashlib.blake2b(csv_path.encode("utf-8"), digest_size=6).hexdigest()
+        return os.path.join(CACHE_DIR, f"{os.path.splitext(os.path.basename(csv_path))[0]}-{digest}.npy")
+
+    @classmethod
+    def bundled(cls, csv_path: str = NAMES_CSV, table_path: Optional[str] = None) -> "NameGenderTable":
+        """Memory-mapped table over ``csv_path``, rebuilt when the CSV is newer.
+
+        The table is kept in CACHE_DIR, under a name unique to the CSV,
+        unless ``table_path`` says otherwise. Where it cannot be written, an
+        in-memory table is used. GenderAnalyzer gets it through
+        load_bundled_table, once per process.
+        """
+        table_path = table_path or cls.cache_path(csv_path)
+        try:
+            if os.path.getmtime(table_path) >= os.path.getmtime(csv_path):
+                return cls.load(table_path)
+        except OSError:
+            pass  # Not built yet
+
+        table = cls.from_csv(csv_path)
+        try:
+            table.save(table_path)
+        except OSError as e:
+            logger.warning(f"Could not save the name table to {table_path}: {e}")
+            return table
+        return cls.load(table_path)
+
+    def get(self, name: str) -> Optional[float]:
+        """Male probability of a normalised first name, or None if not listed."""
+        key = self.key(name)
+        slot = key & self._mask
+        while True:
+            found = int(self._keys[slot])
+            if found == key:
+                return float(self._male[slot])
+            if found == 0:
+                return None
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def load_bundled_table(csv_path: str = NAMES_CSV) -> NameGenderTable:
+    """Model registry loader for the bundled name table."""
+    return NameGenderTable.bundled(csv_path)
@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+from .db_manager import DBManager
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Stage:
+    """A named pipeline step: ``func(video_id)``, run once the stages in ``after`` are done.
+
+    ``resource`` names the concurrency limit the stage counts against
+    ("network", "cpu"); None leaves it unlimited.
+    """
+
+    def __init__(
+        self, name: str, func: Callable[[str], None], after: Sequence[str] = (), resource: Optional[str] = None
+    ):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.resource = resource
+
+
+class Pipeline:
+    """Runs a video through a dependency graph of stages.
+
+    Each stage's status is checkpointed per video in the ``pipeline_stage``
+    table. A run starts where the last one stopped: stages that are done
+    and not downstream of an unfinished stage are skipped, and once every
+    stage is done the next run starts over. Stages whose dependencies are
+    met run in parallel threads; when one fails, the stages that do not
+    depend on it still finish before its exception is re-raised.
+
+    One instance may run several videos at once from different threads;
+    ``limits`` caps how many stages per resource run at a time across all
+    of them.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage],
+        db: Optional[DBManager] = None,
+        max_workers: Optional[int] = None,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage {stage.name!r}")
+            self.stages[stage.name] = stage
+        for stage in self.stages.values():
+            self._check_names(stage.after)
+        self.order = self._sorted_names()
+        self.db = db if db is not None else DBManager()
+        self.max_workers = max_workers or len(self.stages)
+        self.limits = dict(limits or {})
+        self._slots = {resource: threading.BoundedSemaphore(n) for resource, n in self.limits.items()}
+
+    def _check_names(self, names: Iterable[str]) -> None:
+        unknown = [name for name in names if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stage(s) {unknown}; expected one of {list(self.stages)}")
+
+    def _sorted_names(self) -> List[str]:
+        """Stage names in dependency order, ties kept in declaration order."""
+        order: List[str] = []
+        remaining = list(self.stages)
+        while remaining:
+            ready = [name for name in remaining if all(dep in order for dep in self.stages[name].after)]
+            if not ready:
+                raise ValueError(f"Pipeline stages {remaining} have circular dependencies")
+            order += ready
+            remaining = [name for name in remaining if name not in ready]
+        return order
+
+    def downstream(self, names: Iterable[str]) -> Set[str]:
+        """``names`` and every stage that depends on them, directly or not."""
+        found = set(names)
+        for name in self.order:  # Dependencies always come first
+            if found.intersection(self.stages[name].after):
+                found.add(name)
+        return found
+
+    def plan(self, video_id: str, from_stage: Optional[str] = None, only: Optional[Sequence[str]] = None) -> List[str]:
+        """The stages a run will execute, in dependency order.
+
+        ``only`` runs just the stages named; ``from_stage`` runs that stage
+        and everything downstream of it. Either way their dependencies are
+        taken as already done. Without them the run resumes from the
+        checkpoints.
+        """
+        if from_stage and only:
+            raise ValueError("Pass either from_stage or only, not both")
+        if only:
+            self._check_names(only)
+            selected = set(only)
+        elif from_stage:
+            self._check_names([from_stage])
+            selected = self.downstream([from_stage])
+        else:
+            states = self.db.get_stage_states(video_id)
+            unfinished = [name for name in self.order if states.get(name) != DONE]
+            selected = self.downstream(unfinished) if unfinished else set(self.order)
+        return [name for name in self.order if name in selected]
+
+    def run(
+        self,
+        video_id: str,
+        from_stage: Optional[str] = None,
+        only: Optional[Sequence[str]] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> List[str]:
+        """Run the planned stages for a video; returns their names.
+
+        Seconds per stage that ran, failed ones included, go into ``timings``.
+        """
+        planned = self.plan(video_id, from_stage, only)
+        skipped = [name for name in self.order if name not in planned]
+        if skipped:
+            logger.info(f"Pipeline for video {video_id}: skipping stages {', '.join(skipped)}")
+        for name in planned:
+            self.db.set_stage_state(video_id, name, PENDING)
+
+        # Dependencies outside the plan count as done
+        waiting = {name: {dep for dep in self.stages[name].after if dep in planned} for name in planned}
+        running = {}
+        error = None
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix="stage") as pool:
+            while True:
+                for name in [name for name, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    running[pool.submit(self._run_stage, video_id, name, timings)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                        continue  # Its dependents never become ready
+                    for deps in waiting.values():
+                        deps.discard(name)
+
+        if error is not None:
+            if waiting:
+                logger.warning(f"Pipeline for video {video_id}: not run after the failure: {', '.join(waiting)}")
+            raise error
+        return planned
+
+    def _run_stage(self, video_id: str, name: str, timings: Optional[Dict[str, float]] = None) -> None:
+        stage = self.stages[name]
+        with self._slots.get(stage.resource, nullcontext()):  # Waiting for a slot is not timed
+            self.db.set_stage_state(video_id, name, RUNNING)
+            started = time.perf_counter()
+            try:
+                stage.func(video_id)
+            except Exception as e:
+                logger.error(f"Stage {name} failed for video {video_id}: {e}")
+                self.db.set_stage_state(video_id, name, FAILED, f"{type(e).__name__}: {e}")
+                raise
+            finally:
+                seconds = time.perf_counter() - started
+                if timings is not None:
+                    timings[name] = seconds
+            self.db.set_stage_state(video_id, name, DONE)
+        logger.info(f"Stage {name} done for video {video_id} in {seconds:.2f}s")
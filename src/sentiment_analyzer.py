@@ -1,15 +1,313 @@
+import csv
+import os
+import re
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import textblob
 from .text_cleaner import TextCleaner
 from textblob import TextBlob
 from langdetect import detect
 
+from .language_detector import UNDETERMINED
+from .model_registry import models, warm
 
-class SentimentAnalyser:
+TEXTBLOB_LEXICON = os.path.join(os.path.dirname(textblob.__file__), "en", "en-sentiment.xml")
+# Words of other languages, scored as the English word they translate
+SENTIMENT_WORDS = os.path.join(os.path.dirname(__file__), "data", "sentiment_words.csv")
+
+# Negations per language LexiconBackend scores; French "ne ... pas" works
+# because the "pas" right before the scored word negates it
+NEGATIONS = {
+    "en": ("no", "not", "never"),
+    "pt": ("não", "nao", "nunca", "nem"),
+    "es": ("no", "nunca", "ni", "jamás", "tampoco"),
+    "fr": ("ne", "n", "pas", "jamais"),
+    "de": ("nicht", "kein", "keine", "keinen", "keinem", "keiner", "nie", "niemals"),
+}
+
+# Tokenizer tables copied from textblob/_text.py (TextBlob 0.20, MIT license),
+# which keeps them private; kept here so a TextBlob upgrade cannot break the import
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+ABBREVIATIONS = frozenset((
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/",
+))
+RE_ABBR1 = re.compile(r"^[A-Za-z]\.$")  # Single letter, "T. De Smedt"
+RE_ABBR2 = re.compile(r"^([A-Za-z]\.)+$")  # Alternating letters, "U.S."
+RE_ABBR3 = re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")  # Capital and consonants, "Mr."
+EMOTICONS = {  # (facial expression, sentiment): faces
+    ("love", +1.00): ("<3", "♥"),
+    ("grin", +1.00): (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D"),
+    ("taunt", +0.75): (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)"),
+    ("smile", +0.50): (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)"),
+    ("wink", +0.25): (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)"),
+    ("gasp", +0.05): (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°"),
+    ("worry", -0.25): (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>"),
+    ("frown", -0.75): (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/"),
+    ("cry", -1.00): (":'(", ":'''(", ";'("),
+}
+
+_CONTRACTION = re.compile(r"'d|'m|'s|'ll|'re|'ve|n't")
+_QUOTES = str.maketrans({quote: f" {quote} " for quote in "“”‘’'\""})
+_LEADING = tuple(PUNCTUATION.replace(".", ""))
+_TRAILING = _LEADING + (".",)
+_ABBREVIATION = (RE_ABBR1, RE_ABBR2, RE_ABBR3)
+# Emoticons TextBlob scores: the non-alphabetic ones, first listing wins
+EMOTICON_POLARITY: Dict[str, float] = {}
+for (_, _polarity), _faces in EMOTICONS.items():
+    for _face in _faces:
+        if not _face.isalpha() and len(_face) <= 5:
+            EMOTICON_POLARITY.setdefault(_face.lower(), _polarity)
+EMOTICON_POLARITY["(!)"] = 0.0  # Sarcasm: scored, but neutral
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of ``text`` split the way TextBlob's tokenizer splits them.
+
+    Punctuation is peeled off both ends of each word, contractions are split
+    ("isn't" is "is n ' t"), and whole-word emoticons are kept intact.
     """
-    This method works only for english
+    tokens = []
+    for chunk in text.split():
+        if chunk.isalnum() or chunk.lower() in EMOTICON_POLARITY:
+            tokens.append(chunk)  # Nothing to split, the common case
+            continue
+        for t in _CONTRACTION.sub(r" \g<0>", chunk).translate(_QUOTES).split():
+            while t.startswith(_LEADING):
+                tokens.append(t[0])
+                t = t[1:]
+            tail = []
+            while t.endswith(_TRAILING):
+                if t.endswith(_LEADING):
+                    tail.append(t[-1])
+                    t = t[:-1]
+                if t.endswith("..."):
+                    tail.append("...")
+                    t = t[:-3].rstrip(".")
+                if t.endswith("."):
+                    if t in ABBREVIATIONS or any(r.match(t) for r in _ABBREVIATION):
+                        break
+                    tail.append(".")
+                    t = t[:-1]
+            if t:
+                tokens.append(t)
+            tail.reverse()
+            for start in range(len(tail) - 1):  # "good:)" ends with an emoticon
+                if "".join(tail[start:]) in EMOTICON_POLARITY:
+                    tail[start:] = ["".join(tail[start:])]
+                    break
+            tokens.extend(tail)
+    return [token.lower() for token in tokens]
+
+
+class TextBlobBackend:
+    """TextBlob's pattern analyzer, one comment at a time; the reference scores."""
+
+    name = "textblob"
+
+    def score_many(self, texts: Sequence[str]) -> List[float]:
+        return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+class LexiconBackend:
+    """Vectorized lexicon scorer over TextBlob's sentiment lexicon.
+
+    Uses the word polarities TextBlob uses and replays its rules over a
+    whole batch of comments at once with NumPy: a text's score is the mean
+    polarity of its scored words and emoticons, where a modifier scales the
+    word after it ("very good"), a preceding negation flips and halves it
+    ("not good"), and each later "!" boosts it. On ordinary comments the
+    scores equal TextBlob's; words glued to unusual punctuation
+    ("good}!x") can be tokenized, and so scored, differently.
+
+    For another ``language`` of NEGATIONS, the vocabulary is the words
+    SENTIMENT_WORDS lists for it, each scored as its English translation
+    ("muito bom" as "very good").
     """
 
-    def __init__(self):
+    name = "lexicon"
+
+    def __init__(
+        self,
+        lexicon_path: str = TEXTBLOB_LEXICON,
+        language: str = "en",
+        translations_path: str = SENTIMENT_WORDS,
+    ):
+        if language not in NEGATIONS:
+            raise ValueError(f"No sentiment lexicon for language {language!r}")
+        senses: Dict[str, Dict[Optional[str], list]] = {}
+        for word in ElementTree.parse(lexicon_path).getroot().findall("word"):
+            form = word.attrib.get("form")
+            if form:
+                scores = (float(word.attrib.get("polarity", 0.0)), float(word.attrib.get("intensity", 1.0)))
+                senses.setdefault(form, {}).setdefault(word.attrib.get("pos"), []).append(scores)
+
+        # Like TextBlob: average the senses per part of speech, then the parts of speech
+        words = {
+            form: {pos: np.mean(scores, axis=0) for pos, scores in per_pos.items()}
+            for form, per_pos in senses.items()
+        }
+        entries = {form: np.mean(list(per_pos.values()), axis=0) for form, per_pos in words.items()}
+        # and score adverbs as their adjective, "terribly" as "terrible"
+        for form, per_pos in list(words.items()):
+            if "JJ" in per_pos:
+                adverb = form[:-1] + "i" if form.endswith("y") else form
+                adverb = (adverb[:-2] if adverb.endswith("le") else adverb) + "ly"
+                words.setdefault(adverb, {})["RB"] = entries[adverb] = per_pos["JJ"]
+        if language != "en":
+            entries, words = self._translate(entries, words, language, translations_path)
+
+        self.language = language
+        self.negations = NEGATIONS[language]
+        self.vocabulary = {form: index for index, form in enumerate(entries, start=1)}
+        size = len(self.vocabulary) + 1
+        self.polarity = np.zeros(size)
+        self.intensity = np.ones(size)
+        self.modifier = np.zeros(size, dtype=bool)  # Has an adverb sense
+        for form, index in self.vocabulary.items():
+            self.polarity[index], self.intensity[index] = entries[form]
+            self.modifier[index] = "RB" in words[form]
+
+    @staticmethod
+    def _translate(entries, words, language, translations_path):
+        """English ``entries`` and ``words`` tables restricted to, and keyed by, ``language`` words."""
+        translated_entries, translated_words = {}, {}
+        with open(translations_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["language"] == language and row["english"] in entries:
+                    translated_entries[row["word"]] = entries[row["english"]]
+                    translated_words[row["word"]] = words[row["english"]]
+        return translated_entries, translated_words
+
+    def score_many(self, texts: Sequence[str]) -> List[float]:
+        tokens, owners = [], []
+        for row, text in enumerate(texts):
+            words = tokenize(text)
+            tokens.extend(words)
+            owners.extend([row] * len(words))
+        if not tokens:
+            return [0.0] * len(texts)
+
+        lookup = self.vocabulary.get
+        ids = np.fromiter((lookup(token, 0) for token in tokens), dtype=np.int64, count=len(tokens))
+        words = np.array(tokens, dtype=object)
+        owner = np.asarray(owners)
+        position = np.arange(len(tokens))
+        length = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+        known = ids > 0
+        face = np.fromiter(
+            (EMOTICON_POLARITY.get(token, np.nan) for token in tokens), dtype=float, count=len(tokens)
+        )
+        emoticon = ~known & ~np.isnan(face)
+        negation = ~known & np.isin(words, self.negations)
+        modifier = known & self.modifier[ids]
+        ly_modifier = modifier & np.char.endswith(words.astype(str), "ly")
+
+        def last(event):
+            """Index of the latest ``event`` token before each token in its comment, or -1."""
+            latest = np.empty_like(position)
+            latest[0] = -1
+            latest[1:] = np.maximum.accumulate(np.where(event, position, -1))[:-1]
+            return np.where((latest >= 0) & (owner[np.maximum(latest, 0)] == owner), latest, -1)
+
+        def at(index, values):
+            return (index >= 0) & values[np.maximum(index, 0)]
+
+        # TextBlob keeps a pending modifier ("very") across short unknown words,
+        # and a negation right after an -ly modifier ("really not") joins it
+        other = ~known & ~negation
+        modifier_source = last(known | (other & (length > 2)))
+        joins_modifier = negation & at(modifier_source, ly_modifier)
+        modifier_source = last(known | ((other | (negation & ~joins_modifier)) & (length > 2)))
+        intensified = known & at(modifier_source, modifier)
+
+        # A pending negation ("not") survives one-letter words and punctuation
+        negation_source = last(known | negation | (other & (length > 1)))
+        negated = known & at(negation_source, negation & ~joins_modifier)
+
+        # Known words start a scored entry or, after a modifier, extend the last
+        # one; emoticons always start their own
+        entry = np.cumsum((known & ~intensified) | emoticon) - 1
+        # and take the intensity of the last word scored before them
+        scoring = known | emoticon
+        intensity = np.where(negated, 1 / self.intensity[ids], self.intensity[ids])
+        intensity = np.where(emoticon, 1.0, intensity)
+        source = np.maximum(last(scoring), 0)
+        polarity = np.where(emoticon, face, self.polarity[ids])
+        polarity = np.where(intensified, np.clip(polarity * intensity[source], -1.0, 1.0), polarity)
+        entries = entry[-1] + 1
+        if not entries:
+            return [0.0] * len(texts)
+        final = np.zeros(entries, dtype=np.int64)  # Last word of each entry sets its polarity
+        np.maximum.at(final, entry[scoring], position[scoring])
+        entry_polarity = polarity[final]
+        entry_owner = owner[final]
+
+        entry_negated = np.zeros(entries, dtype=bool)
+        entry_negated[entry[negated]] = True
+        entry_negated[entry[joins_modifier]] = True
+
+        # Each "!" after an entry's last word boosts it
+        exclaimed = (words == "!") & (entry >= 0)
+        exclaimed &= (owner[final[np.maximum(entry, 0)]] == owner) & (final[np.maximum(entry, 0)] < position)
+        boosts = np.bincount(entry[exclaimed], minlength=entries)
+        entry_polarity = np.clip(entry_polarity * 1.25 ** boosts, -1.0, 1.0)
+        entry_polarity = np.where(entry_negated, entry_polarity * -0.5, entry_polarity)
+
+        total = np.bincount(entry_owner, weights=entry_polarity, minlength=len(texts))
+        count = np.bincount(entry_owner, minlength=len(texts))
+        return (total / np.maximum(count, 1)).tolist()
+
+
+BACKENDS = {backend.name: backend for backend in (TextBlobBackend, LexiconBackend)}
+
+
+def load_backend(backend: str, language: str = "en"):
+    """The named backend for ``language``; only English has a choice of backend."""
+    return BACKENDS[backend]() if language == "en" else LexiconBackend(language=language)
+
+
+def _backend_spec(backend: str, language: str) -> tuple:
+    return (load_backend, backend if language == "en" else "lexicon", language)
+
+
+def score_chunk(backend: str, texts: Sequence[str], language: str = "en") -> List[float]:
+    """Score ``texts`` with the named backend, loaded once per process.
+
+    Module-level so it can run in worker processes.
+    """
+    return models.get(*_backend_spec(backend, language)).score_many(texts)
+
+
+class SentimentAnalyser:
+    """Comment polarity, with the scoring backend chosen by the text's language.
+
+    English texts, and texts of undetermined language, use the configured
+    ``backend``. Other languages with an entry in NEGATIONS use the lexicon
+    backend with that language's translated vocabulary. Texts in any other
+    language are not scored. ``sentiment`` scores one English text with
+    TextBlob.
+    """
+
+    def __init__(self, backend: str = "textblob", workers: Optional[int] = None, min_chunk: int = 250):
+        """
+        Args:
+            backend: "textblob" (reference scores) or "lexicon" (vectorized).
+            workers: Scoring processes for score_many; ``None`` or 1 scores in-process.
+            min_chunk: Fewest texts sent to one worker.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown sentiment backend {backend!r}; expected one of {sorted(BACKENDS)}")
         self.text_cleaner = TextCleaner()
+        self.backend = backend
+        self.workers = workers
+        self.min_chunk = min_chunk
+        self._pool = None
 
     def _strip(self, text):
         return self.text_cleaner.clean_entities_symbols(
@@ -24,6 +322,47 @@ class SentimentAnalyser:
         t = TextBlob(text)
         return t.sentiment.polarity
 
+    def score_many(self, texts: Sequence[str], language: Optional[str] = "en") -> List[Optional[float]]:
+        """Polarity of each text, in input order.
+
+        Texts are scored as given: pass ``clean_text``, which Mining has
+        already stripped of links and entities, not the raw comment text.
+        ``language`` routes them to its lexicon; undetermined (None or
+        UNDETERMINED) texts are scored as English, and texts in languages
+        without a lexicon get None. With ``workers`` the texts are split
+        across a process pool that lives until close().
+        """
+        texts = list(texts)
+        if language in (None, UNDETERMINED):
+            language = "en"
+        if language not in NEGATIONS:
+            return [None] * len(texts)
+        parts = min(self.workers or 1, len(texts) // self.min_chunk)
+        if parts <= 1:
+            return score_chunk(self.backend, texts, language)
+
+        if self._pool is None:  # Workers load the backend as they start
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=warm, initargs=([_backend_spec(self.backend, language)],)
+            )
+        size = -(-len(texts) // parts)
+        futures = [
+            self._pool.submit(score_chunk, self.backend, texts[start:start + size], language)
+            for start in range(0, len(texts), size)
+        ]
+        return [score for future in futures for score in future.result()]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def get_most_sentimental_sentence(self, text, is_negative=False):
         blob = TextBlob(text)
 
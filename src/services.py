@@ -4,7 +4,8 @@ from typing import Optional, Dict, List, Tuple
 
 from .db_manager import DBManager
 from .llm_analysis import LLMAnalysis
-from .main import main as run_full_pipeline # Assuming main function is for processing video if not exists
+from .main import STAGES, main as run_full_pipeline # Assuming main function is for processing video if not exists
+from .pipeline import DONE
 
 logger = logging.getLogger(__name__)
 
@@ -57,12 +58,33 @@ class PersonaGenerator:
             # For now, matching existing behavior of potentially returning None if llm.execute fails
             return None  # Or re-raise depending on desired error handling
 
+    def _pipeline_finished(self, video_id: str) -> bool:
+        """Whether every pipeline stage has finished for the video.
+
+        Videos processed before the pipeline kept checkpoints have no stage
+        rows; one with a stored analysis counts as finished.
+        """
+        states = self.db.get_stage_states(video_id)
+        if not states:
+            return self.db.analysis_exists(video_id)
+        return all(states.get(stage.name) == DONE for stage in STAGES)
+
     def _format_gender(self, gender_code: str) -> str:
         """Convert gender code to display format"""
         return "Female" if gender_code == "F" else "Male"
 
-    def generate_persona(self, video_id: str, language: str = "English") -> PersonaData:
-        """Generate a persona for a video"""
+    def generate_persona(
+        self, video_id: str, language: str = "English", refresh: bool = False
+    ) -> PersonaData:
+        """Generate a persona for a video.
+
+        The pipeline runs unless every stage has finished for the video, or
+        the video was analysed before stages were checkpointed; an
+        interrupted or failed run resumes from its first unfinished stage.
+        With ``refresh`` set, a finished video is run through the pipeline
+        again; gathering then only fetches comments newer than the ones
+        already stored.
+        """
         if not video_id:
             logger.warning("No video ID provided")
             return PersonaData(
@@ -82,9 +104,9 @@ class PersonaGenerator:
             logger.info(f"Generating persona for video {video_id}")
             # self.db.connect() # REMOVED
 
-            # Process video if not in database
-            if not self.db.video_exists(video_id):
-                logger.info(f"Video {video_id} not found in database, processing...")
+            # Process video unless its pipeline finished, or refresh it on request
+            if refresh or not self._pipeline_finished(video_id):
+                logger.info(f"Processing video {video_id} (refresh={refresh})...")
                 try:
                     run_full_pipeline(video_id)
                 except ValueError as ve:
@@ -17,6 +17,7 @@ TEST_NAMSOR_KEY = 'test_namsor_key'
 OPENAI_API_KEY = TEST_API_KEY if IN_TEST_MODE else os.getenv("OPENAI_API_KEY")
 YOUTUBE_DEVELOPER_KEY = TEST_YOUTUBE_KEY if IN_TEST_MODE else os.getenv("YOUTUBE_DEVELOPER_KEY")
 NAMSOR_KEY = TEST_NAMSOR_KEY if IN_TEST_MODE else os.getenv("NAMSOR_KEY")
+NAMSOR_URL = os.getenv("NAMSOR_URL", "https://v2.namsor.com/NamSorAPIv2")
 
 # Only validate in non-test mode
 if not IN_TEST_MODE:
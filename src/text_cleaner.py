@@ -1,21 +1,35 @@
 import re
 import string
+from typing import Iterable, List
+
+# http(s) links; note "\+-=" is a character range, kept for compatibility
+LINK_PATTERN = r"https?:(?://|\\)+(?:[\w\d:#@%/;$()~_?\+-=\\\.&](?:#!)?)*"
+
+# Everything strip_entities_links removes, in one pass: whole words that start
+# with @ or # (the lookbehind rejects an @ or # preceded by a non-space), and
+# links anywhere. A link swallows any @ or # that follows it, so removing one
+# can never expose a new entity at the start of a word.
+ENTITY_OR_LINK_REGEX = re.compile(r"[@#](?<!\S.)\S*|" + LINK_PATTERN)
+
+
+def _has_entity_or_link(text):
+    """Cheap pre-check that lets most comments skip the regex entirely."""
+    return "@" in text or "#" in text or "http" in text
+
+
+# Chat artefacts removed after entities and links, applied in this order
+ARTEFACT_REPLACEMENTS = (("..", "."), ("kk", ""), ("rs", ""))
 
 
 class TextCleaner:
     def __init__(self):
-        self.link_regex = re.compile(
-            "((https?):((//)|(\\\\))+([\w\d:#@%/;$()~_?\+-=\\\.&](#!)?)*)", re.DOTALL
-        )
+        self.link_regex = re.compile(LINK_PATTERN)
         self.entity_prefixes = ["@", "#"]
         self.punctuation_translator = str.maketrans("", "", string.punctuation)
         self.entities_translator = str.maketrans("", "", "@#")
 
     def strip_links(self, text):
-        links = re.findall(self.link_regex, text)
-        for link in links:
-            text = text.replace(link[0], "")
-        return text
+        return self.link_regex.sub("", text)
 
     def strip_punctuation(self, text):
         return text.translate(self.punctuation_translator).strip()
@@ -59,4 +73,31 @@ class TextCleaner:
             input: @daniel I want that camera at #Bestbuy. http://bit.ly//WR4Rt
             output: I want that camera at
         """
-        return self.strip_entities(self.strip_links(text))
+        if _has_entity_or_link(text):
+            text = ENTITY_OR_LINK_REGEX.sub("", text)
+        return " ".join(text.split())
+
+    def clean_comment(self, text):
+        """
+        Full comment cleaning used by mining: strip_entities_links followed by
+        removal of the "..", "kk" and "rs" artefacts.
+        Example:
+            input: @ana Great video.. rsrs http://bit.ly//WR4Rt
+            output: Great video. 
+        """
+        text = self.strip_entities_links(text)
+        for old, new in ARTEFACT_REPLACEMENTS:
+            text = text.replace(old, new)
+        return text
+
+    def clean_many(self, texts: Iterable[str]) -> List[str]:
+        """Batch version of clean_comment, with the per-call overhead hoisted out."""
+        sub = ENTITY_OR_LINK_REGEX.sub
+        (a, a_new), (b, b_new), (c, c_new) = ARTEFACT_REPLACEMENTS
+        return [
+            " ".join((sub("", text) if _has_entity_or_link(text) else text).split())
+            .replace(a, a_new)
+            .replace(b, b_new)
+            .replace(c, c_new)
+            for text in texts
+        ]
@@ -0,0 +1,344 @@
+"""In-process stand-ins for external services, shared by tests and benchmarks."""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_EPOCH = datetime(2024, 1, 1)
+
+
+class _Request:
+    def __init__(self, handler, params):
+        self._handler = handler
+        self._params = params
+
+    def execute(self):
+        return self._handler(**self._params)
+
+
+class _Resource:
+    def __init__(self, handler):
+        self._handler = handler
+
+    def list(self, **params):
+        return _Request(self._handler, params)
+
+
+class FakeYouTube:
+    """Minimal YouTube Data API v3 client serving generated comment threads.
+
+    ``videos`` maps a video ID to its number of comments. ``playlists``
+    maps a playlist ID to its video IDs and ``channels`` a channel ID to its
+    uploaded video IDs; a channel's uploads playlist is "UU" plus its ID
+    after "UC". Videos in ``private`` are listed but private. Each call
+    sleeps ``latency`` seconds to mimic a network round trip.
+    """
+
+    def __init__(
+        self, videos=None, latency=0.0, page_size_cap=100, titles=None, playlists=None, channels=None, private=()
+    ):
+        self.videos_data = dict(videos or {})
+        self.titles = dict(titles or {})
+        self.playlists_data = dict(playlists or {})
+        self.channels_data = dict(channels or {})
+        for channel_id, video_ids in self.channels_data.items():
+            self.playlists_data["UU" + channel_id[2:]] = list(video_ids)
+        self.private = set(private)
+        self.latency = latency
+        self.page_size_cap = page_size_cap
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, method, params):
+        with self._lock:
+            self.calls.append((method, params))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def videos(self):
+        return _Resource(self._videos_list)
+
+    def commentThreads(self):
+        return _Resource(self._comment_threads_list)
+
+    def channels(self):
+        return _Resource(self._channels_list)
+
+    def playlists(self):
+        return _Resource(self._playlists_list)
+
+    def playlistItems(self):
+        return _Resource(self._playlist_items_list)
+
+    def _channels_list(self, part, id):
+        self._record("channels.list", {"id": id})
+        if id not in self.channels_data:
+            return {"items": []}
+        return {"items": [{
+            "id": id,
+            "snippet": {"title": self.titles.get(id, f"Title of {id}")},
+            "contentDetails": {"relatedPlaylists": {"uploads": "UU" + id[2:]}},
+        }]}
+
+    def _playlists_list(self, part, id):
+        self._record("playlists.list", {"id": id})
+        if id not in self.playlists_data:
+            return {"items": []}
+        return {"items": [{"id": id, "snippet": {"title": self.titles.get(id, f"Title of {id}")}}]}
+
+    def _playlist_items_list(self, part, playlistId, maxResults=5, pageToken=None):
+        self._record("playlistItems.list", {"playlistId": playlistId, "pageToken": pageToken})
+        video_ids = self.playlists_data.get(playlistId, [])
+        start = int(pageToken or 0)
+        end = min(start + min(maxResults, 50), len(video_ids))
+        response = {"items": [
+            {
+                "snippet": {
+                    "title": "Private video" if video_id in self.private else self.titles.get(video_id, f"Title of {video_id}"),
+                    "resourceId": {"kind": "youtube#video", "videoId": video_id},
+                },
+                "status": {"privacyStatus": "private" if video_id in self.private else "public"},
+            }
+            for video_id in video_ids[start:end]
+        ]}
+        if end < len(video_ids):
+            response["nextPageToken"] = str(end)
+        return response
+
+    def _videos_list(self, part, id):
+        self._record("videos.list", {"id": id})
+        if id not in self.videos_data:
+            return {"items": []}
+        return {"items": [{"id": id, "snippet": {"title": self.titles.get(id, f"Title of {id}")}}]}
+
+    def comment_item(self, video_id, index):
+        return {
+            "id": f"{video_id}-c{index}",
+            "snippet": {
+                "topLevelComment": {
+                    "id": f"{video_id}-c{index}",
+                    "snippet": {
+                        "publishedAt": (_EPOCH + timedelta(minutes=index)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "authorDisplayName": f"Author {index}",
+                        "likeCount": index % 97,
+                        "textOriginal": f"Comment number {index} on video {video_id}, long enough to keep",
+                    },
+                }
+            },
+        }
+
+    def _comment_threads_list(self, part, videoId, maxResults=20, pageToken=None, order=None, **kwargs):
+        """Comment ``i`` is published ``i`` minutes after the epoch; order="time" is newest first."""
+        self._record("commentThreads.list", dict(videoId=videoId, pageToken=pageToken, order=order, **kwargs))
+        total = self.videos_data.get(videoId, 0)
+        page_size = min(maxResults, self.page_size_cap)
+        start = int(pageToken or 0)
+        end = min(start + page_size, total)
+        indexes = range(start, end)
+        if order == "time":
+            indexes = (total - 1 - i for i in indexes)
+        response = {"items": [self.comment_item(videoId, i) for i in indexes]}
+        if end < total:
+            response["nextPageToken"] = str(end)
+        return response
+
+
+def persona_reply(messages):
+    """Default FakeChatServer reply: a persona JSON naming the batch's first author."""
+    prompt = messages[-1]["content"]
+    authors = re.findall(r"^\s*Author: (.*)$", prompt, re.MULTILINE)
+    first = authors[0] if authors else ""
+    return json.dumps({
+        "issues": [f"issue from {first}"],
+        "wishes": [f"wish from {first}"],
+        "pains": [],
+        "expressions": [],
+        "name": "Alex",
+        "gender": "Male",
+        "age": "25-34",
+        "language": "English",
+    })
+
+
+def map_reduce_reply(messages):
+    """Fake LLM: persona_reply for comment batches, a ranked union for reduce prompts."""
+    prompt = messages[-1]["content"]
+    if "Partial analyses:" not in prompt:
+        return persona_reply(messages)
+    partials = json.loads(prompt[prompt.index("[", prompt.index("Partial analyses:")):prompt.rindex("]") + 1])
+    counts = {}
+    for partial in partials:
+        for issue in partial["issues"]:
+            counts[issue] = counts.get(issue, 0) + 1
+    return json.dumps({
+        "issues": sorted(counts, key=lambda issue: (-counts[issue], issue)),
+        "wishes": ["consolidated wish"],
+        "pains": [],
+        "expressions": [],
+        "name": partials[0]["name"],
+        "gender": partials[0]["gender"],
+        "age": partials[0]["age"],
+        "language": partials[0]["language"],
+    })
+
+
+class _JSONServer:
+    """Local threaded HTTP server answering JSON POSTs through ``_handle``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handle(self, path, headers, body):
+        """Return ``(status, headers, payload)`` for one request."""
+        raise NotImplementedError
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                status, headers, payload = fake._handle(
+                    self.path, self.headers, json.loads(self.rfile.read(length))
+                )
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeChatServer(_JSONServer):
+    """Local HTTP server speaking the OpenAI chat-completions protocol.
+
+    Point an OpenAI client at ``base_url``. Every request sleeps ``latency``
+    seconds; the first ``rate_limited`` requests are answered with HTTP 429
+    and a ``Retry-After`` of ``retry_after`` seconds. ``reply`` maps the
+    request's messages to the assistant's reply text.
+    """
+
+    def __init__(self, latency=0.0, reply=persona_reply, rate_limited=0, retry_after=0.05):
+        super().__init__()
+        self.latency = latency
+        self.reply = reply
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+        self.requests = []
+        self.arrivals = []  # time.monotonic() of each request
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self):
+        return f"{self.address}/v1"
+
+    def _handle(self, path, headers, body):
+        with self._lock:
+            self.requests.append(body)
+            self.arrivals.append(time.monotonic())
+            throttled = len(self.requests) <= self.rate_limited
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if throttled:
+                error = {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+                return 429, {"Retry-After": str(self.retry_after)}, error
+            content = self.reply(body["messages"])
+            return 200, {}, {
+                "id": f"chatcmpl-{len(self.requests)}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class FakeNamsorServer(_JSONServer):
+    """Local HTTP server speaking Namsor's v2 ``genderBatch`` protocol.
+
+    Point a GenderAnalyzer at ``base_url``. ``scales`` maps a lowercase
+    first name to its Namsor genderScale, from -1 (male) to 1 (female);
+    other names get 0. Requests without ``api_key`` in ``X-API-KEY`` get
+    HTTP 401; the first ``failures`` requests get HTTP 503.
+    """
+
+    def __init__(self, scales=None, api_key="test_namsor_key", failures=0):
+        super().__init__()
+        self.scales = dict(scales or {})
+        self.api_key = api_key
+        self.failures = failures
+        self.requests = []  # personalNames lists, one per request
+
+    @property
+    def base_url(self):
+        return f"{self.address}/NamSorAPIv2"
+
+    def _handle(self, path, headers, body):
+        if not path.endswith("/api2/json/genderBatch"):
+            return 404, {}, {"message": "Not found"}
+        if headers.get("X-API-KEY") != self.api_key:
+            return 401, {}, {"message": "Invalid API key"}
+        with self._lock:
+            self.requests.append(body["personalNames"])
+            failing = len(self.requests) <= self.failures
+        if failing:
+            return 503, {}, {"message": "Service unavailable"}
+
+        names = []
+        for person in body["personalNames"]:
+            scale = self.scales.get(person["firstName"].lower(), 0.0)
+            names.append({
+                "script": "LATIN",
+                "id": person["id"],
+                "firstName": person["firstName"],
+                "lastName": person.get("lastName", ""),
+                "likelyGender": "male" if scale <= 0 else "female",
+                "genderScale": scale,
+                "score": 10.0,
+                "probabilityCalibrated": (1 + abs(scale)) / 2,
+            })
+        return 200, {}, {"personalNames": names}
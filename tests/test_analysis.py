@@ -0,0 +1,128 @@
+import unittest
+from unittest.mock import patch
+
+from src.analysis import Analysis, AnalysisTask
+from src.db_manager import DBManager
+from src.gender_analyzer import GenderAnalyzer
+from src.name_gender_table import NameGenderTable
+
+TEXTS = [
+    ("John", "this video is really great, thanks"),
+    ("Ana Maria", "o vídeo é muito bom, obrigado"),
+    ("Zzyzx", "the audio is terrible and the editing is boring"),
+    ("", "lol"),
+]
+
+
+class RecordingTask(AnalysisTask):
+    """Plug-in task that sees every comment and writes nothing."""
+
+    name = "recording"
+    columns = ("likes",)
+
+    def __init__(self):
+        self.seen = []
+        self.finished = None
+
+    def process(self, comments):
+        self.seen += [c["likes"] for c in comments]
+        return []
+
+    def finish(self, video_id):
+        self.finished = video_id
+
+
+class TestAnalysisPass(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.db._execute_many(
+            "INSERT INTO comment (youtube_id, video_id, author_clean_name, text, clean_text, published, "
+            "author_display_name, likes) VALUES (?, 'vid', ?, ?, ?, '2024-01-01', '', ?)",
+            [(f"c{i}", name, text, text, len(TEXTS) - i) for i, (name, text) in enumerate(TEXTS)],
+        )
+        table = NameGenderTable.build({"john": 0.99, "ana": 0.01})
+        patches = [
+            patch("src.analysis.DBManager", return_value=self.db),
+            patch("src.analysis.GenderAnalyzer", lambda db: GenderAnalyzer(db, table=table, api_key=None)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.analysis = Analysis()
+        self.analysis.sentiment_backend = "lexicon"
+
+    def tearDown(self):
+        self.db.close()
+
+    def rows(self):
+        return self.db._execute_query(
+            "SELECT language, sentiment IS NOT NULL, author_gender FROM comment ORDER BY id", fetch_all=True
+        )
+
+    def test_execute_reads_the_comments_once(self):
+        with patch.object(self.db, "iter_comments", wraps=self.db.iter_comments) as iter_comments:
+            self.analysis.execute("vid")
+        iter_comments.assert_called_once()
+
+        self.assertEqual(
+            self.rows(),
+            [("en", 1, "M"), ("pt", 1, "F"), ("en", 1, None), ("und", 1, None)],
+        )
+        self.assertTrue(self.db.get_keywords("vid"))
+
+        report = self.analysis.report
+        self.assertEqual(report["rows_read"], len(TEXTS))
+        self.assertEqual(report["chunks"], 1)
+        self.assertEqual(list(report["task_seconds"]), ["language", "sentiment", "gender", "keywords"])
+        self.assertEqual(
+            report["columns"], ("id", "text", "language", "clean_text", "author_clean_name", "author_gender")
+        )
+
+    def test_rerun_replaces_keywords(self):
+        self.analysis.execute("vid")
+        count = self.db._execute_query(
+            "SELECT COUNT(*) FROM comment_keywords WHERE video_id = 'vid'", fetch_one=True
+        )[0]
+        keywords = self.db.get_keywords("vid")
+        self.assertGreater(count, 0)
+
+        Analysis().execute("vid")  # Resume, --from-stage, --only or refresh
+        self.assertEqual(
+            self.db._execute_query(
+                "SELECT COUNT(*) FROM comment_keywords WHERE video_id = 'vid'", fetch_one=True
+            )[0],
+            count,
+        )
+        self.assertEqual(self.db.get_keywords("vid"), keywords)
+
+    def test_disabled_tasks_and_plugins(self):
+        plugin = RecordingTask()
+        self.analysis.extra_tasks.append(plugin)
+        self.analysis.enabled["gender"] = False
+        self.analysis.enabled["keywords"] = False
+        self.analysis.execute("vid")
+
+        self.assertEqual([gender for _, _, gender in self.rows()], [None] * len(TEXTS))
+        self.assertEqual(self.db.get_keywords("vid"), [])
+        self.assertEqual(plugin.seen, [4, 3, 2, 1])  # Most liked first
+        self.assertEqual(plugin.finished, "vid")
+        self.assertIn("likes", self.analysis.report["columns"])
+        self.assertNotIn("author_gender", self.analysis.report["columns"])
+
+    def test_results_are_written_in_batches(self):
+        self.analysis.chunk_size = 1
+        self.analysis.flush_rows = 3
+        writer = self.db.update_comments_language_bulk
+        with patch.object(self.db, "update_comments_language_bulk", wraps=writer) as writes:
+            self.analysis.execute("vid")
+        self.assertEqual([len(call.args[0]) for call in writes.call_args_list], [3, 1])
+        self.assertEqual(self.analysis.report["chunks"], len(TEXTS))
+
+    def test_unknown_task(self):
+        with self.assertRaises(ValueError):
+            self.analysis._build_task("topics")
+
+
+if __name__ == "__main__":
+    unittest.main()
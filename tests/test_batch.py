@@ -0,0 +1,96 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.batch import BatchRunner, main, read_video_ids
+from src.db_manager import DBManager
+from src.pipeline import Stage
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.lock = threading.Lock()
+        self.active = {"network": 0, "cpu": 0}
+        self.peak = {"network": 0, "cpu": 0}
+
+    def stage(self, name, resource, after=()):
+        def run(video_id):
+            with self.lock:
+                self.active[resource] += 1
+                self.peak[resource] = max(self.peak[resource], self.active[resource])
+            time.sleep(0.01)
+            with self.lock:
+                self.active[resource] -= 1
+            if video_id == "broken" and name == "llm":
+                raise RuntimeError("quota exceeded")
+
+        return Stage(name, run, after, resource)
+
+    def stages(self):
+        return [
+            self.stage("gather", "network"),
+            self.stage("mine", "cpu", ("gather",)),
+            self.stage("analyse", "cpu", ("mine",)),
+            self.stage("llm", "network", ("mine",)),
+            self.stage("report", "cpu", ("analyse", "llm")),
+        ]
+
+    def test_read_video_ids(self):
+        lines = ["abc123\n", "\n", "# channel uploads\n", "def456  # intro\n", "abc123\n"]
+        self.assertEqual(read_video_ids(lines), ["abc123", "def456"])
+
+    def test_summary_has_timings_and_failures(self):
+        runner = BatchRunner(self.stages(), workers=3, network_workers=2, cpu_workers=1, db=self.db)
+        summary = runner.run(["v1", "broken", "v2", "v1"])
+
+        self.assertEqual((summary["videos"], summary["done"], summary["failed"]), (3, 2, 1))
+        self.assertEqual(summary["limits"], {"network": 2, "cpu": 1})
+        results = {result["video_id"]: result for result in summary["results"]}
+        self.assertEqual(list(results["v1"]["stages"]), ["gather", "mine", "analyse", "llm", "report"])
+        self.assertEqual(results["v1"]["status"], "done")
+        self.assertEqual(results["broken"]["status"], "failed")
+        self.assertEqual(results["broken"]["failed_stages"], ["llm"])
+        self.assertEqual(results["broken"]["error"], "RuntimeError: quota exceeded")
+        self.assertNotIn("report", results["broken"]["stages"])
+        json.dumps(summary)  # Serialisable as is
+
+    def test_resource_limits_hold_across_videos(self):
+        runner = BatchRunner(self.stages(), workers=6, network_workers=2, cpu_workers=1, db=self.db)
+        runner.run([f"v{i}" for i in range(12)])
+        self.assertEqual(self.peak["cpu"], 1)
+        self.assertEqual(self.peak["network"], 2)
+
+    def test_one_gathering_and_llm_analysis_per_batch(self):
+        with patch("src.batch.Gathering") as gathering, patch("src.batch.LLMAnalysis") as llm_analysis:
+            runner = BatchRunner(workers=3, db=self.db)
+            summary = runner.run(["v1", "v2", "v3"], only=["gathering", "llm_analysis"])
+
+        self.assertEqual(summary["done"], 3)
+        gathering.assert_called_once_with()
+        llm_analysis.assert_called_once_with()
+        self.assertEqual(gathering.return_value.execute.call_count, 3)
+        self.assertEqual(llm_analysis.return_value.execute.call_count, 3)
+        self.assertIs(summary["youtube_quota"], gathering.return_value.quota.spent)
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            summary_path = os.path.join(tmpdir, "summary.json")
+            with patch("src.batch.BatchRunner", lambda **kwargs: BatchRunner(self.stages(), db=self.db, **kwargs)), \
+                    patch("sys.stdin", io.StringIO("v1\nbroken\n")):
+                status = main(["--workers", "2", "--cpu-workers", "1", "--summary", summary_path])
+            with open(summary_path, encoding="utf-8") as f:
+                summary = json.load(f)
+        self.assertEqual(status, 1)
+        self.assertEqual((summary["workers"], summary["limits"]["cpu"]), (2, 1))
+        self.assertEqual([r["status"] for r in summary["results"]], ["done", "failed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import patch
+
+from src.comment_fetcher import (
+    CommentFetcher,
+    QuotaExceededError,
+    QuotaTracker,
+    RateLimiter,
+)
+from src.db_manager import DBManager
+from tests.fakes import FakeYouTube
+
+
+class TestCommentFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.youtube = FakeYouTube({"vid_a": 250, "vid_b": 40, "vid_empty": 0})
+        self.fetcher = CommentFetcher(lambda: self.youtube, db=self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_fetch_pages_through_all_comments(self):
+        saved = self.fetcher.fetch("vid_a")
+
+        self.assertEqual(saved, 250)
+        self.assertEqual(len(self.db.get_comments("vid_a")), 250)
+        page_calls = [c for c in self.youtube.calls if c[0] == "commentThreads.list"]
+        self.assertEqual(len(page_calls), 3)  # 100 + 100 + 50
+        self.assertEqual(self.fetcher.quota.spent, 3)
+
+    def test_short_comments_are_skipped(self):
+        self.fetcher.min_length = 1000
+        self.assertEqual(self.fetcher.fetch("vid_b"), 0)
+        self.assertEqual(self.db.get_comments("vid_b"), [])
+
+    def test_fetch_many(self):
+        results = self.fetcher.fetch_many(["vid_a", "vid_b", "vid_empty", "vid_a"], max_workers=3)
+
+        self.assertEqual(results, {"vid_a": 250, "vid_b": 40, "vid_empty": 0})
+        self.assertEqual(len(self.db.get_comments("vid_b")), 40)
+
+    def test_max_pages(self):
+        self.assertEqual(self.fetcher.fetch("vid_a", max_pages=2), 200)
+        self.assertEqual(self.fetcher.quota.spent, 2)
+        self.assertFalse(self.db.full_gather_finished("vid_a"))
+        results = self.fetcher.fetch_many(["vid_a", "vid_b"], incremental=True, max_pages=1)
+        # vid_a never finished a full gather, so it starts again from the first page
+        self.assertEqual(results, {"vid_a": 100, "vid_b": 40})
+        self.assertTrue(self.db.full_gather_finished("vid_b"))
+
+    def test_incremental_only_after_a_full_gather(self):
+        self.fetcher.fetch("vid_a", max_pages=1)
+        self.youtube.calls.clear()
+        self.assertEqual(self.fetcher.fetch("vid_a", incremental=True), 250)  # Fills the gap
+        self.assertTrue(self.db.full_gather_finished("vid_a"))
+
+        self.youtube.videos_data["vid_a"] += 250
+        self.youtube.calls.clear()
+        # Capped before reaching the stored comments: the next gather is full again
+        self.assertEqual(self.fetcher.fetch("vid_a", incremental=True, max_pages=1), 100)
+        self.assertEqual(self.youtube.calls[0][1]["order"], "time")
+        self.assertFalse(self.db.full_gather_finished("vid_a"))
+        self.fetcher.fetch("vid_a", incremental=True)
+        self.assertEqual(len(self.db.get_comments("vid_a")), 500)
+
+    def test_failed_gather_is_completed_next_time(self):
+        real = self.youtube._comment_threads_list
+        calls = []
+
+        def flaky(**params):
+            calls.append(params)
+            if len(calls) == 2:
+                raise RuntimeError("network down")
+            return real(**params)
+
+        with patch.object(self.youtube, "_comment_threads_list", flaky):
+            with self.assertRaises(RuntimeError):
+                self.fetcher.fetch("vid_a")
+        self.assertEqual(len(self.db.get_comments("vid_a")), 100)
+        self.assertEqual(self.fetcher.fetch("vid_a", incremental=True), 250)
+        self.assertEqual(len(self.db.get_comments("vid_a")), 250)
+
+    def test_quota_budget_stops_fetch(self):
+        self.fetcher.quota = QuotaTracker(budget=2)
+
+        with self.assertRaises(QuotaExceededError):
+            self.fetcher.fetch("vid_a")
+        self.assertEqual(self.fetcher.quota.spent, 2)
+        self.assertEqual(self.fetcher.quota.remaining(), 0)
+
+    def test_producer_errors_reach_consumer(self):
+        def broken(**params):
+            raise RuntimeError("network down")
+
+        with patch.object(self.youtube, "_comment_threads_list", broken):
+            results = self.fetcher.fetch_many(["vid_a"])
+        self.assertIsInstance(results["vid_a"], RuntimeError)
+
+    def test_clients_are_reused(self):
+        built = []
+
+        def factory():
+            built.append(1)
+            return self.youtube
+
+        fetcher = CommentFetcher(factory, db=self.db)
+        fetcher.fetch("vid_b")
+        fetcher.fetch("vid_b")
+        self.assertEqual(len(built), 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_limits_request_rate(self):
+        limiter = RateLimiter(rate=50, burst=1)
+        with patch("src.comment_fetcher.time.sleep") as sleep:
+            limiter.acquire()
+            limiter.acquire()
+        sleep.assert_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from src.comment_prefilter import CommentPrefilter
+
+
+def comment(i, text, likes=0):
+    return {"id": i, "text": text, "clean_text": text, "author_clean_name": f"Author{i}", "likes": likes}
+
+
+class TestCommentPrefilter(unittest.TestCase):
+
+    def setUp(self):
+        self.prefilter = CommentPrefilter()
+
+    def test_low_information(self):
+        for text in ("", "😂😂😂", "first!", "kkkkkkkk", "lol lol lol", "10/10", "!!!"):
+            self.assertTrue(self.prefilter.is_low_information(text), text)
+        for text in ("Great video", "Comment 1", "o áudio está baixo", "the mic is clipping"):
+            self.assertFalse(self.prefilter.is_low_information(text), text)
+
+    def test_signatures_are_deterministic(self):
+        texts = ["the audio drops out at 3:10", "please make a part two"]
+        first = self.prefilter.signatures(texts)
+        self.assertEqual(first.shape, (2, self.prefilter.num_perm))
+        self.assertTrue((CommentPrefilter().signatures(texts) == first).all())
+
+    def test_duplicate_groups(self):
+        texts = [
+            "This is the best tutorial on the whole platform, thank you so much",
+            "please make a video about sourdough bread next time",
+            "this is the best tutorial on the whole platform thank you so much!!",
+            "This is the best tutorial on the whole platform, thank you so much",
+            "please make a video about pizza dough next time",
+        ]
+        self.assertEqual(self.prefilter.duplicate_groups(texts), [0, 1, 0, 0, 4])
+        self.assertEqual(self.prefilter.duplicate_groups([]), [])
+
+    def test_filter_folds_duplicates_into_most_liked(self):
+        joke = "when the cat finally hit the high note at the end"
+        comments = [
+            comment(0, "the audio drops out at 3:10", likes=5),
+            comment(1, joke, likes=2),
+            comment(2, "😂😂", likes=90),
+            comment(3, joke.upper(), likes=7),
+            comment(4, joke + " lmao", likes=1),
+        ]
+        kept, removed = self.prefilter.filter(comments)
+
+        self.assertEqual(removed["low_information"], [2])
+        self.assertEqual(sorted(removed["duplicate"]), [1, 4])
+        self.assertEqual([c["id"] for c in kept], [0, 3])
+        self.assertEqual(kept[1]["likes"], 10)
+        self.assertEqual(kept[1]["duplicates"], 2)
+        self.assertNotIn("duplicates", kept[0])
+        self.assertEqual(comments[3]["likes"], 7)  # Input left untouched
+
+    def test_filter_falls_back_to_text(self):
+        kept, removed = self.prefilter.filter(
+            [{"id": 1, "text": "a useful remark about pacing", "clean_text": None}]
+        )
+        self.assertEqual(len(kept), 1)
+        self.assertEqual(removed, {"low_information": [], "duplicate": []})
+
+    def test_sample_fits_budget_and_favours_likes(self):
+        rng = random.Random(7)
+        comments = [comment(i, f"comment {i}", likes=1000 if i < 10 else 0) for i in range(200)]
+        costs = [rng.randint(5, 50) for _ in comments]
+
+        chosen = self.prefilter.sample(comments, costs, token_budget=600)
+        self.assertEqual(chosen, sorted(chosen))
+        self.assertLessEqual(sum(costs[i] for i in chosen), 600)
+        self.assertTrue(set(range(10)) <= set(chosen))
+        self.assertGreater(len(chosen), 10)  # Leftover budget goes to the rest
+        self.assertEqual(self.prefilter.sample(comments, costs, token_budget=600), chosen)
+
+        self.assertEqual(len(self.prefilter.sample(comments, costs, 10**6, max_comments=25)), 25)
+        self.assertEqual(self.prefilter.sample(comments, costs, token_budget=0), [])
+
+    def test_num_perm_must_split_into_bands(self):
+        with self.assertRaises(ValueError):
+            CommentPrefilter(num_perm=60, bands=8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
+import os
+import tempfile
+import threading
 import unittest
+from unittest.mock import patch
 import sqlite3
-from src.db_manager import DBManager
+from src.comment import Comment
+from src.db_manager import DBManager, MIGRATIONS, close_all_pools
+from src.pipeline import Pipeline, Stage
 from datetime import datetime, timezone  # Use timezone-aware datetimes for consistency
 import json
 import time # Ensure time is imported
@@ -87,6 +93,204 @@ class TestDBManager(unittest.TestCase):
             datetime,
         )  # created is by DBManager
 
+    def test_save_comments_bulk(self):
+        now = datetime.now(timezone.utc)
+        comments = [
+            MockComment(
+                video_id="vid_bulk",
+                published=now,
+                author_display_name=f"Author{i}",
+                likes=i,
+                text=f"Bulk comment number {i}",
+            )
+            for i in range(7)
+        ]
+
+        saved = self.db.save_comments_bulk(comments, batch_size=3)
+
+        self.assertEqual(saved, 7)
+        stored = self.db.get_comments("vid_bulk")
+        self.assertEqual(len(stored), 7)
+        self.assertEqual(stored[0]["likes"], 6)  # Ordered by likes DESC
+        self.assertEqual(stored[0]["text"], "Bulk comment number 6")
+
+    def test_save_comments_bulk_accepts_iterator(self):
+        now = datetime.now(timezone.utc)
+        pages = [["first", "second"], ["third"]]
+        comments = (
+            MockComment("vid_bulk_iter", now, "Author", 1, text)
+            for page in pages
+            for text in page
+        )
+
+        self.assertEqual(self.db.save_comments_bulk(comments), 3)
+        self.assertEqual(len(self.db.get_comments("vid_bulk_iter")), 3)
+        self.assertEqual(self.db.save_comments_bulk([]), 0)
+
+    def _add_comments_for_filters(self, video_id="vid_filters"):
+        now = datetime.now(timezone.utc)
+        self.db.save_comments_bulk(
+            MockComment(video_id, now, f"Author{i}", i * 10, f"Filter comment {i}")
+            for i in range(5)
+        )
+        comments = self.db.get_comments(video_id)
+        ids = [c["id"] for c in comments]  # Ordered by likes: 40, 30, 20, 10, 0
+        self.db.update_comments_sentiment_bulk([(ids[0], 0.5, now), (ids[1], -0.5, now)])
+        self.db.update_comments_gender_bulk([(ids[0], "M", now)])
+        return ids
+
+    def test_get_comments_null_filters(self):
+        ids = self._add_comments_for_filters()
+
+        no_sentiment = self.db.get_comments("vid_filters", no_sentiment=True)
+        self.assertEqual([c["id"] for c in no_sentiment], ids[2:])
+
+        no_gender = self.db.get_comments("vid_filters", no_gender=True)
+        self.assertEqual([c["id"] for c in no_gender], ids[1:])
+
+        scored = self.db.get_comments("vid_filters", not_null=("sentiment",))
+        self.assertEqual([c["id"] for c in scored], ids[:2])
+
+    def test_get_comments_projection_and_paging(self):
+        ids = self._add_comments_for_filters()
+
+        rows = self.db.get_comments(
+            "vid_filters", columns=("id", "likes"), min_likes=10, limit=2, offset=1
+        )
+        self.assertEqual(rows, [{"id": ids[1], "likes": 30}, {"id": ids[2], "likes": 20}])
+
+        tail = self.db.get_comments("vid_filters", columns=("likes",), offset=3, row_format="tuple")
+        self.assertEqual(tail, [(10,), (0,)])
+
+    def test_get_comments_as_comment_objects(self):
+        self._add_comments_for_filters()
+        comments = self.db.get_comments("vid_filters", limit=1, row_format="comment")
+        self.assertEqual(len(comments), 1)
+        self.assertIsInstance(comments[0], Comment)
+        self.assertEqual(comments[0].likes, 40)
+        self.assertEqual(comments[0].author_gender, "M")
+
+    def test_video_groups_read_the_comments_of_their_videos(self):
+        self._add_comments_for_filters("vid_g1")  # Likes 0-40; one "M" author
+        self._add_comments_for_filters("vid_g2")
+        self._add_comments_for_filters("vid_other")
+        self.db.save_video_titles([("vid_g1", "One"), ("vid_g2", "Two")])
+        self.db.save_video_group("UCgroup", "The Channel", ["vid_g1", "vid_g2"])
+        self.db.save_video_group("UCgroup", "The Channel", ["vid_g2"])  # Idempotent
+
+        self.assertEqual(self.db.get_group_videos("UCgroup"), ["vid_g1", "vid_g2"])
+        self.assertEqual(self.db.get_group_videos("vid_g1"), [])
+        self.assertEqual(self.db.get_video_title("UCgroup"), "The Channel")
+        self.assertEqual(self.db.get_video_title("vid_g2"), "Two")
+
+        comments = self.db.get_comments("UCgroup", columns=("video_id", "likes"))
+        self.assertEqual(len(comments), 10)
+        self.assertEqual({c["video_id"] for c in comments}, {"vid_g1", "vid_g2"})
+        self.assertEqual([c["likes"] for c in comments], sorted((c["likes"] for c in comments), reverse=True))
+        self.assertEqual(len(self.db.get_comments("UCgroup", no_gender=True)), 8)
+        self.assertEqual(sum(len(chunk) for chunk in self.db.iter_comments("UCgroup", chunk_size=3)), 10)
+        self.assertEqual(len(self.db.get_comments("vid_g1")), 5)
+        self.assertEqual(self.db.get_user_demographics("UCgroup")[1], "M")
+
+    def test_get_comments_rejects_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.db.get_comments("vid_filters", columns=("id", "likes; DROP TABLE comment"))
+        with self.assertRaises(ValueError):
+            self.db.get_comments("vid_filters", row_format="xml")
+
+    def test_iter_comments_chunks(self):
+        ids = self._add_comments_for_filters()
+
+        chunks = list(self.db.iter_comments("vid_filters", chunk_size=2, columns=("id",)))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([c["id"] for chunk in chunks for c in chunk], ids)
+
+        filtered = list(
+            self.db.iter_comments("vid_filters", no_sentiment=True, row_format="tuple", columns=("likes",))
+        )
+        self.assertEqual(filtered, [[(20,), (10,), (0,)]])
+
+    def test_iter_comments_allows_writes_between_chunks(self):
+        ids = self._add_comments_for_filters()
+        now = datetime.now(timezone.utc)
+        seen = []
+        for chunk in self.db.iter_comments("vid_filters", chunk_size=2, columns=("id",)):
+            seen += [c["id"] for c in chunk]
+            self.db.update_comments_sentiment_bulk([(c["id"], 1.0, now) for c in chunk])
+
+        self.assertEqual(seen, ids)
+        self.assertEqual(self.db.get_comments("vid_filters", no_sentiment=True), [])
+
+    def test_iter_comments_writes_to_filtered_column_between_chunks(self):
+        now = datetime.now(timezone.utc)
+        self.db.save_comments_bulk(  # Tied likes straddle the chunk boundaries
+            MockComment("vid_ties", now, f"Author{i}", 5 if i < 4 else 1, f"Tied comment {i}") for i in range(7)
+        )
+        expected = [c["id"] for c in self.db.get_comments("vid_ties", columns=("id",))]
+        seen = []
+        for chunk in self.db.iter_comments("vid_ties", chunk_size=3, no_sentiment=True, columns=("id",)):
+            seen += [c["id"] for c in chunk]
+            self.db.update_comments_sentiment_bulk([(c["id"], 1.0, now) for c in chunk])
+        self.assertEqual(seen, expected)
+
+        paged = self.db.iter_comments("vid_ties", chunk_size=2, limit=3, offset=3, columns=("id",))
+        self.assertEqual([c["id"] for chunk in paged for c in chunk], expected[3:6])
+
+    def test_iter_comments_allows_temp_table_writes_between_chunks(self):
+        ids = self._add_comments_for_filters()
+        now = datetime.now(timezone.utc)
+        self.db.TEMP_TABLE_THRESHOLD = 0  # Every write goes through the temp table
+        for chunk in self.db.iter_comments("vid_filters", chunk_size=2, columns=("id",)):
+            self.db.update_comments_sentiment_bulk([(c["id"], 1.0, now) for c in chunk])
+            self.db.update_comments_gender_bulk([(c["id"], "F", now) for c in chunk])
+        self.assertEqual(self.db.get_comments("vid_filters", no_sentiment=True, no_gender=True), [])
+        self.assertEqual(len(ids), len(self.db.get_comments("vid_filters", not_null=("sentiment",))))
+
+    def test_save_comments_upserts_by_youtube_id(self):
+        published = datetime(2024, 1, 1, 12, 0, 0)
+        first = MockComment("vid_upsert", published, "Author", 1, "Original text")
+        first.youtube_id = "yt-1"
+        self.db.save_comments_bulk([first])
+        comment_id = self.db.get_comments("vid_upsert")[0]["id"]
+        self.db.update_comments_processed_text_bulk([(comment_id, "clean", "Author", published)])
+        self.db.update_comments_language_bulk([(comment_id, "en", published)])
+
+        liked = MockComment("vid_upsert", published, "Author", 9, "Original text")
+        liked.youtube_id = "yt-1"
+        self.db.save_comment(liked)
+        stored = self.db.get_comments("vid_upsert")
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(stored[0]["likes"], 9)
+        self.assertEqual(stored[0]["clean_text"], "clean")  # Unchanged text keeps derived fields
+        self.assertEqual(stored[0]["language"], "en")
+
+        edited = MockComment("vid_upsert", published, "Author", 9, "Edited text")
+        edited.youtube_id = "yt-1"
+        self.db.save_comments_bulk([edited])
+        stored = self.db.get_comments("vid_upsert")
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(stored[0]["text"], "Edited text")
+        self.assertIsNone(stored[0]["clean_text"])  # Edited text must be mined again
+        self.assertIsNone(stored[0]["language"])
+
+    def test_get_newest_comment(self):
+        self.assertIsNone(self.db.get_newest_comment("vid_newest"))
+        comments = []
+        for minute in (5, 30, 10):
+            comment = MockComment("vid_newest", datetime(2024, 1, 1, 0, minute), "A", 0, "text")
+            comment.youtube_id = f"yt-{minute}"
+            comments.append(comment)
+        self.db.save_comments_bulk(comments)
+        self.assertEqual(
+            self.db.get_newest_comment("vid_newest"), ("yt-30", datetime(2024, 1, 1, 0, 30))
+        )
+
+    def test_save_video_title_refreshes_existing(self):
+        self.db.save_video_title("video_again", "Old Title")
+        self.db.save_video_title("video_again", "New Title")
+        self.assertEqual(self.db.get_video_title("video_again"), "New Title")
+        self.assertEqual(len(self.db.get_all_videos()), 1)
+
     def test_save_and_get_analysis(self):
         analysis_data = {
             "name": "John",
@@ -210,6 +414,56 @@ class TestDBManager(unittest.TestCase):
             updated_time.replace(microsecond=0),
         )
 
+    def _add_comments_for_bulk_updates(self, count, video_id="vid_bulk_update"):
+        now = datetime.now(timezone.utc)
+        self.db.save_comments_bulk(
+            MockComment(video_id, now, f"Author{i}", i, f"Comment {i}")
+            for i in range(count)
+        )
+        return [c["id"] for c in self.db.get_comments(video_id)]
+
+    def _assert_bulk_updates_applied(self, ids, updated_time):
+        by_id = {c["id"]: c for c in self.db.get_comments("vid_bulk_update")}
+        for comment_id in ids:
+            comment = by_id[comment_id]
+            self.assertEqual(comment["clean_text"], f"clean {comment_id}")
+            self.assertEqual(comment["author_clean_name"], f"name {comment_id}")
+            self.assertEqual(comment["sentiment"], comment_id / 10)
+            self.assertEqual(comment["author_gender"], "F" if comment_id % 2 else "M")
+            self.assertEqual(comment["language"], "pt" if comment_id % 3 else "en")
+            self.assertEqual(comment["updated"], str(updated_time))
+
+    def _run_bulk_updates(self, ids, updated_time):
+        processed = self.db.update_comments_processed_text_bulk(
+            [(i, f"clean {i}", f"name {i}", updated_time) for i in ids]
+        )
+        sentiments = self.db.update_comments_sentiment_bulk(
+            [(i, i / 10, updated_time) for i in ids]
+        )
+        genders = self.db.update_comments_gender_bulk(
+            [(i, "F" if i % 2 else "M", updated_time) for i in ids]
+        )
+        languages = self.db.update_comments_language_bulk(
+            [(i, "pt" if i % 3 else "en", updated_time) for i in ids]
+        )
+        self.assertEqual((processed, sentiments, genders, languages), (len(ids),) * 4)
+
+    def test_bulk_updates_executemany(self):
+        ids = self._add_comments_for_bulk_updates(5)
+        updated_time = datetime(2024, 5, 1, 12, 0, 0)
+        self._run_bulk_updates(ids, updated_time)
+        self._assert_bulk_updates_applied(ids, updated_time)
+
+    def test_bulk_updates_temp_table(self):
+        ids = self._add_comments_for_bulk_updates(12)
+        updated_time = datetime(2024, 5, 2, 12, 0, 0)
+        self.db.TEMP_TABLE_THRESHOLD = 10  # Force the temp-table join path
+        self._run_bulk_updates(ids, updated_time)
+        self._assert_bulk_updates_applied(ids, updated_time)
+
+    def test_bulk_updates_empty(self):
+        self.assertEqual(self.db.update_comments_sentiment_bulk([]), 0)
+
     def test_save_and_get_keywords(self):
         video_id_keywords = "vid_keywords_test"
         self.db.save_comment_keyword(video_id_keywords, "keyword1", 0.8)
@@ -233,6 +487,266 @@ class TestDBManager(unittest.TestCase):
         # So, "keyword3" (0.7) should be first, "keyword1" (0.8) second, "keyword2" (0.9) third.
         self.assertEqual(keywords, ["keyword3", "keyword1", "keyword2"])
 
+    def test_jobs_one_active_per_video(self):
+        first, created = self.db.create_job("vid_job", "English")
+        self.assertTrue(created)
+        self.assertEqual(self.db.create_job("vid_job", "English", refresh=True), (first, False))
+        second, _ = self.db.create_job("vid_job_2", "English")
+
+        claimed = self.db.claim_next_job()
+        self.assertEqual((claimed["id"], claimed["status"], claimed["language"]), (first, "running", "English"))
+        self.assertIsNotNone(claimed["started"])
+        self.assertEqual(self.db.create_job("vid_job", "English"), (first, False))  # Running counts too
+
+        self.db.finish_job(first, "done", result="{}")
+        self.assertEqual(self.db.get_job(first)["status"], "done")
+        third, created = self.db.create_job("vid_job", "English")
+        self.assertTrue(created)
+        self.assertNotEqual(third, first)
+
+        self.assertEqual(self.db.claim_next_job()["id"], second)  # Oldest first
+        self.assertEqual(self.db.requeue_running_jobs(), 1)
+        self.assertEqual(self.db.get_job(second)["status"], "queued")
+        self.assertIsNone(self.db.get_job(9999))
+
+    def test_claim_job_without_returning(self):
+        first, _ = self.db.create_job("vid_job", "English")
+        second, _ = self.db.create_job("vid_job2", "English")
+        with patch("src.db_manager.SQLITE_HAS_RETURNING", False):
+            claimed = self.db.claim_next_job()
+            self.assertEqual((claimed["id"], claimed["status"]), (first, "running"))
+            self.assertEqual(self.db.claim_next_job()["id"], second)
+            self.assertIsNone(self.db.claim_next_job())
+
+    def test_stage_states(self):
+        self.assertEqual(self.db.get_stage_states("vid_stages"), {})
+        self.db.set_stage_state("vid_stages", "gathering", "running")
+        self.db.set_stage_state("vid_stages", "gathering", "done")
+        self.db.set_stage_state("vid_stages", "mining", "failed", "boom")
+        self.db.set_stage_state("other_vid", "mining", "done")
+        self.assertEqual(
+            self.db.get_stage_states("vid_stages"), {"gathering": "done", "mining": "failed"}
+        )
+
+        started, finished = self.db._execute_query(
+            "SELECT started, finished FROM pipeline_stage WHERE video_id = ? AND stage = ?",
+            ("vid_stages", "gathering"),
+            fetch_one=True,
+        )
+        self.assertIsNotNone(started)  # Kept from the "running" update
+        self.assertGreaterEqual(finished, started)
+
+        self.db.set_stage_state("vid_stages", "gathering", "pending")
+        row = self.db._execute_query(
+            "SELECT status, started, finished FROM pipeline_stage WHERE video_id = ? AND stage = ?",
+            ("vid_stages", "gathering"),
+            fetch_one=True,
+        )
+        self.assertEqual(row, ("pending", None, None))
+
+
+class TestDBManagerPooled(unittest.TestCase):
+
+    def setUp(self):
+        """Use a fresh on-disk database so the connection pool is exercised."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "pooled.db")
+        self.db = DBManager(db_name=self.db_path)
+
+    def tearDown(self):
+        close_all_pools()
+        self.tmpdir.cleanup()
+
+    def test_reuses_connection_within_thread(self):
+        self.db.save_video_title("vid_pool", "Pooled Video")
+        first = self.db.pool.get()
+        self.assertTrue(self.db.video_exists("vid_pool"))
+        self.assertIs(self.db.pool.get(), first)
+
+    def test_instances_share_pool_and_data(self):
+        self.db.save_video_title("vid_shared", "Shared Video")
+        other = DBManager(db_name=self.db_path)
+        self.assertIs(other.pool, self.db.pool)
+        self.assertEqual(other.get_video_title("vid_shared"), "Shared Video")
+
+    def test_one_connection_per_thread(self):
+        main_con = self.db.pool.get()
+        seen = []
+
+        def worker():
+            seen.append(self.db.pool.get())
+            self.db.save_video_title("vid_thread", "From Thread")
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(len(seen), 1)
+        self.assertIsNot(seen[0], main_con)
+        self.assertTrue(self.db.video_exists("vid_thread"))
+
+    def test_connection_closed_when_its_thread_exits(self):
+        self.db.video_exists("anything")
+        seen = []
+
+        def worker():
+            seen.append(self.db.pool.get())
+            self.db.video_exists("anything")
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(self.db.pool.size(), 1)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            seen[0].execute("SELECT 1")
+
+    def test_pool_size_stable_across_pipeline_runs(self):
+        stages = [
+            Stage("gather", lambda video_id: self.db.save_video_title(video_id, "T")),
+            Stage("mine", lambda video_id: self.db.get_video_title(video_id), after=("gather",)),
+            Stage("analyse", lambda video_id: self.db.video_exists(video_id), after=("mine",)),
+            Stage("llm", lambda video_id: self.db.video_exists(video_id), after=("mine",)),
+        ]
+        pipeline = Pipeline(stages, self.db, max_workers=4)
+        pipeline.run("vid_0")
+        size = self.db.pool.size()
+        for i in range(1, 30):
+            pipeline.run(f"vid_{i}")
+        self.assertEqual(self.db.pool.size(), size)
+
+    def test_wal_journal_mode(self):
+        self.db.video_exists("anything")  # Opens the connection
+        mode = self.db.pool.get().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_failed_write_is_rolled_back(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db._managed_cursor(commit_on_exit=True) as cur:
+                cur.execute(
+                    "INSERT INTO video (video_id, title) VALUES (?, ?)", ("dup", "A")
+                )
+                cur.execute(
+                    "INSERT INTO video (video_id, title) VALUES (?, ?)", ("dup", "B")
+                )
+        self.assertFalse(self.db.pool.get().in_transaction)
+        self.assertFalse(self.db.video_exists("dup"))
+
+    def test_unpooled_mode_still_works(self):
+        db = DBManager(db_name=self.db_path, pooled=False)
+        self.assertIsNone(db.pool)
+        db.save_video_title("vid_unpooled", "Unpooled")
+        self.assertEqual(self.db.get_video_title("vid_unpooled"), "Unpooled")
+
+
+class TestSchemaMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def _query_plans(self, call):
+        """Run ``call`` and return the EXPLAIN QUERY PLAN details of each SELECT it issued
+        on the comment tables (not the video_group lookup that precedes comment reads)."""
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            self.db.conn.set_trace_callback(None)
+        plans = []
+        for sql in statements:
+            if sql.lstrip().upper().startswith("SELECT") and "FROM comment" in sql:
+                rows = self.db.conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+                plans.append(" | ".join(row[3] for row in rows))
+        self.assertTrue(plans, "No SELECT statement was captured")
+        return plans
+
+    def test_user_version_is_latest(self):
+        version = self.db.conn.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, len(MIGRATIONS))
+
+    def test_get_comments_uses_video_likes_index(self):
+        for plan in self._query_plans(lambda: self.db.get_comments("vid")):
+            self.assertIn("idx_comment_video_likes", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_get_user_demographics_uses_covering_index(self):
+        for plan in self._query_plans(lambda: self.db.get_user_demographics("vid")):
+            self.assertIn("COVERING INDEX idx_comment_video_gender", plan)
+
+    def test_get_keywords_uses_video_score_index(self):
+        for plan in self._query_plans(lambda: self.db.get_keywords("vid")):
+            self.assertIn("idx_comment_keywords_video_score", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_upgrades_unversioned_database(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "legacy.db")
+            con = sqlite3.connect(db_path)
+            con.executescript(MIGRATIONS[0])
+            con.execute("PRAGMA user_version = 0")
+            con.execute(
+                "INSERT INTO video (video_id, title) VALUES ('legacy', 'Old Video')"
+            )
+            con.commit()
+            con.close()
+
+            db = DBManager(db_name=db_path, pooled=False)
+            self.assertEqual(db.get_video_title("legacy"), "Old Video")
+
+            con = sqlite3.connect(db_path)
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            indexes = {
+                row[0]
+                for row in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            }
+            con.close()
+            self.assertEqual(version, len(MIGRATIONS))
+            self.assertIn("idx_comment_video_likes", indexes)
+
+    def test_migration_keeps_legacy_comments(self):
+        insert = (
+            "INSERT INTO comment (video_id, published, author_display_name, likes, text, youtube_id) "
+            "VALUES ('legacy', ?, 'Ana', 1, ?, ?)"
+        )
+        rows = [
+            ("2024-01-01", "same words", None),
+            ("2024-01-01", "same words", None),  # Twins or one comment gathered twice; no way to tell
+            ("2024-01-02", "now keyed", None),
+            ("2024-01-02", "now keyed", "yt1"),
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "v9.db")
+            con = sqlite3.connect(db_path)
+            for script in MIGRATIONS[:9]:
+                con.executescript(script)
+            con.execute("PRAGMA user_version = 9")
+            con.executemany(insert, rows)
+            con.commit()
+            con.close()
+
+            db = DBManager(db_name=db_path, pooled=False)
+            stored = db._execute_query(
+                "SELECT text, youtube_id FROM comment ORDER BY id", fetch_all=True
+            )
+            self.assertEqual(stored, [(text, youtube_id) for _, text, youtube_id in rows])  # Left to regathering
+            self.assertFalse(db.full_gather_finished("legacy"))
+
+    def test_full_gather_drops_legacy_twins(self):
+        insert = (
+            "INSERT INTO comment (video_id, published, author_display_name, likes, text, youtube_id) "
+            "VALUES ('vid', '2024-01-01', 'Ana', 1, ?, ?)"
+        )
+        self.db._execute_many(insert, [("old", None), ("twin", None)])
+        self.db._execute_query(insert, ("twin", "yt1"), commit=True)  # The regathered copy
+        self.assertEqual(self.db.finish_full_gather("vid"), 1)
+        self.assertTrue(self.db.full_gather_finished("vid"))
+        self.assertEqual(sorted(c["text"] for c in self.db.get_comments("vid")), ["old", "twin"])
+        self.db.clear_full_gather("vid")
+        self.assertFalse(self.db.full_gather_finished("vid"))
+
 
 if __name__ == "__main__":
     unittest.main()
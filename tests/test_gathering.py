@@ -0,0 +1,173 @@
+import unittest
+from unittest.mock import patch
+
+from src.db_manager import DBManager
+from src.comment_fetcher import QuotaTracker
+from src.gathering import Gathering, source_kind
+from tests.fakes import FakeYouTube
+
+
+class TestGathering(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.patcher_db = patch("src.gathering.DBManager", return_value=self.db)
+        self.patcher_db.start()
+        self.youtube = FakeYouTube({"vid1": 120, "vid2": 5, "vid_silent": 0})
+        self.gathering = Gathering(client_factory=lambda: self.youtube)
+
+    def tearDown(self):
+        self.patcher_db.stop()
+        self.db.close()
+
+    def test_execute_saves_title_and_comments(self):
+        self.gathering.execute("vid1")
+
+        self.assertEqual(self.db.get_video_title("vid1"), "Title of vid1")
+        self.assertEqual(len(self.db.get_comments("vid1")), 120)
+        self.assertEqual(self.gathering.quota.calls, {"videos.list": 1, "commentThreads.list": 2})
+
+    def test_execute_without_comments(self):
+        self.gathering.execute("vid_silent")
+        self.assertTrue(self.db.video_exists("vid_silent"))
+        self.assertEqual(self.db.get_comments("vid_silent"), [])
+
+    def test_execute_unknown_video(self):
+        with self.assertRaises(ValueError):
+            self.gathering.execute("missing")
+        with self.assertRaises(ValueError):
+            self.gathering.execute("")
+
+    def test_execute_many(self):
+        results = self.gathering.execute_many(["vid1", "vid2", "missing"], max_workers=2)
+
+        self.assertEqual(results["vid1"], 120)
+        self.assertEqual(results["vid2"], 5)
+        self.assertIsInstance(results["missing"], ValueError)
+        self.assertEqual(len(self.db.get_comments("vid2")), 5)
+
+    def test_regathering_fetches_only_new_comments(self):
+        self.gathering.execute("vid1")
+        self.youtube.videos_data["vid1"] += 30  # 30 newer comments arrive
+        self.youtube.calls.clear()
+
+        self.gathering.execute("vid1")
+
+        self.assertEqual(len(self.db.get_comments("vid1")), 150)
+        page_calls = [c for c in self.youtube.calls if c[0] == "commentThreads.list"]
+        self.assertEqual(len(page_calls), 1)
+        self.assertEqual(page_calls[0][1]["order"], "time")
+
+    def test_regathering_without_new_comments_adds_nothing(self):
+        self.gathering.execute("vid2")
+        self.gathering.execute("vid2")
+        self.assertEqual(len(self.db.get_comments("vid2")), 5)
+
+    def test_full_regather_does_not_duplicate(self):
+        self.gathering.execute("vid1")
+        self.gathering.execute("vid1", incremental=False)
+        self.assertEqual(len(self.db.get_comments("vid1")), 120)
+
+
+CHANNEL = "UC" + "x" * 22
+PLAYLIST = "PL" + "y" * 16
+
+
+class TestGatheringGroups(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.patcher_db = patch("src.gathering.DBManager", return_value=self.db)
+        self.patcher_db.start()
+        uploads = [f"up{i:03d}" for i in range(120)]
+        self.youtube = FakeYouTube(
+            {video_id: 3 for video_id in uploads} | {"pl1": 150, "pl2": 10, "gone": 0},
+            channels={CHANNEL: uploads + ["gone"]},
+            playlists={PLAYLIST: ["pl1", "pl2"]},
+            private={"gone"},
+            titles={CHANNEL: "My Channel", PLAYLIST: "Best of", "pl1": "First"},
+        )
+        self.gathering = Gathering(client_factory=lambda: self.youtube, requests_per_second=1000)
+
+    def tearDown(self):
+        self.patcher_db.stop()
+        self.db.close()
+
+    def test_source_kind(self):
+        self.assertEqual(source_kind(CHANNEL), "channel")
+        self.assertEqual(source_kind(PLAYLIST), "playlist")
+        self.assertEqual(source_kind("UU" + "z" * 22), "playlist")  # A channel's uploads
+        self.assertEqual(source_kind("dQw4w9WgXcQ"), "video")
+        self.assertEqual(source_kind("PLaylistXyz"), "video")  # 11 characters
+
+    def test_channel_is_gathered_as_one_group(self):
+        self.gathering.execute(CHANNEL)
+
+        self.assertEqual(len(self.db.get_group_videos(CHANNEL)), 120)  # Not the private one
+        self.assertNotIn("gone", self.db.get_group_videos(CHANNEL))
+        self.assertEqual(self.db.get_video_title(CHANNEL), "My Channel")
+        self.assertEqual(self.db.get_video_title("up007"), "Title of up007")
+        self.assertEqual(len(self.db.get_comments("up007")), 3)
+        self.assertEqual(len(self.db.get_comments(CHANNEL)), 360)
+        # Titles come with the listing: 1 channel lookup, 3 pages of 50, then the comments
+        self.assertEqual(
+            self.gathering.quota.calls,
+            {"channels.list": 1, "playlistItems.list": 3, "commentThreads.list": 120},
+        )
+
+    def test_playlist_and_max_videos(self):
+        results = self.gathering.execute_playlist(PLAYLIST, max_videos=1)
+        self.assertEqual(results, {"pl1": 150})
+        self.assertEqual(self.db.get_group_videos(PLAYLIST), ["pl1"])
+        self.assertEqual(self.db.get_video_title(PLAYLIST), "Best of")
+
+    def test_regathering_a_group_is_incremental(self):
+        self.gathering.execute_playlist(PLAYLIST)
+        self.youtube.videos_data["pl1"] += 5
+        self.youtube.calls.clear()
+
+        results = self.gathering.execute_playlist(PLAYLIST)
+        self.assertEqual(results["pl1"], 6)  # The 5 new ones and the newest stored one, upserted
+        orders = {c[1]["order"] for c in self.youtube.calls if c[0] == "commentThreads.list"}
+        self.assertEqual(orders, {"time"})
+        self.assertEqual(len(self.db.get_comments(PLAYLIST)), 165)
+
+    def test_capped_videos_are_completed_by_the_next_gather(self):
+        self.gathering.quota = self.gathering.fetcher.quota = QuotaTracker(budget=4)
+        self.assertEqual(self.gathering.execute_playlist(PLAYLIST), {"pl1": 100, "pl2": 10})  # 1 page each
+        self.youtube.videos_data["pl1"] += 5
+        self.youtube.calls.clear()
+
+        self.gathering.quota = self.gathering.fetcher.quota = QuotaTracker()
+        results = self.gathering.execute_playlist(PLAYLIST)
+        self.assertEqual(results["pl1"], 155)  # Every page again, not just the 5 new comments
+        self.assertEqual(len(self.db.get_comments("pl1")), 155)
+        orders = {c[1].get("order") for c in self.youtube.calls if c[0] == "commentThreads.list"}
+        self.assertEqual(orders, {None, "time"})  # pl1 in full, pl2 incremental
+
+    def test_quota_budget_is_shared_out_between_videos(self):
+        # 2 units to list the playlist leave 4 pages: 2 per video
+        self.gathering.quota = self.gathering.fetcher.quota = QuotaTracker(budget=6)
+        results = self.gathering.execute_playlist(PLAYLIST)
+        self.assertEqual(results, {"pl1": 150, "pl2": 10})  # 150 comments take 2 pages
+        self.assertEqual(self.gathering.quota.spent, 5)
+
+        self.gathering.quota = self.gathering.fetcher.quota = QuotaTracker(budget=5)
+        self.gathering.execute_playlist(PLAYLIST)  # Incremental now: 1 page each fits
+        self.assertLessEqual(self.gathering.quota.spent, 5)
+
+    def test_unknown_channel_or_playlist(self):
+        with self.assertRaises(ValueError):
+            self.gathering.execute("UC" + "q" * 22)
+        with self.assertRaises(ValueError):
+            self.gathering.execute_playlist("PL" + "q" * 16)
+
+    def test_group_with_no_gatherable_video_fails(self):
+        self.youtube.playlists_data[PLAYLIST] = ["missing1", "missing2"]
+        with patch.object(self.youtube, "_comment_threads_list", side_effect=RuntimeError("disabled")):
+            with self.assertRaisesRegex(ValueError, "No video"):
+                self.gathering.execute_playlist(PLAYLIST)
+
+
+if __name__ == "__main__":
+    unittest.main()
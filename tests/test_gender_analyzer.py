@@ -0,0 +1,178 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from src.analysis import Analysis
+from src.db_manager import DBManager
+from src.gender_analyzer import GenderAnalyzer
+from src.model_registry import models
+from src.name_gender_table import NameGenderTable, normalize_first_name
+from tests.fakes import FakeNamsorServer
+
+
+class TestNameGenderTable(unittest.TestCase):
+
+    def test_normalize_first_name(self):
+        cases = {
+            "John Smith": "john",
+            "@JoãoSilva_99": "joao",
+            "maria_eduarda": "maria",
+            "DANIEL": "daniel",
+            "xXGamerXx": "gamer",
+            "Сергей Иванов": "сергеи",
+            "12345": "",
+            "": "",
+        }
+        for name, expected in cases.items():
+            self.assertEqual(normalize_first_name(name), expected, name)
+
+    def test_build_and_get(self):
+        probabilities = {f"name{i}": i / 1000 for i in range(1000)}
+        table = NameGenderTable.build(probabilities)
+        self.assertEqual(len(table), 1000)
+        for name, probability in probabilities.items():
+            self.assertAlmostEqual(table.get(name), probability, places=6)
+        self.assertIsNone(table.get("absent"))
+        self.assertNotIn("absent", table)
+
+    def test_bundled_table_is_memory_mapped_and_rebuilt_when_stale(self):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as cache, \
+                patch("src.name_gender_table.CACHE_DIR", cache):
+            csv_path = os.path.join(tmp, "names.csv")
+            with open(csv_path, "w") as f:
+                f.write("name,male_probability\nJoão,0.99\nAna,0.01\n")
+
+            table = NameGenderTable.bundled(csv_path)
+            self.assertEqual(os.listdir(tmp), ["names.csv"])  # The data directory is left alone
+            self.assertEqual(os.listdir(cache), [os.path.basename(NameGenderTable.cache_path(csv_path))])
+            self.assertAlmostEqual(table.get("joao"), 0.99, places=6)
+            self.assertIsNotNone(NameGenderTable.bundled(csv_path)._records.filename)
+
+            time.sleep(0.01)
+            with open(csv_path, "a") as f:
+                f.write("Kim,0.2\n")
+            os.utime(csv_path)
+            self.assertAlmostEqual(NameGenderTable.bundled(csv_path).get("kim"), 0.2, places=6)
+
+    def test_analyzers_share_one_bundled_table(self):
+        models.clear()
+        self.addCleanup(models.clear)
+        db = DBManager(db_name=":memory:")
+        self.addCleanup(db.close)
+        first = GenderAnalyzer(db, api_key=None)
+        self.assertIs(GenderAnalyzer(db, api_key=None).table, first.table)
+        self.assertEqual(models.stats()["load_bundled_table()"]["hits"], 1)
+
+    def test_shipped_names(self):
+        table = NameGenderTable.bundled()
+        self.assertGreater(len(table), 500)
+        self.assertGreater(table.get("john"), 0.9)
+        self.assertLess(table.get("maria"), 0.1)
+
+
+class TestGenderAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.table = NameGenderTable.build({"john": 0.99, "ana": 0.01, "alex": 0.55})
+        self.server = FakeNamsorServer(scales={"zorblax": -0.9, "quilla": 0.8, "rin": 0.1}).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.db.close()
+
+    def analyzer(self, **kwargs):
+        params = dict(table=self.table, api_key="test_namsor_key", base_url=self.server.base_url)
+        params.update(kwargs)
+        return GenderAnalyzer(self.db, **params)
+
+    def test_get_names_genders(self):
+        names = [
+            {"id": "1", "name": "John Smith"},
+            {"id": "2", "name": "anaclara"},
+            {"id": "3", "name": "Ana Clara"},
+            {"id": "4", "name": "Alex"},
+            {"id": "5", "name": "Zorblax99"},
+            {"id": "6", "name": "quilla_x"},
+            {"id": "7", "name": "Rin"},
+            {"id": "8", "name": "1234"},
+        ]
+        result = self.analyzer().get_names_genders(names)
+        self.assertEqual(
+            result,
+            [
+                {"id": "1", "gender": "male"},
+                {"id": "2", "gender": None},
+                {"id": "3", "gender": "female"},
+                {"id": "4", "gender": None},  # Too ambiguous
+                {"id": "5", "gender": "male"},
+                {"id": "6", "gender": "female"},
+                {"id": "7", "gender": None},
+                {"id": "8", "gender": None},
+            ],
+        )
+        # Only names missing from the table went out, once each
+        self.assertEqual(
+            sorted(p["firstName"] for request in self.server.requests for p in request),
+            ["anaclara", "quilla", "rin", "zorblax"],
+        )
+
+    def test_remote_answers_are_cached_across_instances(self):
+        names = [{"id": str(i), "name": f"Zorblax {i}"} for i in range(3)]
+        self.analyzer().get_names_genders(names)
+        self.assertEqual(len(self.server.requests), 1)
+
+        second = self.analyzer()
+        self.assertEqual(second.get_names_genders(names)[0]["gender"], "male")
+        self.assertEqual(second.remote_lookups, 0)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertAlmostEqual(self.db.get_name_genders(["zorblax"])["zorblax"], 0.95)
+
+    def test_names_are_sent_in_batches(self):
+        names = [{"id": str(i), "name": f"unknown{chr(97 + i % 26)}{chr(97 + i // 26)}"} for i in range(250)]
+        analyzer = self.analyzer(batch_size=100)
+        analyzer.get_names_genders(names)
+        self.assertEqual([len(request) for request in self.server.requests], [100, 100, 50])
+        self.assertEqual(analyzer.remote_lookups, 250)
+
+    def test_failed_batches_are_not_cached(self):
+        self.server.failures = 1
+        names = [{"id": "1", "name": "Zorblax"}]
+        self.assertEqual(self.analyzer().get_names_genders(names), [{"id": "1", "gender": None}])
+        self.assertEqual(self.db.get_name_genders(["zorblax"]), {})
+        self.assertEqual(self.analyzer().get_names_genders(names), [{"id": "1", "gender": "male"}])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_no_api_key_stays_local(self):
+        result = self.analyzer(api_key=None).get_names_genders([{"id": "1", "name": "Zorblax"}])
+        self.assertEqual(result, [{"id": "1", "gender": None}])
+        self.assertEqual(self.server.requests, [])
+
+
+class TestSetGenders(unittest.TestCase):
+
+    def test_set_genders_updates_known_names(self):
+        db = DBManager(db_name=":memory:")
+        rows = [(f"c{i}", "vid", name) for i, name in enumerate(["John", "Ana Maria", "Zzyzx"])]
+        db._execute_many(
+            "INSERT INTO comment (youtube_id, video_id, author_clean_name, published, "
+            "author_display_name, likes, text) VALUES (?, ?, ?, '2024-01-01', '', 0, '')",
+            rows,
+        )
+        table = NameGenderTable.build({"john": 0.99, "ana": 0.01})
+        with patch("src.analysis.DBManager", return_value=db), patch(
+            "src.analysis.GenderAnalyzer", lambda db: GenderAnalyzer(db, table=table, api_key=None)
+        ):
+            Analysis()._set_genders("vid")
+
+        genders = db._execute_query(
+            "SELECT author_clean_name, author_gender FROM comment ORDER BY id", fetch_all=True
+        )
+        self.assertEqual(genders, [("John", "M"), ("Ana Maria", "F"), ("Zzyzx", None)])
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
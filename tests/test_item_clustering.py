@@ -0,0 +1,82 @@
+import random
+import time
+import unittest
+
+from src.item_clustering import ItemClusterer
+
+
+class TestItemClusterer(unittest.TestCase):
+
+    def setUp(self):
+        self.clusterer = ItemClusterer()
+
+    def test_near_duplicates_collapse(self):
+        items = [
+            "Video is too long",
+            "The video is too long.",
+            "Video is too short",
+            "video is too long",
+            "Bad audio quality",
+            "Audio quality is bad",
+        ]
+        self.assertEqual(
+            self.clusterer.cluster(items),
+            [("Video is too long", 3), ("Bad audio quality", 2), ("Video is too short", 1)],
+        )
+
+    def test_negated_items_stay_apart(self):
+        items = [
+            "Video is too long",
+            "Video is not too long",
+            "Video isn't too long",
+            "video is too long!",
+        ]
+        self.assertEqual(
+            self.clusterer.cluster(items), [("Video is too long", 2), ("Video is not too long", 2)]
+        )
+        self.assertEqual(
+            self.clusterer.cluster(["O vídeo é muito longo", "O vídeo não é muito longo"], "Portuguese"),
+            [("O vídeo é muito longo", 1), ("O vídeo não é muito longo", 1)],
+        )
+        self.assertEqual(
+            self.clusterer.cluster(["Das Video ist zu lang", "Das Video ist nicht zu lang"], "German"),
+            [("Das Video ist zu lang", 1), ("Das Video ist nicht zu lang", 1)],
+        )
+
+    def test_negation_words_are_per_language(self):
+        items = ["Problemas de áudio no vídeo", "Problemas de áudio do vídeo"]
+        # Portuguese "no" is "in the", not a negation
+        self.assertEqual(self.clusterer.cluster(items, "Portuguese"), [("Problemas de áudio no vídeo", 2)])
+        self.assertEqual(len(self.clusterer.cluster(items, "Spanish")), 2)
+
+    def test_most_frequent_spelling_represents_cluster(self):
+        items = ["more tutorials!", "More tutorials", "More tutorials", "more tutorials!!"]
+        self.assertEqual(self.clusterer.cluster(items), [("More tutorials", 4)])
+
+    def test_distinct_items_keep_first_appearance_order(self):
+        self.assertEqual(self.clusterer.dedupe(["i2", "i1", "i3", "i1"]), ["i1", "i2", "i3"])
+
+    def test_empty_and_symbol_items(self):
+        self.assertEqual(self.clusterer.cluster([]), [])
+        self.assertEqual(self.clusterer.cluster(["", "  "]), [])
+        self.assertEqual(self.clusterer.dedupe(["!!!", "!!!", "???"]), ["!!!", "???"])
+
+    def test_blocked_similarity_matches_single_block(self):
+        rng = random.Random(3)
+        words = "video audio light camera long short tutorial price edit focus".split()
+        items = [" ".join(rng.sample(words, 3)) for _ in range(300)]
+        self.assertEqual(
+            ItemClusterer(block_size=7).cluster(items), ItemClusterer(block_size=1024).cluster(items)
+        )
+
+    def test_thousands_of_items_under_a_second(self):
+        rng = random.Random(5)
+        words = [f"word{i}" for i in range(400)]
+        items = [" ".join(rng.sample(words, 4)) + rng.choice(["", ".", "!"]) for _ in range(3000)]
+        start = time.perf_counter()
+        self.clusterer.cluster(items)
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from src.db_manager import DBManager
+from src.jobs import JobQueue
+from src.pipeline import Pipeline, Stage
+from src.services import PersonaData, PersonaGenerator
+
+
+def persona(video_id, title=None, status=None):
+    return PersonaData(
+        title=title or f"Generated Persona for Video: {video_id}",
+        name="Alex",
+        gender="Male",
+        age="25-34",
+        language="English",
+        issues=["audio"],
+        wishes=[],
+        pains=[],
+        expressions=[],
+        status=status or f"Persona generated for video: {video_id}",
+    )
+
+
+class FakeGenerator:
+    """Records calls; holds each one until ``release`` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.running = 0
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+
+    def generate_persona(self, video_id, language="English", refresh=False):
+        with self.lock:
+            self.calls.append((video_id, language, refresh))
+            self.running += 1
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        if video_id == "bad":
+            return persona(video_id, "Error", "Invalid video ID: bad")
+        if video_id == "bug":
+            raise KeyError("title")
+        return persona(video_id)
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.generator = FakeGenerator()
+        self.jobs = JobQueue(self.generator, self.db, workers=2, poll_interval=0.01)
+
+    def tearDown(self):
+        self.generator.release.set()
+        self.jobs.stop(timeout=5)
+        self.db.close()
+
+    def test_job_runs_in_the_background(self):
+        self.jobs.start()
+        job_id = self.jobs.submit(" vid1 ", "Portuguese")
+        self.assertIn(self.jobs.status(job_id)["status"], ("queued", "running"))
+
+        self.generator.release.set()
+        job = self.jobs.wait(job_id, timeout=5)
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["persona"], persona("vid1"))
+        self.assertEqual(self.generator.calls, [("vid1", "Portuguese", False)])
+
+    def test_requests_for_the_same_video_share_one_job(self):
+        self.jobs.start()
+        job_ids = {self.jobs.submit("vid1") for _ in range(5)}
+        other = self.jobs.submit("vid2")
+        self.assertEqual(len(job_ids), 1)
+        self.assertNotIn(other, job_ids)
+
+        deadline = time.monotonic() + 5
+        while self.generator.running < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.generator.running, 2)  # Both workers busy at once
+        self.generator.release.set()
+        self.jobs.wait(job_ids.pop(), timeout=5)
+        self.jobs.wait(other, timeout=5)
+        self.assertEqual(sorted(call[0] for call in self.generator.calls), ["vid1", "vid2"])
+
+        self.assertNotEqual(self.jobs.submit("vid1"), other)  # Finished jobs are not reused
+
+    def test_failures(self):
+        self.jobs.start()
+        self.generator.release.set()
+        bad = self.jobs.wait(self.jobs.submit("bad"), timeout=5)
+        self.assertEqual((bad["status"], bad["error"]), ("failed", "Invalid video ID: bad"))
+        self.assertEqual(bad["persona"].title, "Error")
+
+        bug = self.jobs.wait(self.jobs.submit("bug"), timeout=5)
+        self.assertEqual((bug["status"], bug["error"], bug["persona"]), ("failed", "KeyError: 'title'", None))
+
+        with self.assertRaises(ValueError):
+            self.jobs.submit("  ")
+
+    def test_status_reports_pipeline_stages(self):
+        job_id = self.jobs.submit("vid1")  # Not started: stays queued
+        self.db.set_stage_state("vid1", "mining", "running")
+        self.db.set_stage_state("vid1", "gathering", "done")
+        job = self.jobs.status(job_id)
+        self.assertEqual(job["status"], "queued")
+        self.assertEqual(list(job["stages"].items()), [("gathering", "done"), ("mining", "running")])
+        self.assertIsNone(self.jobs.status(job_id + 1))
+
+    def test_interrupted_jobs_are_requeued_on_start(self):
+        job_id = self.jobs.submit("vid1")
+        self.assertEqual(self.db.claim_next_job()["id"], job_id)  # A worker that then died
+        self.assertIsNone(self.db.claim_next_job())
+
+        self.generator.release.set()
+        self.jobs.start()
+        self.assertEqual(self.jobs.wait(job_id, timeout=5)["status"], "done")
+
+    def test_interrupted_job_resumes_its_pipeline(self):
+        calls = []
+
+        def stage(name, after=(), func=None):
+            def run(video_id):
+                calls.append(name)
+                if func:
+                    func(video_id)
+            return Stage(name, run, after)
+
+        stages = [
+            stage("gathering", func=lambda v: self.db.save_video_title(v, "Title")),
+            stage("mining", ("gathering",)),
+            stage("llm_analysis", ("mining",), lambda v: self.db.save_analysis(v, {"issues": ["audio"]})),
+        ]
+        # A process stopped during mining: gathering finished and stored the video
+        job_id = self.jobs.submit("vid1")
+        self.db.claim_next_job()
+        self.db.save_video_title("vid1", "Title")
+        self.db.set_stage_state("vid1", "gathering", "done")
+        self.db.set_stage_state("vid1", "mining", "running")
+
+        with patch("src.services.DBManager", return_value=self.db), \
+                patch("src.services.STAGES", stages), \
+                patch("src.services.run_full_pipeline", lambda v: Pipeline(stages, self.db).run(v)):
+            jobs = JobQueue(PersonaGenerator(), self.db, workers=1, poll_interval=0.01)
+            jobs.start()
+            try:
+                job = jobs.wait(job_id, timeout=5)
+            finally:
+                jobs.stop(timeout=5)
+
+        self.assertEqual(calls, ["mining", "llm_analysis"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["persona"].issues, ["audio"])
+
+    def test_same_video_in_another_language_joins_the_active_job(self):
+        english = self.jobs.submit("vid1", "English")
+        self.assertEqual(self.jobs.submit("vid1", "Spanish"), english)
+        self.assertEqual(self.jobs.status(english)["language"], "English")
+
+    def test_submitting_stays_fast_while_workers_are_busy(self):
+        self.jobs.start()
+        self.jobs.submit("slow1")
+        self.jobs.submit("slow2")
+        start = time.perf_counter()
+        job_ids = [self.jobs.submit(f"vid{i % 10}") for i in range(100)]
+        statuses = [self.jobs.status(job_id)["status"] for job_id in job_ids]
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(len(set(job_ids)), 10)
+        self.assertEqual(set(statuses), {"queued"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+from unittest.mock import patch
+
+from src.analysis import Analysis, KeywordTask
+from src.db_manager import DBManager
+from src.language_detector import UNDETERMINED, LanguageDetector, load_langdetect
+from src.model_registry import models
+from src.sentiment_analyzer import LexiconBackend, SentimentAnalyser
+
+
+class TestLanguageDetector(unittest.TestCase):
+
+    def test_prefilter_settles_common_comments(self):
+        detector = LanguageDetector()
+        texts = {
+            "this video is really great, thanks for the help": "en",
+            "que vídeo incrível, muito obrigado": "pt",
+            "me encanta este canal, muchas gracias": "es",
+            "c'est vraiment génial, merci pour la vidéo": "fr",
+            "das ist wirklich toll, danke für das Video": "de",
+            "Muito bom": "pt",
+        }
+        self.assertEqual(detector.detect_many(list(texts)), list(texts.values()))
+        self.assertEqual(detector.prefiltered, len(texts))
+        self.assertEqual(detector.langdetect_calls, 0)
+
+    def test_langdetect_fallback(self):
+        detector = LanguageDetector()
+        self.assertEqual(detector.detect("Очень хорошее видео, спасибо большое"), "ru")
+        self.assertEqual(detector.detect("questo video è bellissimo, grazie mille"), "it")
+        self.assertEqual(detector.langdetect_calls, 2)
+
+    def test_profiles_are_loaded_once_per_process(self):
+        first, second = LanguageDetector(), LanguageDetector()
+        first.detect("questo video è bellissimo, grazie mille")
+        second.detect("Очень хорошее видео, спасибо большое")
+        self.assertIs(first._factory, second._factory)
+        self.assertIs(first._factory, models.get(load_langdetect, 0))
+
+    def test_short_texts_are_undetermined(self):
+        detector = LanguageDetector()
+        self.assertEqual(detector.detect_many(["lol", "great video", "😂😂", ""]), [UNDETERMINED] * 4)
+        self.assertEqual(detector.langdetect_calls, 0)
+
+    def test_results_are_cached_and_deterministic(self):
+        texts = ["Amazing content, subscribed!", "Excelente explicación, profesor"]
+        first = LanguageDetector()
+        results = first.detect_many(texts)
+        self.assertEqual(first.detect_many(texts), results)
+        self.assertEqual(first.langdetect_calls, 2)
+        for _ in range(3):
+            self.assertEqual(LanguageDetector().detect_many(texts), results)
+
+    def test_cache_is_bounded(self):
+        detector = LanguageDetector(cache_size=2)
+        detector.detect_many(["the end is near", "o fim está perto", "das ist das Ende"])
+        self.assertEqual(list(detector._cache), ["o fim está perto", "das ist das Ende"])
+
+
+class TestLanguageRouting(unittest.TestCase):
+
+    def test_lexicons_per_language(self):
+        analyser = SentimentAnalyser("lexicon")
+        self.assertEqual(analyser.score_many(["muito bom", "não é bom"], "pt"), [0.7 * 1.3, -0.35])
+        self.assertEqual(analyser.score_many(["ce n'est pas bon"], "fr"), [-0.35])
+        self.assertEqual(analyser.score_many(["sehr gut"], "de"), analyser.score_many(["muy bueno"], "es"))
+        self.assertEqual(analyser.score_many(["good"], UNDETERMINED), [0.7])
+        self.assertEqual(analyser.score_many(["molto bello"], "it"), [None])
+
+    def test_unknown_lexicon_language(self):
+        with self.assertRaises(ValueError):
+            LexiconBackend(language="it")
+
+    def test_keyword_corpora(self):
+        task = KeywordTask(db=None, keyword_count=40, min_keyword_share=0.05)
+        task.corpus = {"pt": ["a"] * 60, "en": ["b"] * 30, UNDETERMINED: ["c"] * 8, "it": ["d"] * 2}
+        self.assertEqual(
+            [(language, len(texts), top) for language, texts, top in task.corpora()],
+            [("pt", 70, 28), ("en", 30, 12)],
+        )
+        task.corpus = {UNDETERMINED: ["c"] * 3}
+        self.assertEqual([(language, top) for language, _, top in task.corpora()], [("en", 40)])
+
+
+class TestSetLanguages(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        texts = [
+            "@ana this video is really great http://x.y",
+            "o vídeo é muito bom, obrigado",
+            "questo video è davvero molto bello",
+            "lol",
+        ]
+        self.db._execute_many(
+            "INSERT INTO comment (youtube_id, video_id, text, clean_text, published, "
+            "author_display_name, likes) VALUES (?, 'vid', ?, ?, '2024-01-01', '', 0)",
+            [(f"c{i}", text, text) for i, text in enumerate(texts)],
+        )
+
+    def tearDown(self):
+        self.db.close()
+
+    def column(self, name):
+        rows = self.db._execute_query(f"SELECT {name} FROM comment ORDER BY id", fetch_all=True)
+        return [value for (value,) in rows]
+
+    def test_languages_then_sentiments(self):
+        with patch("src.analysis.DBManager", return_value=self.db):
+            analysis = Analysis()
+            analysis.sentiment_backend = "lexicon"
+            analysis._set_languages("vid")
+            self.assertEqual(self.column("language"), ["en", "pt", "it", UNDETERMINED])
+
+            with patch("src.analysis.LanguageDetector.detect_many") as detect_many:
+                analysis._set_languages("vid")  # Nothing left to detect
+            detect_many.assert_not_called()
+
+            analysis._set_sentiments("vid")
+        sentiments = self.column("sentiment")
+        self.assertGreater(sentiments[0], 0)
+        self.assertAlmostEqual(sentiments[1], (0.7 * 1.3 + 0.2) / 2)  # "muito bom", "obrigado"
+        self.assertIsNone(sentiments[2])  # No Italian lexicon
+        self.assertEqual(sentiments[3], SentimentAnalyser().score_many(["lol"])[0])  # Scored as English
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,42 +1,39 @@
+import hashlib
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 import json
 from src.llm_analysis import LLMAnalysis
+from src.llm_cache import LLMCache
 from src.db_manager import DBManager  # For mocking spec
-from openai import OpenAI  # For mocking spec
+from openai import AsyncOpenAI  # For mocking spec
+from tests.fakes import FakeChatServer, map_reduce_reply
 
-# For controlling token counting in tests
-MOCK_BASE_PROMPT_TEXT = """
-            Analyze the following YouTube comments. Extract and summarize:
-            - Common issues
-            - Common wishes
-            - Common pains
-            - Common expressions or catchphrases
-            - Name (Summarize all names into one)
-            - Gender (Summarize all genders into one, based on the average comments it should be male or female)
-            - Age (Summarize all ages into one, based on the content of the comments text which is related to age)
-            - Language (Summarize all languages into one, based on the content of the comments which is related to language)
 
-            Return your response as a single JSON object with four keys: "issues", "wishes", "pains", and "expressions". Each key should correspond to a list of strings (the extracted items).
+def char_tokens(text, **kwargs):
+    """Fake tokenizer: one token per character."""
+    return list(range(len(text)))
 
-            Comments:
-        """
+
+def distinct_text(seed, words):
+    """``words`` words no other seed shares, so the prefilter keeps every comment."""
+    return " ".join(f"s{seed}x{hashlib.md5(f'{seed}-{j}'.encode()).hexdigest()[:6]}" for j in range(words))
 
 
 class TestLLMAnalysis(unittest.TestCase):
 
     def setUp(self):
         self.mock_db_manager = MagicMock(spec=DBManager)
-        self.mock_openai_client = MagicMock(spec=OpenAI)
+        self.mock_db_manager.get_llm_response.return_value = None  # Empty LLM cache
+        self.mock_openai_client = MagicMock(spec=AsyncOpenAI)
         # Mock the specific method chain used in LLMAnalysis
-        self.mock_openai_client.chat.completions.create = MagicMock()
+        self.mock_openai_client.chat.completions.create = AsyncMock()
 
         self.patcher_db = patch(
             "src.llm_analysis.DBManager", return_value=self.mock_db_manager
         )
-        # Patch the OpenAI class where it's instantiated in LLMAnalysis
+        # Patch the AsyncOpenAI class where it's instantiated in LLMAnalysis
         self.patcher_openai = patch(
-            "src.llm_analysis.OpenAI", return_value=self.mock_openai_client
+            "src.llm_analysis.AsyncOpenAI", return_value=self.mock_openai_client
         )
 
         # Mock for tiktoken
@@ -51,7 +48,9 @@ class TestLLMAnalysis(unittest.TestCase):
 
         # Configure the mock_encoding's encode method
         # Default behavior: returns a list with length equal to text length (1 token per char)
-        self.mock_encoding.encode.side_effect = lambda text: list(range(len(text)))
+        self.mock_encoding.encode.side_effect = char_tokens
+        self.mock_encoding.encode_ordinary.side_effect = char_tokens
+        self.mock_encoding.decode.side_effect = lambda tokens: "x" * len(tokens)
 
         self.analyzer = LLMAnalysis()
 
@@ -105,84 +104,76 @@ class TestLLMAnalysis(unittest.TestCase):
         self.assertIsNone(result) # Expect None as execute returns None if no results
         self.mock_db_manager.save_analysis.assert_not_called()
 
+    def _capacity(self):
+        """Tokens left for comments in one request under the char tokenizer."""
+        base = self.analyzer._base_prompt_tokens("English")
+        return self.analyzer.max_tokens_per_request - self.analyzer.max_tokens_response - base
+
+    def _comment_of_cost(self, comment_id, cost):
+        """A comment whose framed prompt cost is exactly ``cost`` tokens."""
+        framing = len(self.analyzer._format_comment({"text": "", "author_clean_name": "A"}) + "\n")
+        return {"id": comment_id, "text": "c" * (cost - framing), "author_clean_name": "A"}
+
+    def test_base_prompt_tokens_match_the_sent_prompt(self):
+        request = self.analyzer._build_requests([[]], "English")[0]
+        sent = sum(len(m["content"]) for m in request["messages"])
+        self.assertGreater(self.analyzer._base_prompt_tokens("English"), sent)
+        self.assertEqual(request["prompt_tokens"], len(request["messages"][1]["content"]))
+
     def test_batch_comments_logic(self):
-        # Set specific token counts for this test via the mock_encoding
-        # Each character will count as 1 token due to side_effect lambda text: [1]*len(text) in setUp
-
-        # Use the actual prompt from LLMAnalysis for accurate base token count
-        base_prompt_tokens = len(
-            MOCK_BASE_PROMPT_TEXT
-        )  # As per current mock: 1 token per char
-
-        # Configure analyzer's limits for this test
-        self.analyzer.max_tokens_per_request = 1000
-        self.analyzer.max_tokens_response = 100  # Reduced for easier testing
-
-        # This is the max tokens available for the comments text itself in a batch
-        max_batch_tokens_for_text = (
-            self.analyzer.max_tokens_per_request
-            - base_prompt_tokens
-            - self.analyzer.max_tokens_response
-        )
+        self.analyzer.max_tokens_per_request = 3000
+        self.analyzer.max_tokens_response = 100
+        capacity = self._capacity()
+        self.assertGreater(capacity, 100)
 
-        # Ensure max_batch_tokens_for_text is positive, otherwise the test setup is wrong
-        self.assertGreater(
-            max_batch_tokens_for_text,
-            0,
-            "Max batch tokens for text is not positive, check prompt/limits",
-        )
+        # Taken in order these need three requests; best fit needs two
+        costs = [int(capacity * f) for f in (0.6, 0.5, 0.4, 0.5)]
+        comments = [self._comment_of_cost(i, cost) for i, cost in enumerate(costs)]
 
+        batches = self.analyzer.batch_comments(comments)
+
+        self.assertEqual([[c["id"] for c in batch] for batch in batches], [[0, 2], [1, 3]])
+
+    def test_batches_fit_the_request_budget(self):
+        self.analyzer.max_tokens_per_request = 3000
+        self.analyzer.max_tokens_response = 100
         comments = [
-            {
-                "id": 1,
-                "text": "a" * (max_batch_tokens_for_text - 10),
-            },  # Fits in one batch
-            {
-                "id": 2,
-                "text": "b" * (max_batch_tokens_for_text - 5),
-            },  # Fits in another batch
-            {"id": 3, "text": "c" * 20},  # Fits with comment 2 or in a new batch
+            {"id": i, "text": "t" * (7 * i % 400 + 1), "author_clean_name": f"Author{i}"}
+            for i in range(200)
         ]
 
-        # Re-calculate token counts based on actual text using the mock
-        comment1_tokens = len(comments[0]["text"])
-        comment2_tokens = len(comments[1]["text"])
-        comment3_tokens = len(comments[2]["text"])
+        batches = self.analyzer.batch_comments(comments)
+        requests = self.analyzer._build_requests(batches, "English")
+
+        self.assertEqual(sorted(c["id"] for batch in batches for c in batch), list(range(200)))
+        for batch, request in zip(batches, requests):
+            self.assertEqual([c["id"] for c in batch], sorted(c["id"] for c in batch))
+            total = (
+                sum(len(m["content"]) for m in request["messages"])
+                + 2 * 4 + 3  # Chat framing
+                + request["max_tokens"]
+            )
+            self.assertLessEqual(total, self.analyzer.max_tokens_per_request)
+
+    def test_batch_comments_truncates_oversized_comment(self):
+        self.analyzer.max_tokens_per_request = 3000
+        self.analyzer.max_tokens_response = 100
+        capacity = self._capacity()
+        comments = [self._comment_of_cost(1, capacity * 2), self._comment_of_cost(2, 50)]
 
         batches = self.analyzer.batch_comments(comments)
 
-        # Expected:
-        # Batch 1: comment1 (fits)
-        # Batch 2: comment2 (fits because comment1 + comment2 > max_batch_tokens_for_text)
-        # Batch 3: comment3 (fits because comment2 + comment3 > max_batch_tokens_for_text, assuming comment3 itself isn't too large)
-        # This depends on the exact addition logic.
-        # If current_tokens + comment_tokens > max_batch_tokens:
-        # Batch 1: comment1
-        # current_tokens = comment1_tokens.
-        # For comment2: comment1_tokens + comment2_tokens > max_batch_tokens_for_text. So new batch.
-        # Batch 2: comment2
-        # current_tokens = comment2_tokens
-        # For comment3: comment2_tokens + comment3_tokens <= max_batch_tokens_for_text. So comment3 adds to Batch 2.
-
-        if comment1_tokens + comment2_tokens > max_batch_tokens_for_text:
-            if comment2_tokens + comment3_tokens > max_batch_tokens_for_text:
-                self.assertEqual(
-                    len(batches), 3, "Should be 3 batches if c3 makes a new batch"
-                )
-                self.assertEqual(len(batches[0]), 1)
-                self.assertEqual(len(batches[1]), 1)
-                self.assertEqual(len(batches[2]), 1)
-            else:  # c3 fits with c2
-                self.assertEqual(
-                    len(batches), 2, "Should be 2 batches if c3 fits with c2"
-                )
-                self.assertEqual(len(batches[0]), 1)
-                self.assertEqual(len(batches[1]), 2)
-        else:  # c1 and c2 fit together
-            self.assertEqual(
-                len(batches), 1, "Should be 1 batch if c1+c2 fit, and c3 fits too"
-            )
-            self.assertEqual(len(batches[0]), 3)
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(len(self.analyzer._format_comment(batches[0][0]) + "\n"), capacity)
+        self.assertEqual(batches[1][0], comments[1])
+
+    def test_count_tokens_batch_threaded(self):
+        self.analyzer.tokenizer_threads = 4
+        texts = ["x" * (i % 50) for i in range(2000)]
+        self.assertEqual(self.analyzer.count_tokens_batch(texts), [i % 50 for i in range(2000)])
+
+    def test_batch_comments_empty(self):
+        self.assertEqual(self.analyzer.batch_comments([]), [])
 
     def test_parse_response_valid_json(self):
         json_string = '{"issues": ["issue1"], "wishes": ["wish1"], "pains": [], "expressions": ["expr1"], "name": "Test Name", "gender": "Female", "age": "30-40", "language": "Spanish"}'
@@ -243,6 +234,220 @@ class TestLLMAnalysis(unittest.TestCase):
         self.assertEqual(merged["age"], "20-30") # John (20-30), John (25-35), Jane (20-30) -> "20-30" is most common
         self.assertEqual(merged["language"], "English")
 
+    def test_merge_results_folds_near_duplicates(self):
+        results_list = [
+            {"issues": ["Video is too long", "Bad audio"], "wishes": ["More tutorials"]},
+            {"issues": ["The video is too long."], "wishes": ["more tutorials!"]},
+            {"issues": ["video is too long", "Video is too short"], "wishes": []},
+        ]
+        merged = self.analyzer.merge_results(results_list)
+        self.assertEqual(merged["issues"], ["Video is too long", "Bad audio", "Video is too short"])
+        self.assertEqual(merged["wishes"], ["More tutorials"])
+
+    def test_analyze_batch(self):
+        mock_choice = MagicMock()
+        mock_choice.message.content = '{"issues": ["i1"]}'
+        self.mock_openai_client.chat.completions.create.return_value = MagicMock(
+            choices=[mock_choice]
+        )
+
+        result = self.analyzer.analyze_batch([{"text": "Comment 1", "author_clean_name": "Ana"}])
+
+        self.assertEqual(result["issues"], ["i1"])
+        self.mock_openai_client.close.assert_awaited_once()
+
+    def test_analyze_batch_error(self):
+        self.mock_openai_client.chat.completions.create.side_effect = Exception("OpenAI API Error")
+        with self.assertRaises(Exception):
+            self.analyzer.analyze_batch([{"text": "Comment 1", "author_clean_name": "Ana"}])
+
+
+class TestLLMAnalysisConcurrent(unittest.TestCase):
+    """Runs LLMAnalysis end to end against FakeChatServer."""
+
+    def setUp(self):
+        self.mock_db_manager = MagicMock(spec=DBManager)
+        self.patcher_db = patch("src.llm_analysis.DBManager", return_value=self.mock_db_manager)
+        self.patcher_tiktoken = patch("src.llm_analysis.tiktoken.encoding_for_model")
+        self.patcher_db.start()
+        mock_encoding = self.patcher_tiktoken.start().return_value
+        mock_encoding.encode_ordinary.side_effect = str.split
+
+        self.analyzer = LLMAnalysis()
+        self.analyzer.max_tokens_per_request = 600  # One 150-word comment per batch
+        self.analyzer.max_tokens_response = 100
+        self.cache_db = DBManager(db_name=":memory:")
+        self.analyzer.cache = LLMCache(self.cache_db)
+
+    def tearDown(self):
+        self.patcher_db.stop()
+        self.patcher_tiktoken.stop()
+        self.cache_db.close()
+
+    def test_batches_run_concurrently_and_merge_in_order(self):
+        self.mock_db_manager.get_comments.return_value = [
+            {"id": i, "text": distinct_text(i, 150), "clean_text": "", "author_clean_name": f"Author{i}"}
+            for i in range(6)
+        ]
+
+        with FakeChatServer(latency=0.1) as server:
+            self.analyzer.base_url = server.base_url
+            result = self.analyzer.execute("vid_concurrent")
+
+        self.assertEqual(len(server.requests), 6)
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertEqual(result["issues"], [f"issue from Author{i}" for i in range(6)])
+        self.mock_db_manager.save_analysis.assert_called_once_with("vid_concurrent", result)
+
+    def test_rate_limited_batches_are_retried(self):
+        self.mock_db_manager.get_comments.return_value = [
+            {"id": 1, "text": "Comment 1", "clean_text": "", "author_clean_name": "Ana"}
+        ]
+
+        with FakeChatServer(rate_limited=1, retry_after=0.01) as server:
+            self.analyzer.base_url = server.base_url
+            result = self.analyzer.execute("vid_retry")
+
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(result["issues"], ["issue from Ana"])
+
+    def test_prefilter_drops_noise_before_the_llm(self):
+        joke = "when the cat finally hit the high note at the end"
+        self.mock_db_manager.get_comments.return_value = [
+            {"id": 1, "text": joke, "clean_text": joke, "author_clean_name": "Ana", "likes": 50},
+            {"id": 2, "text": "😂😂😂", "clean_text": "😂😂😂", "author_clean_name": "Bia", "likes": 40},
+            {"id": 3, "text": joke + "!!", "clean_text": joke + "!!", "author_clean_name": "Caio", "likes": 30},
+            {"id": 4, "text": "first", "clean_text": "first", "author_clean_name": "Duda", "likes": 20},
+            {"id": 5, "text": "the audio drops out at 3:10", "clean_text": "the audio drops out at 3:10",
+             "author_clean_name": "Edu", "likes": 10},
+        ]
+
+        with FakeChatServer() as server:
+            self.analyzer.base_url = server.base_url
+            result = self.analyzer.execute("vid_noisy")
+
+        self.mock_db_manager.get_comments.assert_called_once_with(
+            "vid_noisy",
+            columns=("id", "text", "clean_text", "author_clean_name", "likes"),
+            limit=self.analyzer.candidate_pool,
+        )
+        sent = " ".join(m["content"] for r in server.requests for m in r["messages"])
+        self.assertIn("Author: Ana", sent)
+        self.assertIn("Author: Edu", sent)
+        for author in ("Bia", "Caio", "Duda"):
+            self.assertNotIn(f"Author: {author}", sent)
+        self.assertIsNotNone(result)
+
+        report = self.analyzer.prefilter_report
+        self.assertEqual(
+            (report["comments"], report["low_information"], report["duplicates"], report["kept"]),
+            (5, 2, 1, 2),
+        )
+        self.assertEqual(
+            report["tokens_saved"], report["low_information_tokens"] + report["duplicate_tokens"]
+        )
+        self.assertGreater(report["tokens_saved"], 0)
+
+    def test_rerun_with_unchanged_comments_is_served_from_cache(self):
+        self.mock_db_manager.get_comments.return_value = [
+            {"id": i, "text": distinct_text(i, 150), "clean_text": "", "author_clean_name": f"Author{i}"}
+            for i in range(3)
+        ]
+
+        with FakeChatServer() as server:
+            self.analyzer.base_url = server.base_url
+            first = self.analyzer.execute("vid_cached")
+            second = self.analyzer.execute("vid_cached")
+            self.assertEqual(len(server.requests), 3)
+            self.assertEqual(second, first)
+            self.assertEqual(self.analyzer.cache.stats(), {"hits": 3, "misses": 3})
+
+            # A different language is a different prompt
+            self.analyzer.execute("vid_cached", language="Portuguese")
+            self.assertEqual(len(server.requests), 6)
+
+            self.analyzer.cache.bypass = True
+            self.analyzer.execute("vid_cached")
+            self.assertEqual(len(server.requests), 9)
+
+
+class TestLLMAnalysisMapReduce(unittest.TestCase):
+    """Map-reduce mode against FakeChatServer, one word per token."""
+
+    def setUp(self):
+        self.mock_db_manager = MagicMock(spec=DBManager)
+        self.mock_db_manager.get_comments.return_value = [
+            {"id": i, "text": distinct_text(i, 20), "clean_text": "", "author_clean_name": f"Author{i:02d}"}
+            for i in range(24)
+        ]
+        self.patcher_db = patch("src.llm_analysis.DBManager", return_value=self.mock_db_manager)
+        self.patcher_tiktoken = patch("src.llm_analysis.tiktoken.encoding_for_model")
+        self.patcher_db.start()
+        self.patcher_tiktoken.start().return_value.encode_ordinary.side_effect = str.split
+
+        self.analyzer = LLMAnalysis()
+        self.analyzer.max_tokens_per_request = 420  # Two comments per map batch
+        self.analyzer.max_tokens_response = 100
+        self.cache_db = DBManager(db_name=":memory:")
+        self.analyzer.cache = LLMCache(self.cache_db)
+        self.server = FakeChatServer(reply=map_reduce_reply).start()
+        self.analyzer.base_url = self.server.base_url
+
+    def tearDown(self):
+        self.server.stop()
+        self.patcher_db.stop()
+        self.patcher_tiktoken.stop()
+        self.cache_db.close()
+
+    def test_all_comments_are_analyzed_and_consolidated(self):
+        progress = []
+        result = self.analyzer.execute(
+            "vid_big", map_reduce=True, progress=lambda *args: progress.append(args)
+        )
+
+        self.mock_db_manager.get_comments.assert_called_once_with(
+            "vid_big", columns=("id", "text", "clean_text", "author_clean_name", "likes"), limit=None
+        )
+        self.assertEqual(result["issues"], [f"issue from Author{i:02d}" for i in range(0, 24, 2)])
+        self.assertEqual(result["wishes"], ["consolidated wish"])
+        self.mock_db_manager.save_analysis.assert_called_once_with("vid_big", result)
+
+        # Every tier reports its start and its completion
+        tiers = sorted({tier for tier, _, _ in progress})
+        self.assertGreaterEqual(len(tiers), 3, progress)
+        self.assertEqual(tiers, list(range(len(tiers))))
+        finished = {tier: total for tier, done, total in progress if done == total}
+        self.assertEqual(finished[0], 12)
+        self.assertEqual(sum(finished.values()), len(self.server.requests))
+
+    def test_token_budget_keeps_most_liked_comments(self):
+        self.analyzer.token_budget = 3000
+        requests = []
+        result = self.analyzer.execute(
+            "vid_big", map_reduce=True, progress=lambda tier, done, total: requests.append((tier, total))
+        )
+
+        map_batches = dict(requests)[0]
+        self.assertLess(map_batches, 12)
+        self.assertEqual(
+            sorted(result["issues"]), [f"issue from Author{i:02d}" for i in range(0, 2 * map_batches, 2)]
+        )
+        spent = sum(
+            len(" ".join(m["content"] for m in r["messages"]).split()) + r["max_tokens"] + 11
+            for r in self.server.requests
+        )
+        self.assertLessEqual(spent, self.analyzer.token_budget)
+
+    def test_single_batch_needs_no_reduce(self):
+        self.mock_db_manager.get_comments.return_value = self.mock_db_manager.get_comments.return_value[:2]
+        result = self.analyzer.execute("vid_small", map_reduce=True)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(result["issues"], ["issue from Author00"])
+
+    def test_reduce_cost_bound(self):
+        self.assertEqual(self.analyzer._reduce_cost_bound(1, 4), 0)
+        self.assertEqual(self.analyzer._reduce_cost_bound(10, 4), 4 * 420)  # 3 calls, then 1
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.db_manager import DBManager
+from src.llm_cache import LLMCache
+
+MESSAGES = [{"role": "user", "content": "Analyze these comments"}]
+
+
+class TestLLMCache(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.cache = LLMCache(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def _count(self):
+        return self.db._execute_query("SELECT COUNT(*) FROM llm_cache", fetch_one=True)[0]
+
+    def test_key_is_content_addressed(self):
+        key = LLMCache.key("gpt-4", MESSAGES, max_tokens=1000)
+        self.assertEqual(key, LLMCache.key("gpt-4", [dict(m) for m in MESSAGES], max_tokens=1000))
+        self.assertEqual(len(key), 64)
+        self.assertNotEqual(key, LLMCache.key("gpt-4o", MESSAGES, max_tokens=1000))
+        self.assertNotEqual(key, LLMCache.key("gpt-4", MESSAGES, max_tokens=500))
+        self.assertNotEqual(key, LLMCache.key("gpt-4", [{"role": "user", "content": "Other"}], max_tokens=1000))
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", "gpt-4", '{"issues": []}')
+        self.assertEqual(self.cache.get("k"), '{"issues": []}')
+        self.cache.put("k", "gpt-4", '{"issues": ["new"]}')
+        self.assertEqual(self.cache.get("k"), '{"issues": ["new"]}')
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 1})
+
+    def test_bypass(self):
+        self.cache.put("k", "gpt-4", "cached")
+        self.cache.bypass = True
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.put("k", "gpt-4", "fresh")  # Bypass still refreshes the entry
+        self.cache.bypass = False
+        self.assertEqual(self.cache.get("k"), "fresh")
+
+    def test_ttl(self):
+        self.cache.put("old", "gpt-4", "stale")
+        self.cache.put("new", "gpt-4", "fresh")
+        self.db._execute_query(
+            "UPDATE llm_cache SET created = ? WHERE key = 'old'",
+            (datetime.now() - timedelta(days=31),),
+            commit=True,
+        )
+
+        self.assertIsNone(self.cache.get("old"))
+        self.assertEqual(self.cache.get("new"), "fresh")
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertEqual(self._count(), 1)
+
+    def test_hits_are_written_back_in_batches(self):
+        cache = LLMCache(self.db, touch_every=3)
+        for key in ("a", "b", "c"):
+            cache.put(key, "gpt-4", key)
+        self.db._execute_query("UPDATE llm_cache SET accessed = ?", (datetime(2024, 1, 1),), commit=True)
+
+        def accessed(key):
+            return self.db._execute_query(
+                "SELECT accessed FROM llm_cache WHERE key = ?", (key,), fetch_one=True
+            )[0]
+
+        cache.get("a")
+        cache.get("a")
+        cache.get("b")
+        self.assertTrue(accessed("a").startswith("2024"))  # Lookups alone do not write
+        cache.get("c")  # Third distinct hit
+        self.assertFalse(accessed("a").startswith("2024"))
+        self.assertFalse(accessed("c").startswith("2024"))
+
+    def test_lru_eviction(self):
+        cache = LLMCache(self.db, ttl=None, max_entries=3, evict_every=1)
+        start = datetime(2024, 1, 1)
+        for i in range(3):
+            with patch("src.db_manager.datetime") as mock_datetime:
+                mock_datetime.now.return_value = start + timedelta(minutes=i)
+                mock_datetime.min = datetime.min
+                cache.put(f"k{i}", "gpt-4", str(i))
+        cache.get("k0")  # k0 is now the most recently used
+        cache.put("k3", "gpt-4", "3")
+
+        self.assertEqual(self._count(), 3)
+        self.assertIsNone(cache.get("k1"))
+        self.assertEqual(cache.get("k0"), "0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from openai import AsyncOpenAI
+
+from src.llm_cache import LLMCache
+from src.llm_executor import LLMExecutor, TokenBucketLimiter, retry_after_seconds
+from tests.fakes import FakeChatServer
+
+
+def request(text, max_tokens=10):
+    return {"messages": [{"role": "user", "content": text}], "max_tokens": max_tokens}
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+
+    def _time_acquires(self, limiter, costs):
+        async def run():
+            start = time.monotonic()
+            for tokens in costs:
+                await limiter.acquire(tokens)
+            return time.monotonic() - start
+        return asyncio.run(run())
+
+    def test_requests_per_minute(self):
+        limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+        self.assertLess(self._time_acquires(limiter, [1] * 600), 0.1)  # Full bucket
+        self.assertGreaterEqual(self._time_acquires(limiter, [1] * 2), 0.19)  # 10 per second
+
+    def test_tokens_per_minute(self):
+        limiter = TokenBucketLimiter(requests_per_minute=10**6, tokens_per_minute=6000)
+        self.assertLess(self._time_acquires(limiter, [6000]), 0.1)
+        self.assertGreaterEqual(self._time_acquires(limiter, [20]), 0.19)  # 100 tokens per second
+
+    def test_oversized_request_is_admitted(self):
+        limiter = TokenBucketLimiter(requests_per_minute=60, tokens_per_minute=100)
+        self.assertLess(self._time_acquires(limiter, [10**6]), 0.1)
+
+    def test_pause(self):
+        limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+        limiter.pause(0.2)
+        self.assertGreaterEqual(self._time_acquires(limiter, [1]), 0.19)
+
+    def test_shared_across_event_loops(self):
+        limiter = TokenBucketLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+        self._time_acquires(limiter, [1] * 600)
+        start = time.monotonic()
+        threads = [threading.Thread(target=self._time_acquires, args=(limiter, [1])) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)  # One after the other, 10 per second
+
+
+class TestRetryAfter(unittest.TestCase):
+
+    def _error(self, headers):
+        return MagicMock(response=MagicMock(headers=headers))
+
+    def test_headers(self):
+        self.assertEqual(retry_after_seconds(self._error({"retry-after": "2"})), 2.0)
+        self.assertEqual(retry_after_seconds(self._error({"retry-after-ms": "250"})), 0.25)
+        self.assertIsNone(retry_after_seconds(self._error({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})))
+        self.assertIsNone(retry_after_seconds(self._error({})))
+        self.assertIsNone(retry_after_seconds(ValueError("no response")))
+
+
+class TestLLMExecutor(unittest.TestCase):
+
+    def _run(self, server, requests, **kwargs):
+        async def run():
+            client = AsyncOpenAI(api_key="test", base_url=server.base_url, max_retries=0)
+            try:
+                executor = LLMExecutor(client, "gpt-4", **kwargs)
+                return await executor.run(requests)
+            finally:
+                await client.close()
+        return asyncio.run(run())
+
+    def test_results_in_request_order(self):
+        def reply(messages):
+            index = int(messages[-1]["content"])
+            time.sleep(0.05 * (5 - index))  # Later requests finish first
+            return f"reply {index}"
+
+        with FakeChatServer(reply=reply) as server:
+            results = self._run(server, [request(str(i)) for i in range(6)], max_concurrency=6)
+
+        self.assertEqual(results, [f"reply {i}" for i in range(6)])
+        self.assertGreater(server.max_in_flight, 1)
+
+    def test_concurrency_limit(self):
+        with FakeChatServer(latency=0.05) as server:
+            self._run(server, [request("Author: x") for _ in range(9)], max_concurrency=3)
+        self.assertEqual(len(server.requests), 9)
+        self.assertLessEqual(server.max_in_flight, 3)
+
+    def test_honors_retry_after(self):
+        with FakeChatServer(rate_limited=2, retry_after=0.2, reply=lambda m: "ok") as server:
+            start = time.monotonic()
+            # base_delay=0: without Retry-After the retries would be immediate
+            results = self._run(server, [request("a")], base_delay=0, max_concurrency=1)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(results, ["ok"])
+        self.assertEqual(len(server.requests), 3)
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    def test_rate_limit_pauses_limiter(self):
+        limiter = TokenBucketLimiter(requests_per_minute=10**6, tokens_per_minute=10**6)
+        with FakeChatServer(rate_limited=1, retry_after=0.3, reply=lambda m: "ok") as server:
+            results = self._run(
+                server, [request(c) for c in "abc"], limiter=limiter, max_concurrency=2
+            )
+
+        self.assertEqual(results, ["ok"] * 3)
+        # Whatever was sent after the 429 waited out its Retry-After
+        throttled_at, *later = server.arrivals[:1] + server.arrivals[2:]
+        self.assertTrue(all(t - throttled_at >= 0.29 for t in later), server.arrivals)
+
+    def test_cache_is_used_off_the_event_loop(self):
+        threads = set()
+
+        class RecordingCache:
+            key = staticmethod(LLMCache.key)
+
+            def get(self, key):
+                threads.add(threading.current_thread())
+                return "cached" if key == cached_key else None
+
+            def put(self, key, model, response):
+                threads.add(threading.current_thread())
+
+            def flush(self):
+                threads.add(threading.current_thread())
+
+        cached_key = LLMCache.key("gpt-4", request("a")["messages"], max_tokens=10)
+        with FakeChatServer(reply=lambda m: "fresh") as server:
+            results = self._run(server, [request("a"), request("b")], cache=RecordingCache())
+
+        self.assertEqual(results, ["cached", "fresh"])
+        self.assertEqual(len(server.requests), 1)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_failed_request_is_returned_in_place(self):
+        with FakeChatServer(rate_limited=3, retry_after=0, reply=lambda m: "ok") as server:
+            results = self._run(
+                server, [request("a"), request("b")], max_retries=1, base_delay=0, max_concurrency=1
+            )
+
+        self.assertIsInstance(results[0], Exception)
+        self.assertEqual(results[1], "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
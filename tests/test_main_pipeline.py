@@ -4,11 +4,22 @@ from unittest.mock import (
     MagicMock,
     call,
 )  # Import call for checking ordered calls
-from src.main import main  # Import the main function to be tested
+from src.db_manager import DBManager
+from src.main import main, parse_args  # Import the main function to be tested
 
 
 class TestMainPipeline(unittest.TestCase):
 
+    def setUp(self):
+        # Comment analysis runs on the real DB unless patched; checkpoints go to memory
+        self.db = DBManager(db_name=":memory:")
+        for patcher in (
+            patch("src.main.Analysis"),
+            patch("src.pipeline.DBManager", return_value=self.db),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @patch("src.main.Generating")
     @patch("src.main.LLMAnalysis")
     @patch("src.main.Mining")
@@ -107,6 +118,41 @@ class TestMainPipeline(unittest.TestCase):
             "test_video_id_logging"
         )
 
+    @patch("src.main.Generating")
+    @patch("src.main.LLMAnalysis")
+    @patch("src.main.Mining")
+    @patch("src.main.Gathering")
+    def test_failed_llm_analysis_resumes_without_gathering(
+        self, MockGathering, MockMining, MockLLMAnalysis, MockGenerating
+    ):
+        MockLLMAnalysis.return_value.execute.side_effect = [RuntimeError("rate limited"), None]
+        with self.assertRaises(RuntimeError):
+            main("vid")
+        MockGenerating.return_value.execute.assert_not_called()
+
+        main("vid")
+        MockGathering.return_value.execute.assert_called_once_with("vid")
+        MockMining.return_value.execute.assert_called_once_with("vid")
+        self.assertEqual(MockLLMAnalysis.return_value.execute.call_count, 2)
+        MockGenerating.return_value.execute.assert_called_once_with("vid")
+
+    @patch("src.main.Generating")
+    @patch("src.main.LLMAnalysis")
+    @patch("src.main.Mining")
+    @patch("src.main.Gathering")
+    def test_only_runs_the_named_stages(self, MockGathering, MockMining, MockLLMAnalysis, MockGenerating):
+        main("vid", only=["generating"])
+        MockGathering.return_value.execute.assert_not_called()
+        MockGenerating.return_value.execute.assert_called_once_with("vid")
+
+    def test_command_line(self):
+        args = parse_args(["vid", "--from-stage", "llm_analysis"])
+        self.assertEqual((args.video_id, args.from_stage, args.only), ("vid", "llm_analysis", None))
+        args = parse_args(["vid", "--only", "analysis", "--only", "generating"])
+        self.assertEqual(args.only, ["analysis", "generating"])
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            parse_args(["vid", "--only", "analysis", "--from-stage", "mining"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from datetime import datetime
+
+from src.comment import Comment
+from src.db_manager import DBManager
+from src.mining import Mining, clean_comment_rows
+
+TEXTS = [
+    "@daniel I want that camera at #Bestbuy. http://bit.ly//WR4Rt",
+    "Great video.. really helpful kkkk",
+    "rsrs that was funny https://example.com/watch?v=1 #lol",
+    "Plain comment with nothing to strip",
+]
+
+
+class TestMining(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def _seed(self, video_id, count):
+        self.db.save_comments_bulk(
+            Comment(
+                video_id=video_id,
+                published=datetime(2024, 1, 1),
+                author_display_name=f"@Author #{i}",
+                likes=i,
+                text=f"{TEXTS[i % len(TEXTS)]} {i}",
+            )
+            for i in range(count)
+        )
+
+    def _mined(self, video_id):
+        return [
+            (c["text"], c["clean_text"], c["author_clean_name"])
+            for c in self.db.get_comments(video_id)
+        ]
+
+    def test_clean_comment_rows(self):
+        cleaned = clean_comment_rows([(1, TEXTS[0], "@Daniel"), (2, TEXTS[1], "#Ana")])
+        self.assertEqual(
+            cleaned,
+            [(1, "I want that camera at", "Daniel"), (2, "Great video. really helpful ", "Ana")],
+        )
+
+    def test_execute_cleans_all_comments(self):
+        self._seed("vid_serial", 10)
+        Mining(db=self.db, chunk_size=3).execute("vid_serial")
+
+        mined = self._mined("vid_serial")
+        self.assertEqual(len(mined), 10)
+        self.assertTrue(all(clean is not None for _, clean, _ in mined))
+
+    def test_parallel_matches_serial(self):
+        self._seed("vid_serial", 25)
+        self._seed("vid_parallel", 25)
+
+        Mining(db=self.db, chunk_size=4).execute("vid_serial")
+        Mining(db=self.db, chunk_size=4, workers=2).execute("vid_parallel")
+
+        self.assertEqual(self._mined("vid_serial"), self._mined("vid_parallel"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from src.keyword_extractor import KeywordExtractor, load_yake
+from src.model_registry import ModelRegistry, models, warm
+from src.sentiment_analyzer import SentimentAnalyser
+
+calls = []
+
+
+def load_counter(name, size=1):
+    calls.append((name, size))
+    return [name] * size
+
+
+def loaded_models():
+    """Models in the registry of the process this runs in."""
+    return sorted(models.stats())
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.registry = ModelRegistry()
+
+    def test_models_are_built_once(self):
+        first = self.registry.get(load_counter, "a", 2)
+        self.assertIs(self.registry.get(load_counter, "a", 2), first)
+        self.registry.get(load_counter, "b")
+        self.assertEqual(calls, [("a", 2), ("b", 1)])
+
+        stats = self.registry.stats()
+        self.assertEqual(sorted(stats), ["load_counter('a', 2)", "load_counter('b')"])
+        self.assertEqual(stats["load_counter('a', 2)"]["hits"], 1)
+        self.assertGreaterEqual(stats["load_counter('b')"]["load_seconds"], 0)
+
+    def test_warm_and_clear(self):
+        self.registry.warm([(load_counter, "a"), (load_counter, "a")])
+        self.assertEqual(calls, [("a", 1)])
+        self.registry.clear()
+        self.assertEqual(self.registry.stats(), {})
+
+    def test_workers_start_warm(self):
+        with ProcessPoolExecutor(1, initializer=warm, initargs=([(load_counter, "w")],)) as pool:
+            self.assertIn("load_counter('w')", pool.submit(loaded_models).result())
+
+
+class TestSharedModels(unittest.TestCase):
+
+    def setUp(self):
+        models.clear()
+
+    def tearDown(self):
+        models.clear()
+
+    def test_yake_extractor_is_shared_across_extractors(self):
+        text = "The camera quality is great. The battery life of this camera is short."
+        first = KeywordExtractor().get_yake_keywords(text, "en", 5)
+        self.assertEqual(KeywordExtractor().get_yake_keywords(text, "en", 5), first)
+        self.assertEqual(models.stats()["load_yake('en', 5)"]["hits"], 1)
+        self.assertIs(models.get(load_yake, "en", 5), models.get(load_yake, "en", 5))
+
+    def test_spacy_model_loads_once_with_only_ner(self):
+        nlp = MagicMock()
+        nlp.return_value.ents = ["Berlin"]
+        with patch("spacy.load", return_value=nlp) as load:
+            extractor = KeywordExtractor()
+            self.assertEqual(extractor.get_spacy_keyword("I live in Berlin"), ["Berlin"])
+            extractor.get_spacy_keyword("and love it")
+        load.assert_called_once_with("en_core_web_sm", enable=["ner"])
+
+    def test_sentiment_workers_load_their_backend_on_start(self):
+        with SentimentAnalyser("lexicon", workers=2, min_chunk=1) as analyser:
+            analyser.score_many(["good", "bad"])
+            self.assertIn("load_backend('lexicon', 'en')", analyser._pool.submit(loaded_models).result())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import threading
+import unittest
+
+from src.db_manager import DBManager
+from src.pipeline import Pipeline, Stage
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.db = DBManager(db_name=":memory:")
+        self.calls = []
+        self.fail = set()
+
+    def stage(self, name, after=(), func=None):
+        def run(video_id):
+            self.calls.append(name)
+            if func:
+                func()
+            if name in self.fail:
+                raise RuntimeError(f"{name} broke")
+
+        return Stage(name, run, after)
+
+    def pipeline(self, **funcs):
+        return Pipeline(
+            [
+                self.stage("gather"),
+                self.stage("mine", ("gather",)),
+                self.stage("analyse", ("mine",), funcs.get("analyse")),
+                self.stage("llm", ("mine",), funcs.get("llm")),
+                self.stage("report", ("analyse", "llm")),
+            ],
+            self.db,
+        )
+
+    def test_runs_stages_in_dependency_order_and_records_them(self):
+        self.assertEqual(self.pipeline().run("v1"), ["gather", "mine", "analyse", "llm", "report"])
+        self.assertEqual(self.calls[:2], ["gather", "mine"])
+        self.assertEqual(self.calls[-1], "report")
+        self.assertEqual(set(self.db.get_stage_states("v1").values()), {"done"})
+        self.assertEqual(self.db.get_stage_states("v2"), {})
+
+    def test_independent_stages_run_in_parallel(self):
+        # Each analysis waits for the other to start; run in sequence, this times out
+        barrier = threading.Barrier(2, timeout=5)
+        self.pipeline(analyse=barrier.wait, llm=barrier.wait).run("v1")
+        self.assertEqual(sorted(self.calls[2:4]), ["analyse", "llm"])
+
+    def test_failure_stops_dependents_and_resume_skips_completed_stages(self):
+        self.fail.add("llm")
+        with self.assertRaisesRegex(RuntimeError, "llm broke"):
+            self.pipeline().run("v1")
+        self.assertNotIn("report", self.calls)
+        states = self.db.get_stage_states("v1")
+        self.assertEqual(states["analyse"], "done")  # Independent of the failure
+        self.assertEqual((states["llm"], states["report"]), ("failed", "pending"))
+        error = self.db._execute_query(
+            "SELECT error FROM pipeline_stage WHERE video_id = 'v1' AND stage = 'llm'", fetch_one=True
+        )[0]
+        self.assertEqual(error, "RuntimeError: llm broke")
+
+        self.fail.clear()
+        self.calls.clear()
+        self.assertEqual(self.pipeline().run("v1"), ["llm", "report"])
+        self.assertEqual(self.calls, ["llm", "report"])
+
+    def test_completed_video_runs_from_the_start(self):
+        self.pipeline().run("v1")
+        self.assertEqual(self.pipeline().plan("v1"), ["gather", "mine", "analyse", "llm", "report"])
+
+    def test_from_stage_and_only(self):
+        pipeline = self.pipeline()
+        self.assertEqual(pipeline.plan("v1", from_stage="analyse"), ["analyse", "report"])
+        self.assertEqual(pipeline.plan("v1", from_stage="mine"), ["mine", "analyse", "llm", "report"])
+        self.assertEqual(pipeline.run("v1", only=["llm", "gather"]), ["gather", "llm"])
+        self.assertEqual(self.calls, ["gather", "llm"])
+        with self.assertRaises(ValueError):
+            pipeline.plan("v1", only=["nope"])
+        with self.assertRaises(ValueError):
+            pipeline.plan("v1", from_stage="mine", only=["llm"])
+
+    def test_invalid_graphs(self):
+        with self.assertRaisesRegex(ValueError, "Unknown"):
+            Pipeline([Stage("a", print, ("b",))], self.db)
+        with self.assertRaisesRegex(ValueError, "circular"):
+            Pipeline([Stage("a", print, ("b",)), Stage("b", print, ("a",))], self.db)
+        with self.assertRaisesRegex(ValueError, "Duplicate"):
+            Pipeline([Stage("a", print), Stage("a", print)], self.db)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+from unittest.mock import patch
+
+from textblob.en import parser
+
+from src.analysis import Analysis
+from src.db_manager import DBManager
+from src.sentiment_analyzer import LexiconBackend, SentimentAnalyser, TextBlobBackend, tokenize
+
+CONSTRUCTIONS = [
+    "",
+    "good",
+    "not good",
+    "not very good",
+    "very good",
+    "really not good",
+    "really good!!",
+    "good! bad",
+    "this isn't good",
+    "never a bad day",
+    "very ♥ nice",
+    "great video :)",
+    "great video:)",
+    "awful :( but funny",
+    "terribly boring, totally useless...",
+    "the U.S. is big.",
+    "“Amazing” she said",
+    "sooo not a good idea (!)",
+]
+
+
+def random_comments(count, seed):
+    rng = random.Random(seed)
+    words = list(LexiconBackend().vocabulary)[:800] + ["not", "no", "never", "a", "it", "lol", "10/10"]
+    suffixes = ["", "", "", "!", "!!", ".", ",", "...", "?", ":)", ":(", "'s", "n't"]
+    return [
+        " ".join(
+            rng.choice(words) + rng.choice(suffixes) for _ in range(rng.randint(0, 15))
+        )
+        for _ in range(count)
+    ]
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_matches_textblob_tokenizer(self):
+        for text in CONSTRUCTIONS + random_comments(300, seed=1):
+            expected = [word.lower() for sentence in parser.find_tokens(text) for word in sentence.split()]
+            self.assertEqual(tokenize(text), expected, text)
+
+
+class TestLexiconBackend(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lexicon = LexiconBackend()
+        cls.textblob = TextBlobBackend()
+
+    def assertSameScores(self, texts):
+        for text, score, expected in zip(
+            texts, self.lexicon.score_many(texts), self.textblob.score_many(texts)
+        ):
+            self.assertAlmostEqual(score, expected, places=9, msg=text)
+
+    def test_constructions_score_like_textblob(self):
+        self.assertSameScores(CONSTRUCTIONS)
+
+    def test_random_comments_score_like_textblob(self):
+        self.assertSameScores(random_comments(1000, seed=2))
+
+    def test_empty_batch(self):
+        self.assertEqual(self.lexicon.score_many([]), [])
+        self.assertEqual(self.lexicon.score_many(["", "..."]), [0.0, 0.0])
+
+
+class TestSentimentAnalyser(unittest.TestCase):
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            SentimentAnalyser("vader")
+
+    def test_score_many_matches_sentiment(self):
+        texts = ["great video", "not good at all", "boring"]
+        analyser = SentimentAnalyser()
+        self.assertEqual(analyser.score_many(texts), [analyser.sentiment(text) for text in texts])
+
+    def test_workers_keep_input_order(self):
+        texts = random_comments(40, seed=3)
+        expected = SentimentAnalyser("lexicon").score_many(texts)
+        with SentimentAnalyser("lexicon", workers=2, min_chunk=10) as analyser:
+            self.assertEqual(analyser.score_many(texts), expected)
+            self.assertIsNotNone(analyser._pool)
+        self.assertIsNone(analyser._pool)
+
+
+class TestSetSentiments(unittest.TestCase):
+
+    def test_set_sentiments_scores_clean_text(self):
+        db = DBManager(db_name=":memory:")
+        rows = [(f"c{i}", "vid", text) for i, text in enumerate(["great video", "", "awful"])]
+        db._execute_many(
+            "INSERT INTO comment (youtube_id, video_id, clean_text, published, "
+            "author_display_name, likes, text) VALUES (?, ?, ?, '2024-01-01', '', 0, '')",
+            rows,
+        )
+        with patch("src.analysis.DBManager", return_value=db):
+            analysis = Analysis()
+            analysis.sentiment_backend = "lexicon"
+            analysis._set_sentiments("vid")
+
+        sentiments = db._execute_query("SELECT sentiment FROM comment ORDER BY id", fetch_all=True)
+        self.assertEqual(
+            [s for (s,) in sentiments],
+            [TextBlobBackend().score_many(["great video"])[0], None, -1.0],
+        )
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,6 +3,9 @@ from unittest.mock import patch, MagicMock
 from src.services import PersonaGenerator, PersonaData
 from src.db_manager import DBManager  # For type hinting and spec for MagicMock
 from src.llm_analysis import LLMAnalysis  # For spec for MagicMock
+from src.main import STAGES
+
+FINISHED = {stage.name: "done" for stage in STAGES}
 
 
 class TestPersonaGenerator(unittest.TestCase):
@@ -39,7 +42,7 @@ class TestPersonaGenerator(unittest.TestCase):
         self.assertEqual(persona.status, "Please enter a video ID")
 
     def test_generate_persona_video_exists_analysis_exists(self):
-        self.mock_db_manager.video_exists.return_value = True
+        self.mock_db_manager.get_stage_states.return_value = FINISHED
         self.mock_db_manager.get_video_title.return_value = "Existing Video"
         self.mock_db_manager.get_user_demographics.return_value = ("TestName", "M")
         mock_analysis_data = {
@@ -66,7 +69,7 @@ class TestPersonaGenerator(unittest.TestCase):
         self.mock_db_manager.get_analysis.assert_called_once_with("vid123")
 
     def test_generate_persona_video_exists_needs_analysis(self):
-        self.mock_db_manager.video_exists.return_value = True
+        self.mock_db_manager.get_stage_states.return_value = FINISHED
         self.mock_db_manager.get_video_title.return_value = "Needs Analysis Video"
         self.mock_db_manager.get_user_demographics.return_value = ("TestName", "F")
 
@@ -99,9 +102,8 @@ class TestPersonaGenerator(unittest.TestCase):
 
     @patch("src.services.run_full_pipeline")  # Patch main within services module
     def test_generate_persona_video_does_not_exist(self, mock_run_full_pipeline_function):
-        self.mock_db_manager.video_exists.return_value = (
-            False  # Video does not exist initially
-        )
+        self.mock_db_manager.get_stage_states.return_value = {}  # Never processed
+        self.mock_db_manager.analysis_exists.return_value = False
 
         # Mock methods that are called after 'main' processing
         self.mock_db_manager.get_video_title.return_value = "New Video Processed"
@@ -125,13 +127,41 @@ class TestPersonaGenerator(unittest.TestCase):
         self.assertEqual(persona.gender, "Male")
         self.assertEqual(persona.wishes, ["main_wish"])
 
-        # Ensure video_exists was checked
-        self.mock_db_manager.video_exists.assert_called_once_with("vid789")
+        # Ensure the pipeline checkpoints were checked
+        self.mock_db_manager.get_stage_states.assert_called_once_with("vid789")
         # Ensure get_analysis was called (by _ensure_video_analyzed)
         self.mock_db_manager.get_analysis.assert_called_with("vid789")
 
+    @patch("src.services.run_full_pipeline")
+    def test_generate_persona_resumes_unfinished_pipeline(self, mock_run_full_pipeline_function):
+        # Gathering stored the video, then the run stopped during mining
+        self.mock_db_manager.video_exists.return_value = True
+        self.mock_db_manager.get_stage_states.return_value = {"gathering": "done", "mining": "running"}
+        self.mock_db_manager.get_user_demographics.return_value = ("NewName", "M")
+        self.mock_db_manager.get_analysis.return_value = {"issues": ["resumed"]}
+
+        persona = self.generator.generate_persona("vid_partial")
+
+        mock_run_full_pipeline_function.assert_called_once_with("vid_partial")
+        self.assertEqual(persona.issues, ["resumed"])
+
+    @patch("src.services.run_full_pipeline")
+    def test_generate_persona_legacy_video_is_not_reprocessed(self, mock_run_full_pipeline_function):
+        # Analysed before the pipeline kept stage checkpoints
+        db = DBManager(db_name=":memory:")
+        db.save_video_title("vid_legacy", "Legacy Video")
+        db.save_analysis("vid_legacy", {"issues": ["legacy issue"]})
+        self.generator.db = db
+
+        persona = self.generator.generate_persona("vid_legacy")
+
+        mock_run_full_pipeline_function.assert_not_called()
+        self.assertEqual(persona.title, "Generated Persona for Video: Legacy Video")
+        self.assertEqual(persona.issues, ["legacy issue"])
+        db.close()
+
     def test_generate_persona_error_handling(self):
-        self.mock_db_manager.video_exists.side_effect = Exception("Database error")
+        self.mock_db_manager.get_stage_states.side_effect = Exception("Database error")
 
         persona = self.generator.generate_persona("vid_error")
 
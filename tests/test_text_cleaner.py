@@ -0,0 +1,111 @@
+import random
+import re
+import unittest
+
+from src.text_cleaner import TextCleaner
+
+# The cleaning pipeline as it was before the fused engine, kept as the reference
+LEGACY_LINK_REGEX = re.compile(
+    r"((https?):((//)|(\\))+([\w\d:#@%/;$()~_?\+-=\\\.&](#!)?)*)", re.DOTALL
+)
+
+
+def legacy_strip_links(text):
+    for link in re.findall(LEGACY_LINK_REGEX, text):
+        text = text.replace(link[0], "")
+    return text
+
+
+def legacy_strip_entities_links(text):
+    words = []
+    for word in legacy_strip_links(text).split():
+        if word and word[0] not in ("@", "#"):
+            words.append(word)
+    return " ".join(words)
+
+
+def legacy_clean_comment(text):
+    clean_text = legacy_strip_entities_links(text).replace("..", ".")
+    clean_text = clean_text.replace("kk", "")
+    return clean_text.replace("rs", "")
+
+
+WORDS = [
+    "great", "video", "kkkk", "rsrs", "thanks!", "wow..", "...", "k", "rs", "r", "s",
+    "@ana", "#tbt", "@", "#", "a@b", "x#y", "emoji😀", "ótimo", "vídeo..",
+    "http://bit.ly//WR4Rt", "https://youtu.be/abc?t=1", "https:\\\\host\\path",
+    "(https://example.com/a_b)", "see:http://x.org/#!/page", "http://z.io/@user#frag",
+]
+NOISE = "abkrsh:/\\@#!.,=+-&?() \t\n😀é"
+
+
+def has_nested_links(text):
+    """True when one link found in ``text`` is a substring of another, different one.
+
+    That is the one case where the legacy replace-everywhere behaviour is
+    knowingly not reproduced (see test_link_prefix_of_later_link).
+    """
+    links = {match[0] for match in re.findall(LEGACY_LINK_REGEX, text)}
+    return any(a != b and a in b for a in links for b in links)
+
+
+def random_comment(rng):
+    if rng.random() < 0.2:  # Raw character noise
+        text = "".join(rng.choice(NOISE) for _ in range(rng.randint(0, 40)))
+    else:
+        separators = [" ", "  ", "\n", "\t", ""]
+        parts = []
+        for _ in range(rng.randint(0, 12)):
+            parts.append(rng.choice(WORDS))
+            parts.append(rng.choice(separators))
+        text = "".join(parts)
+    return random_comment(rng) if has_nested_links(text) else text
+
+
+class TestTextCleaner(unittest.TestCase):
+
+    def setUp(self):
+        self.cleaner = TextCleaner()
+        self.rng = random.Random(1234)
+
+    def test_docstring_examples(self):
+        self.assertEqual(
+            self.cleaner.strip_entities_links(
+                "@daniel I want that camera at #Bestbuy. http://bit.ly//WR4Rt"
+            ),
+            "I want that camera at",
+        )
+        self.assertEqual(
+            self.cleaner.clean_comment("@ana Great video.. rsrs http://bit.ly//WR4Rt"),
+            "Great video. ",
+        )
+
+    def test_strip_entities_links_matches_legacy(self):
+        for _ in range(3000):
+            text = random_comment(self.rng)
+            self.assertEqual(
+                self.cleaner.strip_entities_links(text), legacy_strip_entities_links(text), repr(text)
+            )
+
+    def test_clean_comment_matches_legacy(self):
+        for _ in range(3000):
+            text = random_comment(self.rng)
+            self.assertEqual(self.cleaner.clean_comment(text), legacy_clean_comment(text), repr(text))
+
+    def test_clean_many_matches_clean_comment(self):
+        texts = [random_comment(self.rng) for _ in range(500)]
+        self.assertEqual(
+            self.cleaner.clean_many(texts), [self.cleaner.clean_comment(t) for t in texts]
+        )
+        self.assertEqual(self.cleaner.clean_many([]), [])
+
+    def test_link_prefix_of_later_link(self):
+        # The legacy code replaced each found link string everywhere, so a link
+        # that prefixes a later one left the later link's tail behind.
+        text = "http://a.co and http://a.com"
+        self.assertEqual(legacy_strip_entities_links(text), "and m")
+        self.assertEqual(self.cleaner.strip_entities_links(text), "and")
+
+
+if __name__ == "__main__":
+    unittest.main()